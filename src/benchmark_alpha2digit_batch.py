@@ -0,0 +1,72 @@
+"""Benchmark batch processing of archived transcripts with alpha2digit"""
+
+import argparse
+import os
+from timeit import default_timer as timer
+
+from text_to_num import alpha2digit, alpha2digit_batch
+
+# Typical transcripts for each supported language
+SENTENCES = {
+    "de": [
+        "wecke mich morgen um sieben Uhr dreißig",
+        "die Rechnung über dreitausendvierhundertfünfundzwanzig Euro ist am einunddreißigsten fällig",
+        "wie wird das Wetter heute, morgen und übermorgen",
+        "setze einen Timer auf fünfzehn Minuten"
+    ],
+    "en": [
+        "wake me up at six thirty am",
+        "the invoice of three thousand four hundred twenty five dollars is due on the first",
+        "what's the weather like today, tomorrow and the day after",
+        "set a timer for fifteen minutes"
+    ],
+    "fr": [
+        "réveille-moi à six heures trente",
+        "la facture de trois mille quatre cent vingt-cinq euros est due le premier",
+        "quel temps fait-il aujourd'hui, demain et après-demain",
+        "règle un minuteur sur quinze minutes"
+    ],
+    "es": [
+        "despiértame a las seis y treinta",
+        "la factura de tres mil cuatrocientos veinticinco euros vence el primero",
+        "qué tiempo hace hoy, mañana y pasado mañana",
+        "pon un temporizador de quince minutos"
+    ],
+    "pt": [
+        "acorda-me às seis e trinta",
+        "a fatura de três mil quatrocentos e vinte e cinco euros vence no vigésimo primeiro dia",
+        "como está o tempo hoje, amanhã e depois de amanhã",
+        "define um temporizador de quinze minutos"
+    ]
+}
+
+def run(function, *function_args):
+    """Run function and return result and duration"""
+    start = timer()
+    result = function(*function_args)
+    return result, timer() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batch processing with alpha2digit.")
+    parser.add_argument("--count", type=int, default=100000,
+        help="Number of sentences per language",
+    )
+    parser.add_argument("--processes", type=int, default=os.cpu_count(),
+        help="Number of processes for the process pool test",
+    )
+    parser.add_argument("--languages", nargs="+", default=list(SENTENCES),
+        help="Languages to test",
+    )
+    args = parser.parse_args()
+
+    print(f"Processing {args.count} sentences per language (sentences/s):")
+    print("{:<8} {:>14} {:>14} {:>18}".format(
+        "language", "alpha2digit", "batch", f"batch ({args.processes} proc.)"))
+    for lang in args.languages:
+        texts = [SENTENCES[lang][i % len(SENTENCES[lang])] for i in range(args.count)]
+        single, single_time = run(lambda: [alpha2digit(text, lang) for text in texts])
+        batch, batch_time = run(alpha2digit_batch, texts, lang)
+        pool, pool_time = run(lambda: alpha2digit_batch(texts, lang, processes=args.processes))
+        assert single == batch == pool
+        print("{:<8} {:>14.0f} {:>14.0f} {:>18.0f}".format(lang,
+            args.count / single_time, args.count / batch_time, args.count / pool_time))
@@ -0,0 +1,110 @@
+"""Benchmark event-loop overhead of heart-beat checks for many idle sessions"""
+
+import argparse
+import sys
+import time
+import asyncio
+
+parser = argparse.ArgumentParser(description="Benchmark heart-beat scheduling of idle sessions.")
+parser.add_argument("--settings", default=None,
+    help="Settings path, required because server modules load settings on import",
+)
+parser.add_argument("--sessions", type=int, default=10000,
+    help="Number of idle sessions",
+)
+parser.add_argument("--heartbeat", type=int, default=2,
+    help="Heart-beat interval in seconds (shorter than in production to get more samples)",
+)
+parser.add_argument("--duration", type=float, default=10,
+    help="Duration of each test in seconds",
+)
+args = parser.parse_args()
+
+# Server modules parse the commandline on import, so we hand over only what they know
+sys.argv = sys.argv[:1] + (["--settings", args.settings] if args.settings else [])
+
+from starlette.websockets import WebSocketState
+
+import users
+from launch_setup import settings
+from users import SocketUser
+from socket_api import SocketManager
+
+# Idle sessions must not time out during the test
+users.TIMEOUT_SECONDS = 10**9
+settings.socket_heartbeat_s = args.heartbeat
+
+class IdleSocket:
+    """Fake WebSocket that accepts and drops all messages"""
+    client_state = WebSocketState.CONNECTED
+    sent = 0
+
+    async def accept(self):
+        """Accept connection"""
+
+    async def send_json(self, data):
+        """Count message"""
+        IdleSocket.sent += 1
+
+    async def close(self, code: int = 1000):
+        """Close connection"""
+
+async def legacy_heartbeat_loop(user: SocketUser, delay: int):
+    """Previous implementation: one task per user"""
+    while user.is_alive:
+        await asyncio.sleep(delay)
+        await user.heartbeat(int(time.time()))
+
+async def measure_lag(duration: float, interval: float = 0.01):
+    """Sample event-loop lag (how late 'sleep' wakes up) for 'duration' seconds"""
+    loop = asyncio.get_running_loop()
+    lags = []
+    end = loop.time() + duration
+    while loop.time() < end:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+    lags.sort()
+    return lags
+
+async def run(use_wheel: bool):
+    """Start sessions, sample loop lag and CPU time and return stats"""
+    IdleSocket.sent = 0
+    manager = SocketManager()
+    user_list = []
+    tasks = []
+    for _ in range(args.sessions):
+        user = SocketUser(IdleSocket())
+        user_list.append(user)
+        if use_wheel:
+            await manager.onopen(user)
+        else:
+            tasks.append(asyncio.create_task(legacy_heartbeat_loop(user, args.heartbeat)))
+    await asyncio.sleep(0)
+    num_tasks = len(asyncio.all_tasks()) - 1     # without this one
+    cpu_start = time.process_time()
+    lags = await measure_lag(args.duration)
+    cpu = time.process_time() - cpu_start
+    # clean up
+    for user in user_list:
+        user.is_alive = False
+    for task in tasks + ([manager._heartbeat_task] if use_wheel else []):
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "tasks": num_tasks,
+        "pings": IdleSocket.sent,
+        "cpu": cpu / args.duration * 100,
+        "lag_p50": lags[len(lags)//2] * 1000,
+        "lag_p99": lags[int(len(lags)*0.99)] * 1000,
+        "lag_max": lags[-1] * 1000
+    }
+
+print(f"{args.sessions} idle sessions, heart-beat {args.heartbeat}s, {args.duration}s per test:")
+print("{:<12} {:>8} {:>8} {:>8} {:>12} {:>12} {:>12}".format(
+    "scheduler", "tasks", "pings", "cpu %", "lag p50 ms", "lag p99 ms", "lag max ms"))
+for name, use_wheel in [("per-user", False), ("timer-wheel", True)]:
+    res = asyncio.run(run(use_wheel))
+    print("{:<12} {:>8} {:>8} {:>8.1f} {:>12.2f} {:>12.2f} {:>12.2f}".format(
+        name, res["tasks"], res["pings"], res["cpu"],
+        res["lag_p50"], res["lag_p99"], res["lag_max"]))
@@ -0,0 +1,46 @@
+"""Benchmark parsing of incoming WebSocket messages (single core)"""
+
+import argparse
+import sys
+import json
+from timeit import default_timer as timer
+
+parser = argparse.ArgumentParser(description="Benchmark parsing of incoming socket messages.")
+parser.add_argument("--settings", default=None,
+    help="Settings path, required because server modules load settings on import",
+)
+parser.add_argument("--count", type=int, default=100000,
+    help="Number of messages to parse per test",
+)
+args = parser.parse_args()
+
+# Server modules parse the commandline on import, so we hand over only what they know
+sys.argv = sys.argv[:1] + (["--settings", args.settings] if args.settings else [])
+
+from socket_messages import SocketJsonInputMessage, parse_socket_json_message
+
+# Message shapes as sent by the clients (see 'sepia-stt-socket-client.js')
+MESSAGES = {
+    "welcome": json.dumps({
+        "type": "welcome",
+        "data": {"language": "en-US", "model": "vosk-model-small-en-us", "samplerate": 16000,
+            "optimizeFinalResult": True, "alternatives": 1, "continuous": False},
+        "access_token": "test1234", "client_id": "any", "ts": 1620804751062, "msg_id": 1
+    }),
+    "pong": json.dumps({"type": "pong", "msg_id": 42}),
+    "audioend": json.dumps({"type": "audioend", "ts": 1620804751062, "msg_id": 43})
+}
+
+def run(parse_function, text, count):
+    """Parse same message 'count' times and return messages/s"""
+    start = timer()
+    for _ in range(count):
+        parse_function(text)
+    return count / (timer() - start)
+
+print(f"Parsing {args.count} messages per test (messages/s, single core):")
+print("{:<10} {:>14} {:>14} {:>8}".format("type", "parse_raw", "fast-path", "factor"))
+for msg_type, msg_text in MESSAGES.items():
+    before = run(SocketJsonInputMessage.parse_raw, msg_text, args.count)
+    after = run(parse_socket_json_message, msg_text, args.count)
+    print("{:<10} {:>14.0f} {:>14.0f} {:>7.1f}x".format(msg_type, before, after, after/before))
@@ -0,0 +1,274 @@
+"""Benchmark and regression suite for text post-processing (text_to_num and text_processor).
+
+Runs all cases on realistic assistant and dictation corpora, reports ops/s and memory,
+compares with the baseline stored in 'benchmark_baseline.json' and exits with code 1
+if a case got slower (or uses more memory) than '--max-regression' percent.
+Speed is normalized by a calibration loop to compare results of different machines.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from text_to_num import alpha2digit, text2num, set_alpha2digit_cache_size
+from text_to_num.lang import LANG
+from text_processor import DateAndTimeOptimizer, get_text_pipeline
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    "benchmark_baseline.json")
+
+parser = argparse.ArgumentParser(description="Benchmark and regression suite for text processing.")
+parser.add_argument("--baseline", default=BASELINE_FILE,
+    help="Baseline file (JSON)",
+)
+parser.add_argument("--update-baseline", action="store_true",
+    help="Write results as new baseline instead of comparing",
+)
+parser.add_argument("--max-regression", type=float, default=50,
+    help="Max. allowed regression in percent (speed and memory) before the suite fails",
+)
+parser.add_argument("--repeat", type=int, default=9,
+    help="Number of measurements per case (the median is used)",
+)
+parser.add_argument("--min-time", type=float, default=0.2,
+    help="Min. duration in seconds of one measurement",
+)
+parser.add_argument("--cases", nargs="+", default=None,
+    help="Run only cases that start with one of the given names",
+)
+
+# Short voice commands of an assistant session
+ASSISTANT = {
+    "de": [
+        "wecke mich morgen um sieben Uhr dreißig",
+        "setze einen Timer auf fünfzehn Minuten",
+        "erinnere mich am ersten ersten zweitausend zwei und zwanzig an den Termin",
+        "was ist dreihundertfünfundzwanzig mal zwölf",
+        "wie wird das Wetter heute"
+    ],
+    "en": [
+        "wake me up at six thirty am",
+        "set a timer for fifteen minutes",
+        "remind me on the twenty first of march at eight pm",
+        "what is three hundred twenty five times twelve",
+        "what's the weather like today"
+    ],
+    "fr": [
+        "réveille-moi à six heures trente",
+        "règle un minuteur sur quinze minutes",
+        "rappelle-moi le vingt et un mars à vingt heures",
+        "combien font trois cent vingt-cinq fois douze",
+        "quel temps fait-il aujourd'hui"
+    ],
+    "es": [
+        "despiértame a las seis y treinta",
+        "pon un temporizador de quince minutos",
+        "recuérdame el veintiuno de marzo a las ocho",
+        "cuánto es trescientos veinticinco por doce",
+        "qué tiempo hace hoy"
+    ],
+    "pt": [
+        "acorda-me às seis e trinta",
+        "define um temporizador de quinze minutos",
+        "lembra-me no vigésimo primeiro dia de março às oito",
+        "quanto é trezentos e vinte e cinco vezes doze",
+        "como está o tempo hoje"
+    ]
+}
+
+# Longer sentences of a dictation (continuous mode)
+DICTATION = {
+    "de": [
+        "Die Rechnung über dreitausendvierhundertfünfundzwanzig Euro ist am einunddreißigsten da.",
+        "Wir haben zweihundertzweiundzwanzig Kisten und neunzehnhundertneunundneunzig Flaschen.",
+        "Am zwölften Mai kamen siebenundsechzig Leute zum einhundertsten Geburtstag.",
+        "Die Einwohnerzahl stieg von achtzehntausendfünfhundert auf zweiundzwanzigtausendvierzig."
+    ],
+    "en": [
+        "The bill of three thousand four hundred twenty five dollars is due on the thirty first.",
+        "We have two hundred twenty two boxes and one thousand nine hundred ninety nine bottles.",
+        "On the twelfth of May sixty seven people came to the one hundredth birthday.",
+        "The population grew from eighteen thousand five hundred to twenty two thousand forty."
+    ],
+    "fr": [
+        "La facture de trois mille quatre cent vingt-cinq euros est due le trente et un.",
+        "Nous avons deux cent vingt-deux caisses et mille neuf cent quatre-vingt-dix-neuf verres.",
+        "Le douze mai, soixante-sept personnes sont venues au centième anniversaire.",
+        "La population est passée de dix-huit mille cinq cents à vingt-deux mille quarante."
+    ],
+    "es": [
+        "La factura de tres mil cuatrocientos veinticinco euros vence el treinta y uno.",
+        "Tenemos doscientas veintidós cajas y mil novecientas noventa y nueve botellas.",
+        "El doce de mayo vinieron sesenta y siete personas al centésimo cumpleaños.",
+        "La población creció de dieciocho mil quinientos a veintidós mil cuarenta."
+    ],
+    "pt": [
+        "A fatura de três mil quatrocentos e vinte e cinco euros vence no trigésimo primeiro.",
+        "Temos duzentas e vinte e duas caixas e mil novecentas e noventa e nove garrafas.",
+        "No dia doze de maio vieram sessenta e sete pessoas ao centésimo aniversário.",
+        "A população cresceu de dezoito mil e quinhentos para vinte e dois mil e quarenta."
+    ]
+}
+
+# Spoken numbers only
+NUMBERS = {
+    "de": ["dreihundertfünfundzwanzig", "zweitausend zwei und zwanzig",
+        "neunzehnhundertneunundneunzig", "eine million zweihunderttausend"],
+    "en": ["three hundred twenty five", "two thousand twenty two",
+        "one thousand nine hundred ninety nine", "one million two hundred thousand"],
+    "fr": ["trois cent vingt-cinq", "deux mille vingt-deux",
+        "mille neuf cent quatre-vingt-dix-neuf", "un million deux cent mille"],
+    "es": ["trescientos veinticinco", "dos mil veintiuno",
+        "mil novecientos noventa y nueve", "un millón doscientos mil"],
+    "pt": ["trezentos e vinte e cinco", "dois mil e vinte e dois",
+        "mil novecentos e noventa e nove", "um milhão e duzentos mil"]
+}
+
+# Results of text2num in the format the date/time optimizers get them
+DATES_AND_TIMES = {
+    "de": ["Am 1. 1. 2022 um 12 Uhr 30 ist Termin.", "ein Uhr", "17 Uhr 15 am 3. 12."],
+    "en": ["wake me up at 6 30 am", "one o'clock", "at 8 15 pm and 7 45 pm"]
+}
+
+def build_cases():
+    """Get all benchmark cases as dict: name -> (function, list of inputs)"""
+    cases = {}
+    for lang, texts in ASSISTANT.items():
+        cases[f"alpha2digit.assistant.{lang}"] = (
+            lambda text, lang=lang: alpha2digit(text, lang, relaxed=True, ordinal_threshold=0),
+            texts)
+    for lang, texts in DICTATION.items():
+        cases[f"alpha2digit.dictation.{lang}"] = (
+            lambda text, lang=lang: alpha2digit(text, lang, relaxed=True, ordinal_threshold=0),
+            [" ".join(texts)])
+    for lang, texts in NUMBERS.items():
+        cases[f"text2num.{lang}"] = (
+            lambda text, lang=lang: text2num(text, lang, relaxed=True), texts)
+    cases["split_number_word.de"] = (LANG["de"].split_number_word,
+        [word for text in DICTATION["de"] + NUMBERS["de"] for word in text.split()])
+    for lang, texts in DATES_AND_TIMES.items():
+        cases[f"date_time_optimizer.{lang}"] = (DateAndTimeOptimizer(lang).process, texts)
+    for lang, texts in ASSISTANT.items():
+        cases[f"pipeline.assistant.{lang}"] = (get_text_pipeline(lang).process, texts)
+    return cases
+
+CALIBRATION_LOOPS = 100000
+
+# Durations are measured as CPU time of this process, so time slices given to other
+# processes (e.g. on shared machines) are not counted
+clock = time.process_time
+
+def calibrate():
+    """Speed of a fixed pure-Python workload on this machine (loops/s)"""
+    start = clock()
+    words = {}
+    for i in range(CALIBRATION_LOOPS):
+        key = str(i % 1000)
+        words[key] = words.get(key, 0) + len(key)
+    return CALIBRATION_LOOPS / (clock() - start)
+
+def run(function, inputs, runs: int):
+    """Process all inputs 'runs' times and return duration"""
+    start = clock()
+    for _ in range(runs):
+        for item in inputs:
+            function(item)
+    return clock() - start
+
+def median(values: list):
+    """Median of values"""
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+def measure(function, inputs, repeat: int, min_time: float):
+    """Measure case 'repeat' times (one op = one input) and get median ops/s, score
+    and peak memory (bytes) of one run. Each measurement is placed between two calibration
+    runs and scored by itself (ops/s per 1000 calibration loops/s), the median score of
+    these interleaved runs cancels out changes of machine speed and single outliers."""
+    # memory of one run (tracemalloc slows down execution, so it's measured separately)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    run(function, inputs, 1)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # number of runs to reach 'min_time'
+    runs = 1
+    while run(function, inputs, runs) < min_time:
+        runs *= 2
+    all_ops = []
+    scores = []
+    for _ in range(repeat):
+        calibration_before = calibrate()
+        ops = runs * len(inputs) / run(function, inputs, runs)
+        calibration = (calibration_before + calibrate()) / 2
+        all_ops.append(ops)
+        scores.append(ops / calibration * 1000)
+    return median(all_ops), median(scores), peak - base
+
+def compare(name, result, baseline, max_regression):
+    """Compare result with baseline and return list of regression messages"""
+    if baseline is None:
+        return []
+    errors = []
+    speed_change = (result["score"] / baseline["score"] - 1) * 100
+    if speed_change < -max_regression:
+        errors.append(f"{name}: {-speed_change:.1f}% slower")
+    # small absolute changes of memory are noise (e.g. first use of a cache)
+    if result["peak_bytes"] > baseline["peak_bytes"] * (1 + max_regression / 100) + 4096:
+        errors.append(
+            f"{name}: peak memory {baseline['peak_bytes']} -> {result['peak_bytes']} bytes")
+    return errors
+
+def main():
+    """Run suite and compare with or update baseline"""
+    args = parser.parse_args()
+    cases = build_cases()
+    if args.cases:
+        cases = {name: case for name, case in cases.items() if name.startswith(tuple(args.cases))}
+    baseline = {}
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    # measure processing, not the result cache of the pipelines
+    set_alpha2digit_cache_size(0)
+    # warm up (lazy loading, pipelines)
+    for function, inputs in cases.values():
+        for item in inputs:
+            function(item)
+    calibration = median([calibrate() for _ in range(args.repeat)])
+    print(f"Calibration: {calibration:.0f} loops/s (score = ops/s per 1000 loops/s)")
+    print("{:<32} {:>12} {:>10} {:>10} {:>10} {:>8}".format(
+        "case", "ops/s", "score", "baseline", "change", "peak KiB"))
+    results = {}
+    errors = []
+    for name, (function, inputs) in cases.items():
+        ops, score, peak = measure(function, inputs, args.repeat, args.min_time)
+        results[name] = {"ops": round(ops, 1), "score": round(score, 3), "peak_bytes": peak}
+        base = baseline.get("cases", {}).get(name)
+        print("{:<32} {:>12.0f} {:>10.1f} {:>10} {:>10} {:>8.1f}".format(name, ops,
+            results[name]["score"],
+            "{:.1f}".format(base["score"]) if base else "-",
+            "{:+.1f}%".format((results[name]["score"] / base["score"] - 1) * 100) if base else "-",
+            peak / 1024))
+        errors += compare(name, results[name], base, args.max_regression)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"python": sys.version.split()[0], "calibration": round(calibration),
+                "cases": results}, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"\nBaseline written: {args.baseline}")
+        return 0
+    if errors:
+        print(f"\nRegressions (more than {args.max_regression}%):")
+        for error in errors:
+            print(" - " + error)
+        return 1
+    print(f"\nNo regressions (more than {args.max_regression}%)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""Benchmark text post-processing of final and partial results (single core)"""
+
+import argparse
+import random
+from timeit import default_timer as timer
+
+from text_processor import (TextToNumberProcessor, DateAndTimeOptimizer, get_text_pipeline,
+    search_via_regex, PartialResultOptimizer)
+from text_to_num import set_alpha2digit_cache_size, alpha2digit_cache_info
+
+parser = argparse.ArgumentParser(description="Benchmark text post-processing of final and partial results.")
+parser.add_argument("--count", type=int, default=5000,
+    help="Number of final results to process per test",
+)
+parser.add_argument("--log-size", type=int, default=20000,
+    help="Number of final results of the replayed command log",
+)
+parser.add_argument("--cache-size", type=int, default=1024,
+    help="Size of text2num cache for the replayed command log",
+)
+parser.add_argument("--sentences", type=int, nargs="+", default=[10, 100, 1000],
+    help="Number of sentences of long (continuous) transcripts for date/time optimizer test",
+)
+parser.add_argument("--partial-words", type=int, nargs="+", default=[20, 100, 400],
+    help="Number of words of utterances for the partial results test",
+)
+args = parser.parse_args()
+
+# Typical final results of an assistant session
+FINALS = {
+    "de-DE": [
+        "wecke mich morgen um sieben Uhr dreißig",
+        "erinnere mich am ersten ersten zweitausend zwei und zwanzig an den Termin",
+        "wie wird das Wetter heute",
+        "setze einen Timer auf fünfzehn Minuten",
+        "was ist dreihundertfünfundzwanzig mal zwölf"
+    ],
+    "en-US": [
+        "wake me up at six thirty am",
+        "remind me to call mom at eight pm",
+        "what's the weather like today",
+        "set a timer for fifteen minutes",
+        "what is three hundred twenty five times twelve"
+    ]
+}
+
+def process_new_processors(language, text):
+    """Previous implementation: create processors for each final result"""
+    text2num_proc = TextToNumberProcessor(language)
+    dt_optimizer = DateAndTimeOptimizer(language)
+    return dt_optimizer.process(text2num_proc.process(text))
+
+def process_shared_pipeline(language, text):
+    """Shared per-language pipeline"""
+    return get_text_pipeline(language).process(text)
+
+def run(process_function, language, count):
+    """Process final results 'count' times and return results/s"""
+    texts = FINALS[language]
+    start = timer()
+    for i in range(count):
+        process_function(language, texts[i % len(texts)])
+    return count / (timer() - start)
+
+# measure processing without text2num cache first
+set_alpha2digit_cache_size(0)
+print(f"Processing {args.count} final results per test (finals/s, single core):")
+print("{:<8} {:>14} {:>14} {:>8}".format("language", "per-result", "pipeline", "factor"))
+for lang in FINALS:
+    # make sure both produce the same results
+    for final in FINALS[lang]:
+        assert process_new_processors(lang, final) == process_shared_pipeline(lang, final)
+    before = run(process_new_processors, lang, args.count)
+    after = run(process_shared_pipeline, lang, args.count)
+    print("{:<8} {:>14.0f} {:>14.0f} {:>7.1f}x".format(lang, before, after, after/before))
+
+# Replayed command log: few commands are very frequent, many are rare (Zipf-like)
+random.seed(42)
+commands = [(lang, text.replace("fünfzehn", number).replace("fifteen", number))
+    for lang in FINALS for text in FINALS[lang]
+    for number in ["fünfzehn", "fifteen", "zwanzig", "twenty", "drei", "three", "zehn", "ten"]]
+command_log = random.choices(commands, weights=[1 / (i + 1) for i in range(len(commands))],
+    k=args.log_size)
+
+def replay(cache_size):
+    """Process command log with given text2num cache size and return finals/s"""
+    set_alpha2digit_cache_size(cache_size)
+    start = timer()
+    for lang, text in command_log:
+        get_text_pipeline(lang).process(text)
+    return args.log_size / (timer() - start)
+
+before = replay(0)
+after = replay(args.cache_size)
+cache_info = alpha2digit_cache_info()
+print(f"\nReplayed command log of {args.log_size} finals ({len(set(command_log))} different):")
+print("{:<10} {:>14} {:>14} {:>8} {:>10}".format(
+    "cache", "no cache", "LRU cache", "factor", "hit rate"))
+print("{:<10} {:>14.0f} {:>14.0f} {:>7.1f}x {:>9.1f}%".format(args.cache_size, before, after,
+    after/before, 100 * cache_info.hits / (cache_info.hits + cache_info.misses)))
+
+def legacy_optimize_time_de(text_in):
+    """Previous implementation of German time optimizer: recursion for each match"""
+    search_res = search_via_regex(text_in, r"\d{1,2} Uhr \d{1,2}")
+    if not search_res:
+        return text_in
+    hour, _, minutes = search_res['text_match'].split(" ")
+    return (search_res['text_before'] + hour + ":" + minutes.zfill(2) + " Uhr"
+        + legacy_optimize_time_de(search_res['text_after']))
+
+def run_long(process_function, text, count):
+    """Process long text 'count' times and return characters/s or error name"""
+    start = timer()
+    try:
+        for _ in range(count):
+            process_function(text)
+    except RecursionError as err:
+        return type(err).__name__
+    return "{:.0f}".format(count * len(text) / (timer() - start))
+
+SENTENCE_DE = "Am 1. 1. 2022 um 12 Uhr 30 und am 3. 12. um 17 Uhr 15 ist Termin. "
+print("\nTime optimizer on long continuous German transcripts (characters/s):")
+print("{:<10} {:>14} {:>14}".format("sentences", "recursive", "single-pass"))
+for num in args.sentences:
+    long_text = SENTENCE_DE * num
+    repeat = max(1, 1000 // num)
+    print("{:<10} {:>14} {:>14}".format(num,
+        run_long(legacy_optimize_time_de, long_text, repeat),
+        run_long(DateAndTimeOptimizer.optimize_time_de, long_text, repeat)))
+
+def run_partials(process_function, partials):
+    """Process all partial results of an utterance and return partials/s"""
+    start = timer()
+    for partial in partials:
+        process_function(partial)
+    return len(partials) / (timer() - start)
+
+set_alpha2digit_cache_size(0)
+print("\nPartial results of a growing utterance, one new word each (partials/s):")
+print("{:<8} {:<8} {:>14} {:>14} {:>8}".format(
+    "language", "words", "whole text", "incremental", "factor"))
+for lang in FINALS:
+    pipeline = get_text_pipeline(lang)
+    utterance_words = " ".join(FINALS[lang]).split()
+    for num in args.partial_words:
+        words = [utterance_words[i % len(utterance_words)] for i in range(num)]
+        partials = [" ".join(words[:i]) for i in range(1, num + 1)]
+        optimizer = PartialResultOptimizer(pipeline)
+        assert [optimizer.process(p) for p in partials] == [pipeline.process(p) for p in partials]
+        before = run_partials(pipeline.process, partials)
+        after = run_partials(PartialResultOptimizer(pipeline).process, partials)
+        print("{:<8} {:<8} {:>14.0f} {:>14.0f} {:>7.1f}x".format(
+            lang, num, before, after, after/before))
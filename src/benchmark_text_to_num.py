@@ -0,0 +1,185 @@
+"""Benchmark German number word splitting, Portuguese ordinals merging and text2num
+on long dictations (single core)"""
+
+import argparse
+import re
+from timeit import default_timer as timer
+
+from text_to_num import alpha2digit, transforms
+from text_to_num.lang.german import German, ALL_WORDS_SORTED_REVERSE
+from text_to_num.lang.portuguese import OrdinalsMerger, SEGMENT_BREAK, SUB_REGEXES
+from text_to_num.parsers import WordStreamValueParserGerman
+
+parser = argparse.ArgumentParser(description="Benchmark German number splitting and text2num.")
+parser.add_argument("--count", type=int, default=20,
+    help="Number of runs per test",
+)
+parser.add_argument("--sentences", type=int, default=50,
+    help="Number of sentences of the dictation",
+)
+parser.add_argument("--phrase-groups", type=int, nargs="+", default=[1, 4, 8],
+    help="Number of groups (up to 8) of spoken numbers for the incremental parser test",
+)
+args = parser.parse_args()
+
+# Dictation with many compound numbers
+SENTENCES_DE = [
+    "Die Rechnung über dreitausendvierhundertfünfundzwanzig Euro ist am einunddreißigsten fällig.",
+    "Wir haben zweihundertzweiundzwanzig Kisten und neunzehnhundertneunundneunzig Flaschen.",
+    "Am zwölften Mai kamen siebenundsechzig Leute zum einhundertsten Geburtstag.",
+    "Die Einwohnerzahl stieg von achtzehntausendfünfhundert auf zweiundzwanzigtausendvierzig.",
+    "Bitte notiere dreihundertsiebenundachtzig Komma fünf und elf Millionen zweihunderttausend."
+]
+
+def legacy_split_number_word(word: str, prefix_length: int = 0) -> str:
+    """Previous implementation: check every word at every index (linear scan)"""
+    text = word.lower()
+    invalid_word = ""
+    result = ""
+    while len(text) > 0:
+        found = False
+        for sw in ALL_WORDS_SORTED_REVERSE:
+            if text.startswith(sw):
+                if len(invalid_word) > 0:
+                    result += invalid_word + " "
+                    invalid_word = ""
+                result += sw + " "
+                text = text[len(sw):]
+                found = True
+                break
+        if not found:
+            ord_match = None
+            if prefix_length + len(result) > 3 and text.startswith("ste"):
+                ord_match = re.search(German.LARGE_ORDINAL_SUFFIXES_GER, text)
+            if ord_match:
+                text = text[ord_match.span()[1]:]
+                invalid_word = ""
+            elif not text[0] == " ":
+                invalid_word += text[0:1]
+                text = text[1:]
+            else:
+                if len(invalid_word) > 0:
+                    result += invalid_word + " "
+                    invalid_word = ""
+                text = text[1:]
+    if len(invalid_word) > 0:
+        result += invalid_word + " "
+    return result
+
+def run(process_function, items, count):
+    """Process all items 'count' times and return items/s"""
+    start = timer()
+    for _ in range(count):
+        for item in items:
+            process_function(item)
+    return count * len(items) / (timer() - start)
+
+dictation = " ".join(SENTENCES_DE[i % len(SENTENCES_DE)] for i in range(args.sentences))
+words = dictation.split()
+german = German()
+for word in words:
+    assert legacy_split_number_word(word) == german.split_number_word(word)
+
+print(f"German dictation with {args.sentences} sentences ({len(words)} words), {args.count} runs:")
+print("{:<24} {:>14} {:>14} {:>8}".format("test", "linear scan", "trie", "factor"))
+before = run(legacy_split_number_word, words, args.count)
+after = run(german.split_number_word, words, args.count)
+print("{:<24} {:>14.0f} {:>14.0f} {:>7.1f}x".format("split words/s", before, after, after/before))
+split_trie = German.split_number_word
+German.split_number_word = lambda self, *split_args: legacy_split_number_word(*split_args)
+before = run(lambda text: alpha2digit(text, "de"), [dictation], args.count)
+German.split_number_word = split_trie
+after = run(lambda text: alpha2digit(text, "de"), [dictation], args.count)
+print("{:<24} {:>14.2f} {:>14.2f} {:>7.1f}x".format("alpha2digit dictations/s",
+    before, after, after/before))
+
+
+class ReparsingParserGerman(WordStreamValueParserGerman):
+    """Previous implementation: parse all joined tokens again for each new token"""
+    def reset(self):
+        super().reset()
+        self.tokens = []
+
+    def push(self, word, look_ahead=None):
+        self.tokens.append(word)
+        WordStreamValueParserGerman.reset(self)
+        return super().push(" ".join(self.tokens))
+
+# Spoken numbers, e.g. "neun hundert neun und neunzig millionen neun hundert ..."
+MULTIPLIER_WORDS = ["trilliarden", "trillionen", "billiarden", "billionen",
+    "milliarden", "millionen", "tausend", ""]
+print("\nalpha2digit on spoken German numbers (numbers/s):")
+print("{:<24} {:>14} {:>14} {:>8}".format("tokens", "re-parsing", "incremental", "factor"))
+for num in args.phrase_groups:
+    phrase = " ".join("neun hundert neun und neunzig " + multiplier
+        for multiplier in MULTIPLIER_WORDS[-num:]).strip()
+    repeat = max(1, args.count * 50 // num)
+    transforms.WordStreamValueParserGerman = ReparsingParserGerman
+    expected = alpha2digit(phrase, "de", relaxed=True)
+    before = run(lambda text: alpha2digit(text, "de", relaxed=True), [phrase], repeat)
+    transforms.WordStreamValueParserGerman = WordStreamValueParserGerman
+    assert alpha2digit(phrase, "de", relaxed=True) == expected
+    after = run(lambda text: alpha2digit(text, "de", relaxed=True), [phrase], repeat)
+    print("{:<24} {:>14.0f} {:>14.0f} {:>7.1f}x".format(
+        len(phrase.split()), before, after, after/before))
+
+
+class LegacyOrdinalsMerger(OrdinalsMerger):
+    """Previous implementation: split text again and apply each regex to each token"""
+    def merge_compound_ordinals_pt(self, text):
+        segments = re.split(SEGMENT_BREAK, text)
+        punct = re.findall(SEGMENT_BREAK, text)
+        if len(punct) < len(segments):
+            punct.append("")
+        out_segments = []
+        for segment, sep in zip(segments, punct):
+            tokens = [t for t in segment.split(" ") if len(t) > 0]
+            tokens_ = []
+            seq = []
+            for token in tokens:
+                if self.is_ordinal(token):
+                    seq.append(self.get_cardinal(token))
+                    gender = self.get_gender(token)
+                elif seq:
+                    tokens_.append(str(sum(seq)) + gender)
+                    tokens_.append(token)
+                    seq = []
+                else:
+                    tokens_.append(token)
+            if seq:
+                tokens_.append(str(sum(seq)) + gender)
+            for regex in SUB_REGEXES:
+                tokens_ = [re.sub(regex[0], regex[1], token) for token in tokens_]
+            out_segments.append(" ".join(tokens_) + sep)
+        return "".join(out_segments)
+
+    def merge_segments(self, segments, punct):
+        return self.merge_compound_ordinals_pt(
+            "".join(" ".join(tokens) + sep for tokens, sep in zip(segments, punct)))
+
+# Portuguese dictation with ordinals
+SENTENCES_PT = [
+    "A fatura de três mil quatrocentos e vinte e cinco euros vence no vigésimo primeiro dia.",
+    "Ficámos em terceiro lugar na vigésima sétima corrida, depois do segundo dia.",
+    "O centésimo quinto aniversário é no dia doze de maio às dezanove horas.",
+    "Temos duzentas e vinte e duas caixas e mil novecentas garrafas no primeiro andar.",
+    "Como está o tempo hoje, amanhã e depois de amanhã?"
+]
+dictation = " ".join(SENTENCES_PT[i % len(SENTENCES_PT)] for i in range(args.sentences))
+first_pass = alpha2digit(dictation, "pt")
+legacy_merger = LegacyOrdinalsMerger()
+assert legacy_merger.merge_compound_ordinals_pt(first_pass) \
+    == OrdinalsMerger().merge_compound_ordinals_pt(first_pass)
+
+print(f"\nPortuguese dictation with {args.sentences} sentences, {args.count} runs:")
+print("{:<24} {:>14} {:>14} {:>8}".format("test", "legacy", "single-pass", "factor"))
+before = run(legacy_merger.merge_compound_ordinals_pt, [first_pass], args.count)
+after = run(OrdinalsMerger().merge_compound_ordinals_pt, [first_pass], args.count)
+print("{:<24} {:>14.2f} {:>14.2f} {:>7.1f}x".format("merge dictations/s", before, after, after/before))
+transforms.omg = legacy_merger
+before = run(lambda text: alpha2digit(text, "pt"), [dictation], args.count)
+transforms.omg = OrdinalsMerger()
+assert alpha2digit(dictation, "pt") == first_pass
+after = run(lambda text: alpha2digit(text, "pt"), [dictation], args.count)
+print("{:<24} {:>14.2f} {:>14.2f} {:>7.1f}x".format("alpha2digit dictations/s",
+    before, after, after/before))
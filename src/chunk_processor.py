@@ -8,6 +8,7 @@ from uvicorn.config import logger
 from launch_setup import settings
 from socket_messages import (SocketJsonInputMessage, SocketResponseMessage, SocketErrorMessage)
 from engine_interface import EngineInterface, EngineNotFound
+import metrics
 # imports based on settings.asr_engine:
 if settings.hot_swap_engines or settings.asr_engine == "vosk":
     from engine_vosk import VoskProcessor
@@ -43,12 +44,29 @@ class ChunkProcessor():
         # Default
         if engine_name is None:
             engine_name = settings.asr_engine
-        # Get instance
+        # Get instance (call 'setup' before use)
         self.processor = get_processor_instance(engine_name, send_message, options)
+        # Metrics
+        self._metric_labels = (self.processor.engine_name, self.processor.model_name)
+        self._is_closed = True
+
+    async def setup(self):
+        """Load model and prepare processor (can take a while if model is not loaded yet).
+        On error the session slot and model are released again."""
+        try:
+            await self.processor.setup()
+        except BaseException:
+            self.processor.release_model()
+            raise
+        self._is_closed = False
+        metrics.sessions_opened.inc(*self._metric_labels)
+        metrics.sessions_active.inc(*self._metric_labels)
 
     async def process(self, chunk: bytes):
         """Process chunks with given processor"""
         if self.processor is not None and self.processor.is_open and self.processor.accept_chunks:
+            chunk_s = self.processor.register_audio_chunk(len(chunk))
+            metrics.audio_seconds.inc(*self._metric_labels, amount=chunk_s)
             await self.processor.process(chunk)
         else:
             if self.send_message is not None:
@@ -60,6 +78,7 @@ class ChunkProcessor():
         """Stop accepting chunks and wait for last result"""
         if self.processor is not None and self.processor.is_open and self.processor.accept_chunks:
             self.processor.accept_chunks = False
+            self.processor.register_audio_end()
             if self.send_message is not None:
                 await self.send_message(SocketResponseMessage(message.msg_id, "audioend"))
             await self.processor.finish_processing()
@@ -68,6 +87,17 @@ class ChunkProcessor():
         """Close processor (to clean up and close streams etc.)"""
         if self.processor is not None and self.processor.is_open:
             await self.processor.close()
+        if self.processor is not None:
+            # shared model and session slot of model
+            self.processor.release_model()
+        if not self._is_closed:
+            self._is_closed = True
+            metrics.sessions_closed.inc(*self._metric_labels)
+            metrics.sessions_active.dec(*self._metric_labels)
+            decoding = self.processor.timing.stages.get("decoding")
+            if decoding and self.processor.audio_received_s > 0:
+                metrics.real_time_factor.observe(decoding["total_ms"] / 1000
+                    / self.processor.audio_received_s, self._metric_labels[0])
 
     def get_options(self):
         """Get available processor options (optionally with defaults)"""
@@ -76,17 +106,36 @@ class ChunkProcessor():
         else:
             return None
 
+    def is_active(self):
+        """Processor is open and still accepts chunks (e.g. in the middle of an utterance)"""
+        return (self.processor is not None and self.processor.is_open
+            and self.processor.accept_chunks)
+
+    def set_send_message(self, send_message):
+        """Replace send message function, e.g. when a session is resumed (None = mute)"""
+        self.send_message = send_message
+        if self.processor is not None:
+            self.processor.set_send_message(send_message)
+
 #--- DYNAMIC ENGINE SWAPPING ---
 
 class DynamicEngineSwap(EngineInterface):
     """Swap different engines during runtime. Requires 'engine' property in model settings"""
 
+    is_engine_wrapper = True
+
     def __init__(self, send_message, options: dict = None):
         """Create dynamic engine class and load correct ASR engine"""
         super().__init__(send_message, options)
         # get engine from selected model (guaranteed)
         self._engine_name = self._asr_model_properties["engine"]
         self._current_proc = get_processor_instance(self._engine_name, send_message, options)
+        # processing durations are measured by current engine
+        self.timing = self._current_proc.timing
+
+    async def setup(self):
+        """Set up current engine"""
+        await self._current_proc.setup()
 
     async def process(self, chunk: bytes):
         """Process with current engine for selected model"""
@@ -104,6 +153,26 @@ class DynamicEngineSwap(EngineInterface):
         """Get current processor options"""
         return self._current_proc.get_options()
 
+    def register_audio_chunk(self, num_bytes: int):
+        """Track received audio in this and current processor"""
+        super().register_audio_chunk(num_bytes)
+        return self._current_proc.register_audio_chunk(num_bytes)
+
+    def register_audio_end(self):
+        """Track 'audioend' in this and current processor"""
+        super().register_audio_end()
+        self._current_proc.register_audio_end()
+
+    def release_model(self):
+        """Release model and session slot of this and current processor"""
+        super().release_model()
+        self._current_proc.release_model()
+
+    def set_send_message(self, send_message):
+        """Replace send message function of this and current processor"""
+        super().set_send_message(send_message)
+        self._current_proc.set_send_message(send_message)
+
 #--- FILE WRITER ---
 
 class WaveFileWriter(EngineInterface):
@@ -1,6 +1,7 @@
 """ASR engine module for Coqui: https://github.com/coqui-ai/STT"""
 
 import os
+import asyncio
 from timeit import default_timer as timer
 
 import numpy as np
@@ -8,11 +9,27 @@ from stt import Model
 
 from launch_setup import settings
 from engine_interface import EngineInterface, ModelNotFound
-from text_processor import TextToNumberProcessor, DateAndTimeOptimizer
+from model_manager import model_manager
 
 # TODO: logger configuration
 #logging.getLogger().setLevel(logging.WARNING)
 
+def load_model(asr_model_path, scorer = None):
+    """Load Coqui model (optionally with scorer file relative to model folder)"""
+    asr_model_file = (f"{asr_model_path}/model.tflite") # NOTE: currently we assume tflite
+    asr_scorer_file = (f"{asr_model_path}/{scorer}" if scorer else None)
+    # Make sure paths exist and load models
+    if not os.path.exists(asr_model_file):
+        raise ModelNotFound(f"ASR model file seems to be wrong: {asr_model_file}")
+    if asr_scorer_file and not os.path.exists(asr_scorer_file):
+        raise RuntimeError(f"ASR scorer file seems to be wrong: {asr_scorer_file}")
+    model = Model(asr_model_file)
+    if asr_scorer_file:
+        model.enableExternalScorer(asr_scorer_file)
+    return model
+
+model_manager.register_loader("coqui", load_model)
+
 class CoquiProcessor(EngineInterface):
     """Process chunks with Coqui"""
     def __init__(self, send_message, options: dict = None):
@@ -33,28 +50,12 @@ class CoquiProcessor(EngineInterface):
         # -- increase probability of certain words
         self._hot_words = options.get("hotWords", options.get("hot_words", None))
         # example (word: boost): self._hot_words = [{"test": 1.5}]
-        # Recognizer
-        asr_model_path = settings.asr_models_folder + self._asr_model_path
-        asr_model_file = (f"{asr_model_path}/model.tflite") # NOTE: currently we assume tflite
-        asr_scorer_file = (f"{asr_model_path}/{self._asr_model_scorer}"
-            if self._asr_model_scorer else None)
-        # Make sure paths exist and load models
-        if not os.path.exists(asr_model_file):
-            raise ModelNotFound(f"ASR model file seems to be wrong: {asr_model_file}")
-        if asr_scorer_file and not os.path.exists(asr_scorer_file):
-            raise RuntimeError(f"ASR scorer file seems to be wrong: {asr_scorer_file}")
-        self._model = Model(asr_model_file)
-        if asr_scorer_file:
-            self._model.enableExternalScorer(asr_scorer_file)
-        # Use hot words?
-        if self._hot_words and len(self._hot_words) > 0:
-            for word_boost in self._hot_words:
-                for word, boost in word_boost.items():
-                    self._model.addHotWord(word.strip(), float(boost))
-        # create
-        self._recognizer = self._model.createStream()
+        # Model and recognizer (see 'setup')
+        self._model = None
+        self._recognizer = None
         self._partial_result = {}
         self._last_partial_str = ""
+        self._sent_partial_str = ""
         self._final_result = {}
         # states - 0: waiting for input, 1: got partial result, 2: got final result, 3: closing
         self._state = 0
@@ -64,6 +65,28 @@ class CoquiProcessor(EngineInterface):
         #
         # TODO: GPU support ?
 
+    async def setup(self):
+        """Load model (shared by sessions if possible) and create recognizer"""
+        engine_name, asr_model_path, _ = self._asr_model_key
+        if self._hot_words and len(self._hot_words) > 0:
+            # Hot words modify the model so this session needs its own
+            self._model = await asyncio.get_running_loop().run_in_executor(
+                None, self._load_model_with_hot_words, asr_model_path)
+        else:
+            # Shared model (with custom scorer if requested)
+            self._model = await self.acquire_model(
+                (engine_name, asr_model_path, self._asr_model_scorer))
+        # create
+        self._recognizer = self._model.createStream()
+
+    def _load_model_with_hot_words(self, asr_model_path):
+        """Load private model of session and add hot words"""
+        model = load_model(asr_model_path, self._asr_model_scorer)
+        for word_boost in self._hot_words:
+            for word, boost in word_boost.items():
+                model.addHotWord(word.strip(), float(boost))
+        return model
+
     async def process(self, chunk: bytes):
         """Feed audio chunks to recognizer"""
         np_chunk = np.frombuffer(chunk, dtype=np.int16)
@@ -71,9 +94,7 @@ class CoquiProcessor(EngineInterface):
         if self._state == 3:
             pass
         elif chunk and len(chunk) > 0:
-            self._recognizer.feedAudioContent(np_chunk)
-            # Partial result
-            result = self._recognizer.intermediateDecodeWithMetadata(num_results=1)
+            result = await self.run_decoder(self._feed_and_decode, np_chunk)
             if result:
                 self._state = 1
                 await self._handle_partial_result(result)
@@ -81,17 +102,24 @@ class CoquiProcessor(EngineInterface):
         if self._silence_start > 0 and timer() - self._silence_start >= self._silence_threshold_s:
             # Silence detected
             #print("silence") # DEBUG
-            result = self._recognizer.finishStreamWithMetadata(self._alternatives)
+            result = await self.run_decoder(
+                self._recognizer.finishStreamWithMetadata, self._alternatives)
             self._state = 2
             self._silence_start = 0
             await self._handle_final_result(result)
             # Reset
             self._partial_result = {}
             self._last_partial_str = ""
+            self._sent_partial_str = ""
             # Create new recognizer and feed last chunk so we don't miss stuff
             self._recognizer = self._model.createStream() # create a new one
             self._recognizer.feedAudioContent(np_chunk)
 
+    def _feed_and_decode(self, np_chunk):
+        """Feed audio to recognizer and get partial result"""
+        self._recognizer.feedAudioContent(np_chunk)
+        return self._recognizer.intermediateDecodeWithMetadata(num_results=1)
+
     async def finish_processing(self):
         """Wait for last process and end"""
         # End?
@@ -99,6 +127,7 @@ class CoquiProcessor(EngineInterface):
 
     async def close(self):
         """Reset recognizer and remove"""
+        self.release_model()
         #if self._recognizer:
             #self._recognizer.freeStream()   # this will throw an error if closed already
             #self._recognizer = None
@@ -112,6 +141,8 @@ class CoquiProcessor(EngineInterface):
             "scorer": self._asr_model_scorer,
             "samplerate": self._sample_rate,
             "optimizeFinalResult": self._optimize_final_result,
+            "optimizePartialResults": self._optimize_partial_results,
+            "timing": self._timing_features,
             "alternatives": self._alternatives,
             "continuous": self._continuous_mode,
             "words": self._return_words
@@ -135,6 +166,9 @@ class CoquiProcessor(EngineInterface):
         elif partial_str:
             self._silence_start = 0
             self._last_partial_str = partial_str
+        # Not sent yet? (a partial can be delayed by 'partial_interval_ms' of model)
+        if partial_str and partial_str != self._sent_partial_str and self.is_partial_due():
+            self._sent_partial_str = partial_str
             # Note: we disable words and alternatives for partial results
             norm_result = CoquiProcessor.normalize_and_build_result(
                 result, partial_str, alternatives = int(1), return_words = False)
@@ -144,6 +178,7 @@ class CoquiProcessor(EngineInterface):
 
     async def _handle_final_result(self, result, skip_send = False):
         """Handle a final result"""
+        self.reset_partial_optimizer()
         if result:
             #print("FINAL: ", result)
             norm_result = CoquiProcessor.normalize_and_build_result(
@@ -172,7 +207,8 @@ class CoquiProcessor(EngineInterface):
             pass
         else:
             # Request final
-            result = self._recognizer.finishStreamWithMetadata(self._alternatives)
+            result = await self.run_decoder(
+                self._recognizer.finishStreamWithMetadata, self._alternatives)
             await self._handle_final_result(result, skip_send=True)
             await self._send(self._final_result, True)
 
@@ -187,11 +223,11 @@ class CoquiProcessor(EngineInterface):
         transcript = json_result.get("text", "")
         # Post-processing?
         if is_final and transcript and self._optimize_final_result:
-            # Optimize final transcription
-            text2num_proc = TextToNumberProcessor(self._language)
-            dt_optimizer = DateAndTimeOptimizer(self._language)
-            transcript = text2num_proc.process(transcript)
-            transcript = dt_optimizer.process(transcript)
+            # Optimize final transcription (off the event loop)
+            transcript = await self.optimize_final_transcript(transcript)
+        elif not is_final and transcript and self._optimize_partial_results:
+            # Optimize partial transcription (only changed words)
+            transcript = self.optimize_partial_transcript(transcript)
         await self.send_transcript(
             transcript=transcript,
             is_final=is_final,
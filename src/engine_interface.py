@@ -1,9 +1,17 @@
 """Chunk processor engine interface"""
 
 import re
+import math
+import time
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
 from launch_setup import settings
 from socket_messages import SocketTranscriptMessage, SocketErrorMessage
+from text_processor import get_text_pipeline, PartialResultOptimizer
+from model_manager import model_manager
+import metrics
 
 class EngineNotFound(Exception):
     """Exception thrown when ASR engine was unknown"""
@@ -11,8 +19,88 @@ class EngineNotFound(Exception):
 class ModelNotFound(Exception):
     """Exception thrown when model does not exist"""
 
+class ModelBusy(Exception):
+    """Exception thrown when model has reached its max. number of sessions"""
+
+class InvalidOptions(Exception):
+    """Exception thrown when options of a session are invalid"""
+
+# Thread pool for text post-processing, shared by all sessions (see 'get_text_executor')
+_text_executor = None
+
+def get_text_executor():
+    """Get bounded thread pool for text post-processing (created on first use)
+    or None if 'text_processing_threads' is 0 (process on event loop)"""
+    global _text_executor
+    if _text_executor is None and settings.text_processing_threads > 0:
+        _text_executor = ThreadPoolExecutor(settings.text_processing_threads,
+            thread_name_prefix="text-processing")
+    return _text_executor
+
+def shutdown_text_executor():
+    """Stop thread pool for text post-processing (e.g. on server shutdown)"""
+    global _text_executor
+    if _text_executor is not None:
+        _text_executor.shutdown(wait=False)
+        _text_executor = None
+
+# Thread pools for audio decoding by (model name, 'decode_threads'), shared by sessions of a model
+_decode_executors = {}
+
+def get_decode_executor(model_name: str, threads: int):
+    """Get thread pool for audio decoding of a model (created on first use)
+    or None if 'decode_threads' is 0 (decode on event loop)"""
+    if threads <= 0:
+        return None
+    executor = _decode_executors.get((model_name, threads))
+    if executor is None:
+        executor = _decode_executors[(model_name, threads)] = ThreadPoolExecutor(threads,
+            thread_name_prefix="decoding")
+    return executor
+
+def get_executor_queue_depths():
+    """Get number of tasks waiting in thread pools for text processing and decoding"""
+    # NOTE: '_work_queue' is internal to 'ThreadPoolExecutor' but has been stable for years
+    text_queue = _text_executor._work_queue.qsize() if _text_executor is not None else 0
+    decode_queue = sum(executor._work_queue.qsize() for executor in _decode_executors.values())
+    return {("text",): text_queue, ("decoding",): decode_queue}
+
+metrics.executor_queue_depth.function = get_executor_queue_depths
+
+def shutdown_decode_executors():
+    """Stop thread pools for audio decoding (e.g. on server shutdown)"""
+    for executor in _decode_executors.values():
+        executor.shutdown(wait=False)
+    _decode_executors.clear()
+
+class SessionTiming():
+    """Processing durations of a session by stage (e.g. 'postprocessing')"""
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage: str, duration_s: float):
+        """Add duration (seconds) of one run of a stage"""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {
+                "count": 0, "total_ms": 0.0, "last_ms": 0.0, "max_ms": 0.0}
+        duration_ms = duration_s * 1000
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["last_ms"] = duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+
+    def get_summary(self):
+        """Get copy of all stage stats (durations in ms, rounded)"""
+        return {stage: {key: round(val, 3) for key, val in stats.items()}
+            for stage, stats in self.stages.items()}
+
 class EngineInterface():
     """Interface for chunk processor engines"""
+
+    # Engines that only wrap another engine (e.g. dynamic engine swap) don't count as session
+    is_engine_wrapper = False
+
     def __init__(self, send_message = None, options: dict = None):
         # Message and state
         self.send_message = send_message
@@ -24,6 +112,9 @@ class EngineInterface():
             options = {}
         # -- almost all engines work with 16khz mono
         self._sample_rate = options.get("samplerate", float(16000))
+        if (isinstance(self._sample_rate, bool) or not isinstance(self._sample_rate, (int, float))
+                or not math.isfinite(self._sample_rate) or self._sample_rate <= 0):
+            raise InvalidOptions(f"Invalid 'samplerate': {self._sample_rate!r}")
         # -- "de-DE", "en-US", etc. (could be: "de_DE", "de", ...)
         self._language = options.get("language")
         if self._language:
@@ -43,55 +134,88 @@ class EngineInterface():
         self._continuous_mode = options.get("continuous", False)
         # -- use text processors to optimize final result
         self._optimize_final_result = options.get("optimizeFinalResult", False)
+        # -- use text processors to optimize partial results (incrementally)
+        self._optimize_partial_results = options.get("optimizePartialResults", False)
+        # -- add timing info (latency, decoding time, ...) to features of results
+        self._timing_features = options.get("timing", False)
 
-        # Validate model
+        # Validate model (via lookup tables of settings)
+        # -- no given model or language -> just take the first one available
         model_index = 0
         if self._asr_model_name:
-            if self._asr_model_name in settings.asr_model_names:
-                # Reset language etc. because model has higher priority
-                model_index = settings.asr_model_names.index(self._asr_model_name)
-            else:
+            # Reset language etc. because model has higher priority
+            model_index = settings.get_model_index_by_name(self._asr_model_name)
+            if model_index is None:
                 # Given model not found
                 raise ModelNotFound(f"ASR model name unknown: '{self._asr_model_name}'")
         elif self._language:
             # Do we have a language match?
-            if self._language not in settings.asr_model_languages:
+            model_index = settings.get_model_index_by_language(self._language, self._asr_task)
+            if model_index is None:
                 # Take the first entry that has the same base language
-                base_lang_fits = [l for l in settings.asr_model_languages
-                    if l.startswith(self.language_code_short)]
-                if base_lang_fits:
+                base_lang_fit = settings.get_model_language_by_base(self.language_code_short)
+                if base_lang_fit:
                     # overwrite given full language
-                    self._language = base_lang_fits[0]
-                    #model_index = settings.asr_model_languages.index(base_lang_fits[0])
+                    self._language = base_lang_fit
+                    # first model that fits language and task or first that fits language
+                    model_index = settings.get_model_index_by_language(
+                        self._language, self._asr_task)
                 else:
                     # No language match, not even base language
                     raise ModelNotFound(f"No ASR model for language: {self.language_code_short}")
-            # Do we have a task?
-            if self._asr_task:
-                model_index = None
-                # Find first model that fits language and task
-                for index, prop in enumerate(settings.asr_model_properties):
-                    if settings.asr_model_languages[index] == self._language:
-                        if "task" in prop and prop["task"] == self._asr_task:
-                            model_index = index
-                            break
-                if model_index is None:
-                    # Fallback to first model that fits language
-                    model_index = settings.asr_model_languages.index(self._language)
-            else:
-                # Use first model that fits language
-                model_index = settings.asr_model_languages.index(self._language)
         elif self._asr_task:
             raise ModelNotFound(f"No language defined for task: {self._asr_task}")
-        else:
-            # No given model or language -> Just take the first one available
-            model_index = 0
         # apply index again to all parameters
         self._asr_model_name = settings.asr_model_names[model_index]
         self._language = settings.asr_model_languages[model_index]
         self._asr_model_path = settings.asr_model_paths[model_index]
         self._asr_model_properties = settings.asr_model_properties[model_index]
+        # -- key of shared model (see 'acquire_model') and engine of model
+        self._asr_model_key = settings.get_model_key(model_index)
+        self.engine_name = self._asr_model_key[0]
+        self._model_entry = None
+
+        # Shared text post-processing (e.g. text2num) for final results
+        self._text_pipeline = (get_text_pipeline(self._language)
+            if self._optimize_final_result else None)
+        # -- and incremental post-processing of partial results (keeps state of last result)
+        self._partial_optimizer = (PartialResultOptimizer(
+            get_text_pipeline(self._language, use_cache=False))
+            if self._optimize_partial_results else None)
+        # Processing durations and audio timestamps of this session
+        self.timing = SessionTiming()
+        self.audio_received_s = 0
+        self._first_chunk_time = None
+        self._last_chunk_time = None
+        self._first_partial_time = None
+        self._audio_end_time = None
+        self._decoding_ms_sent = 0
 
+        # Resource profile of model (see 'MODEL_PROPERTY_TYPES' of settings)
+        # -- min. time between partial results
+        self._partial_interval_s = self._asr_model_properties.get("partial_interval_ms", 0) / 1000
+        self._last_partial_time = 0
+        # -- decoding threads shared by all sessions of this model
+        self._decode_executor = get_decode_executor(self._asr_model_name,
+            self._asr_model_properties.get("decode_threads", 0))
+        # -- max. sessions (slot is released on close or when processor is discarded)
+        self._session_slot = None
+        if not self.is_engine_wrapper:
+            if not model_manager.open_session(self._asr_model_name,
+                    self._asr_model_properties.get("max_sessions", 0)):
+                metrics.sessions_rejected.inc(self.engine_name, self._asr_model_name, "busy")
+                raise ModelBusy(f"Max. number of sessions reached for model: "
+                    f"'{self._asr_model_name}'")
+            self._session_slot = weakref.finalize(self,
+                model_manager.close_session, self._asr_model_name)
+
+    @property
+    def model_name(self):
+        """Name of ASR model of this session"""
+        return self._asr_model_name
+
+    async def setup(self):
+        """Load model and create recognizer (awaited once after creation, before first chunk)"""
     async def process(self, chunk: bytes):
         """Process chunk"""
     async def finish_processing(self):
@@ -102,13 +226,131 @@ class EngineInterface():
         """Return possible options as object (optionally) with defaults"""
         return {}
 
+    def set_send_message(self, send_message):
+        """Replace send message function, e.g. when a session is resumed (None = mute)"""
+        self.send_message = send_message
+
+    async def optimize_final_transcript(self, transcript: str):
+        """Run text post-processing of final result in thread pool to keep the event loop free.
+        Results stay in order because each engine waits for one result before sending the next.
+        """
+        start = time.perf_counter()
+        executor = get_text_executor()
+        if executor is None:
+            transcript = self._text_pipeline.process(transcript)
+        else:
+            transcript = await asyncio.get_running_loop().run_in_executor(
+                executor, self._text_pipeline.process, transcript)
+        duration = time.perf_counter() - start
+        self.timing.add("postprocessing", duration)
+        metrics.postprocessing_seconds.observe(duration, "final")
+        return transcript
+
+    def optimize_partial_transcript(self, transcript: str):
+        """Run incremental text post-processing of partial result. Usually only the
+        new words are processed, so this runs on the event loop (no thread hand-off).
+        """
+        start = time.perf_counter()
+        transcript = self._partial_optimizer.process(transcript)
+        duration = time.perf_counter() - start
+        self.timing.add("partial_postprocessing", duration)
+        metrics.postprocessing_seconds.observe(duration, "partial")
+        return transcript
+
+    def reset_partial_optimizer(self):
+        """Forget state of last partial result (call after final result)"""
+        if self._partial_optimizer is not None:
+            self._partial_optimizer.reset()
+
+    async def acquire_model(self, model_key: tuple = None):
+        """Get shared model of this session from model manager (loads model in a thread
+        on first use)"""
+        self._model_entry = await model_manager.acquire(model_key or self._asr_model_key)
+        return self._model_entry.model
+
+    def release_model(self):
+        """Give back shared model and session slot (e.g. on close), can be called more than once"""
+        if self._model_entry is not None:
+            model_manager.release(self._model_entry)
+            self._model_entry = None
+        if self._session_slot is not None:
+            self._session_slot()
+
+    async def run_decoder(self, function, *args):
+        """Run decoder function (e.g. feed audio) in thread pool of model if 'decode_threads'
+        is set, else on event loop"""
+        start = time.perf_counter()
+        if self._decode_executor is None:
+            result = function(*args)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._decode_executor, function, *args)
+        duration = time.perf_counter() - start
+        self.timing.add("decoding", duration)
+        metrics.decode_seconds.observe(duration, self.engine_name)
+        return result
+
+    def is_partial_due(self):
+        """Check 'partial_interval_ms' of model before sending a partial result"""
+        if self._partial_interval_s <= 0:
+            return True
+        now = time.monotonic()
+        if now - self._last_partial_time < self._partial_interval_s:
+            return False
+        self._last_partial_time = now
+        return True
+
+    def register_audio_chunk(self, num_bytes: int):
+        """Track received audio (timing info and metrics), returns duration of chunk (s)"""
+        now = time.perf_counter()
+        if self._first_chunk_time is None:
+            self._first_chunk_time = now
+        self._last_chunk_time = now
+        chunk_s = num_bytes / (2 * self._sample_rate)   # 16bit mono
+        self.audio_received_s += chunk_s
+        return chunk_s
+
+    def register_audio_end(self):
+        """Client sent 'audioend' (start of final result latency)"""
+        self._audio_end_time = time.perf_counter()
+
+    def get_timing_features(self, is_final = False):
+        """Get timing info for result features (durations in ms): audio received,
+        decoding time since last result, time since last chunk, time-to-first-partial
+        and for final results latency after 'audioend' and all stages of the session"""
+        now = time.perf_counter()
+        if not is_final and self._first_partial_time is None:
+            self._first_partial_time = now
+        decoding = self.timing.stages.get("decoding")
+        decoding_ms = decoding["total_ms"] if decoding else 0
+        timing = {
+            "audio_received_ms": round(self.audio_received_s * 1000, 1),
+            "decode_ms": round(decoding_ms - self._decoding_ms_sent, 3),
+            "since_last_chunk_ms": (round((now - self._last_chunk_time) * 1000, 3)
+                if self._last_chunk_time is not None else None),
+            "first_partial_ms": (
+                round((self._first_partial_time - self._first_chunk_time) * 1000, 3)
+                if self._first_partial_time is not None and self._first_chunk_time is not None
+                else None)
+        }
+        self._decoding_ms_sent = decoding_ms
+        if is_final:
+            timing["final_latency_ms"] = (round((now - self._audio_end_time) * 1000, 3)
+                if self._audio_end_time is not None else None)
+            timing["stages"] = self.timing.get_summary()
+        return timing
+
     async def send_transcript(self,
         transcript, is_final = False, confidence = -1, features = None, alternatives = None):
-        """Send transcript result"""
+        """Send transcript result (with timing info if requested via 'timing' option)"""
+        if self._timing_features:
+            features = dict(features) if features else {}
+            features["timing"] = self.get_timing_features(is_final)
         if self.send_message is not None:
             msg = SocketTranscriptMessage(
                 transcript, is_final, confidence, features, alternatives)
             await self.send_message(msg)
+            metrics.results_sent.inc(self.engine_name, "final" if is_final else "partial")
 
     async def on_before_close(self):
         """Run before close for any required extra action"""
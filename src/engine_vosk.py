@@ -2,12 +2,13 @@
 
 import os
 import json
+import asyncio
 
 from vosk import Model, SpkModel, KaldiRecognizer, SetLogLevel
 
 from launch_setup import settings
 from engine_interface import EngineInterface, ModelNotFound
-from text_processor import TextToNumberProcessor, DateAndTimeOptimizer
+from model_manager import model_manager
 
 # Vosk log level - -1: off, 0: normal, 1: more verbose
 if settings.log_level == "warning" or settings.log_level == "error":
@@ -17,6 +18,14 @@ elif settings.log_level == "debug":
 else:
     SetLogLevel(0)
 
+def load_model(asr_model_path, scorer = None):
+    """Load Vosk model to share it via model manager (scorer is not used)"""
+    if not os.path.exists(asr_model_path):
+        raise ModelNotFound("ASR model path seems to be wrong")
+    return Model(asr_model_path)
+
+model_manager.register_loader("vosk", load_model)
+
 class VoskProcessor(EngineInterface):
     """Process chunks with Vosk"""
     def __init__(self, send_message, options: dict = None):
@@ -41,29 +50,14 @@ class VoskProcessor(EngineInterface):
                 and self._alternatives == 0)
         else:
             self._speaker_detection = False
-        # Recognizer
-        asr_model_path = settings.asr_models_folder + self._asr_model_path
         # Speaker model
-        spk_model_path = settings.speaker_models_folder + settings.speaker_model_paths[0]
-        # Make sure paths exist and load models
-        if not os.path.exists(asr_model_path):
-            raise ModelNotFound("ASR model path seems to be wrong")
-        if self._speaker_detection and not os.path.exists(spk_model_path):
+        self._spk_model_path = settings.speaker_models_folder + settings.speaker_model_paths[0]
+        # Make sure paths exist (models are loaded in 'setup')
+        if self._speaker_detection and not os.path.exists(self._spk_model_path):
             raise RuntimeError("Speaker model path seems to be wrong")
-        self._model = Model(asr_model_path)
-        if self._speaker_detection:
-            self._spk_model = SpkModel(spk_model_path)
-        # Use phrase list?
-        if self._phrase_list and len(self._phrase_list) > 0:
-            self._recognizer = KaldiRecognizer(self._model, self._sample_rate,
-                json.dumps(self._phrase_list, ensure_ascii=False))
-        else:
-            self._recognizer = KaldiRecognizer(self._model, self._sample_rate)
-        self._recognizer.SetMaxAlternatives(self._alternatives)
-        if self._return_words:
-            self._recognizer.SetWords(True)
-        if self._speaker_detection:
-            self._recognizer.SetSpkModel(self._spk_model)
+        self._model = None
+        self._spk_model = None
+        self._recognizer = None
         self._partial_result = {}
         self._last_partial_str = ""
         self._final_result = {}
@@ -78,12 +72,30 @@ class VoskProcessor(EngineInterface):
         #     GpuInstantiate()
         # pool = concurrent.futures.ThreadPoolExecutor(initializer=thread_init)
 
+    async def setup(self):
+        """Load models (ASR model is shared by sessions) and create recognizer"""
+        self._model = await self.acquire_model()
+        if self._speaker_detection:
+            self._spk_model = await asyncio.get_running_loop().run_in_executor(
+                None, SpkModel, self._spk_model_path)
+        # Use phrase list?
+        if self._phrase_list and len(self._phrase_list) > 0:
+            self._recognizer = KaldiRecognizer(self._model, self._sample_rate,
+                json.dumps(self._phrase_list, ensure_ascii=False))
+        else:
+            self._recognizer = KaldiRecognizer(self._model, self._sample_rate)
+        self._recognizer.SetMaxAlternatives(self._alternatives)
+        if self._return_words:
+            self._recognizer.SetWords(True)
+        if self._speaker_detection:
+            self._recognizer.SetSpkModel(self._spk_model)
+
     async def process(self, chunk: bytes):
         """Feed audio chunks to recognizer"""
         result = None
         if self._state == 3:
             pass
-        elif self._recognizer.AcceptWaveform(chunk):
+        elif await self.run_decoder(self._recognizer.AcceptWaveform, chunk):
             # Silence detected
             result = self._recognizer.Result()
             self._state = 2
@@ -104,6 +116,7 @@ class VoskProcessor(EngineInterface):
 
     async def close(self):
         """Reset recognizer and remove"""
+        self.release_model()
         #if self._recognizer:
             #self._recognizer.Reset()   # this throws an error!? Maye because its closed already?
             #self._recognizer = None
@@ -116,6 +129,8 @@ class VoskProcessor(EngineInterface):
             "model": self._asr_model_name,
             "samplerate": self._sample_rate,
             "optimizeFinalResult": self._optimize_final_result,
+            "optimizePartialResults": self._optimize_partial_results,
+            "timing": self._timing_features,
             "alternatives": self._alternatives,
             "continuous": self._continuous_mode,
             "words": self._return_words,
@@ -131,7 +146,9 @@ class VoskProcessor(EngineInterface):
 
     async def _handle_partial_result(self, result):
         """Handle a partial result"""
-        if result and self._last_partial_str != result:
+        # Unchanged or too early ('partial_interval_ms' of model)? Then we skip it (without
+        # remembering it, so the next chunk can send it if the recognizer keeps returning it)
+        if result and self._last_partial_str != result and self.is_partial_due():
             self._last_partial_str = result
             # Note: we disable words and alt. for partial results (not supported anyway)
             norm_result = VoskProcessor.normalize_result_format(
@@ -142,6 +159,7 @@ class VoskProcessor(EngineInterface):
 
     async def _handle_final_result(self, result, skip_send = False):
         """Handle a final result"""
+        self.reset_partial_optimizer()
         if result:
             #print("FINAL: ", result)
             norm_result = VoskProcessor.normalize_result_format(
@@ -170,7 +188,7 @@ class VoskProcessor(EngineInterface):
             pass
         else:
             # Request final
-            result = self._recognizer.FinalResult()
+            result = await self.run_decoder(self._recognizer.FinalResult)
             await self._handle_final_result(result, skip_send=True)
             await self._send(self._final_result, True)
 
@@ -187,11 +205,11 @@ class VoskProcessor(EngineInterface):
         transcript = json_result.get("text", "")
         # Post-processing?
         if is_final and transcript and self._optimize_final_result:
-            # Optimize final transcription
-            text2num_proc = TextToNumberProcessor(self._language)
-            dt_optimizer = DateAndTimeOptimizer(self._language)
-            transcript = text2num_proc.process(transcript)
-            transcript = dt_optimizer.process(transcript)
+            # Optimize final transcription (off the event loop)
+            transcript = await self.optimize_final_transcript(transcript)
+        elif not is_final and transcript and self._optimize_partial_results:
+            # Optimize partial transcription (only changed words)
+            transcript = self.optimize_partial_transcript(transcript)
         await self.send_transcript(
             transcript=transcript,
             is_final=is_final,
@@ -1,32 +1,123 @@
 """Module to handle HTTP API calls like settings etc."""
 
-from fastapi import Response, status
+import secrets
+from typing import Optional
+
+from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from uvicorn.config import logger
 
-from launch_setup import settings
+from settings import SettingsError
+from launch_setup import settings, reload_settings
+from model_manager import model_manager, get_rss_bytes
 
 class SettingsRequest(BaseModel):
-    """Request to modify server settings"""
-    language: str = "de-DE"
+    """Admin request to modify server settings or manage models (requires 'admin_token')"""
+    action: Optional[str] = None    # reload, models, preload, pin, unpin, unload_idle
+    token: Optional[str] = None
+    model: Optional[str] = None     # model name for preload, pin, unpin
+    idle_s: float = 0               # min. idle time for unload_idle
 
 class HttpApiEndpoint:
     """HTTP endpoint handler"""
 
-    def handle_settings_req_get(self):
-        """Handle settings GET request"""
-        data = {
-            "result": "success",
-            "settings": settings.get_settings_response()
+    def __init__(self):
+        # Build settings response once at start
+        settings.get_settings_response_json()
+
+    def handle_settings_req_get(self, request: Request):
+        """Handle settings GET request (supports ETag and 'If-None-Match')"""
+        content, etag = settings.get_settings_response_json()
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache"
         }
-        response = JSONResponse(content=data)
-        return response
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=content, media_type="application/json", headers=headers)
 
     def handle_settings_req_post(self, req: SettingsRequest, response: Response):
-        """Handle settings POST request"""
-        response = JSONResponse({"error": (
-            "Not implemented. "
-            "Please use WebSocket 'welcome' message for session settings instead."
-        )})
-        response.status_code=status.HTTP_501_NOT_IMPLEMENTED
-        return response
+        """Handle settings POST request (admin actions authenticated via 'admin_token')"""
+        if not req.action:
+            return error_response(status.HTTP_400_BAD_REQUEST, (
+                "Missing 'action'. "
+                "Please use WebSocket 'welcome' message for session settings instead."
+            ))
+        if not settings.admin_token:
+            return error_response(status.HTTP_403_FORBIDDEN,
+                "Admin actions are disabled (no 'admin_token' in server settings).")
+        if not req.token or not secrets.compare_digest(
+                req.token.encode("utf-8"), settings.admin_token.encode("utf-8")):
+            logger.warning("Admin action '%s' failed to authenticate!", req.action)
+            return error_response(status.HTTP_401_UNAUTHORIZED, "Invalid admin token.")
+        if req.action == "reload":
+            try:
+                summary = reload_settings()
+            except SettingsError as err:
+                logger.error("Failed to reload settings: %s", err)
+                return error_response(status.HTTP_400_BAD_REQUEST, str(err))
+            logger.info("Settings reloaded: %s", summary)
+            return {"result": "success", "reload": summary}
+        if req.action == "models":
+            return self.get_models_response()
+        if req.action == "unload_idle":
+            unloaded = model_manager.unload_idle(req.idle_s)
+            logger.info("Admin action - Unloaded idle models: %s", unloaded)
+            return {"result": "success", "unloaded": [
+                {"engine": key[0], "path": key[1], "scorer": key[2]} for key in unloaded]}
+        if req.action in ("preload", "pin", "unpin"):
+            return self.handle_model_action(req)
+        return error_response(status.HTTP_400_BAD_REQUEST, f"Unknown action: '{req.action}'")
+
+    def handle_model_action(self, req: SettingsRequest):
+        """Preload, pin or unpin a model of the settings by name"""
+        model_index = settings.get_model_index_by_name(req.model)
+        if model_index is None:
+            return error_response(status.HTTP_404_NOT_FOUND,
+                f"ASR model name unknown: '{req.model}'")
+        model_key = settings.get_model_key(model_index)
+        if not model_manager.has_loader(model_key[0]):
+            return error_response(status.HTTP_400_BAD_REQUEST,
+                f"Models of engine '{model_key[0]}' are not managed")
+        if req.action == "preload":
+            model_manager.load_in_background(model_key)
+        elif not model_manager.pin(model_key, req.action == "pin"):
+            return error_response(status.HTTP_404_NOT_FOUND,
+                f"ASR model is not loaded: '{req.model}'")
+        logger.info("Admin action - %s: %s", req.action, req.model)
+        return self.get_models_response()
+
+    def get_models_response(self):
+        """Get state of loaded models (with names of settings) and process memory"""
+        names_by_key = {}
+        for name, (key, _, _) in settings.get_models_by_name().items():
+            names_by_key.setdefault(key, []).append(name)
+        models = model_manager.get_status()
+        for model in models:
+            model["names"] = names_by_key.get(
+                (model["engine"], model["path"], model["scorer"]), [])
+        rss_bytes = get_rss_bytes()
+        return {
+            "result": "success",
+            "models": models,
+            "rss_mb": round(rss_bytes / 1048576, 1) if rss_bytes is not None else None
+        }
+
+def error_response(status_code: int, error: str):
+    """Build JSON error response"""
+    response = JSONResponse({"result": "fail", "error": error})
+    response.status_code = status_code
+    return response
+
+def etag_matches(if_none_match: str, etag: str):
+    """Check if ETag is part of 'If-None-Match' header value"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
@@ -4,6 +4,7 @@ import sys
 import argparse
 
 from settings import SettingsFile
+from model_manager import model_manager
 
 # Run arguments
 argv=sys.argv[1:]
@@ -24,20 +25,55 @@ ap.add_argument("-c", "--code", action="store_true",
     help="Automatic reload of code changes")
 args = ap.parse_args(argv)
 
+def load_settings(file_path = None, raise_errors = False):
+    """Load settings file and overwrite some file settings with arguments"""
+    settings_file = SettingsFile(file_path, raise_errors)
+    settings_file.code_reload = args.code    # this is only accessible via command line
+    if args.port is not None:
+        settings_file.port = int(args.port)
+    if args.engine is not None:
+        settings_file.asr_engine = args.engine
+    if args.model is not None:
+        settings_file.asr_model_paths = [args.model]
+    if args.recordings is not None:
+        settings_file.recordings_path = args.recordings
+    if args.log_level is not None:
+        settings_file.log_level = args.log_level
+    # make sure cached responses include the overwrites
+    settings_file.invalidate_settings_response()
+    return settings_file
+
+def reload_settings():
+    """Read active settings file again and apply changes at runtime (e.g. users, models).
+    Models that changed are retired or loaded in background, sessions keep their models.
+    Returns summary of changes, raises 'SettingsError' if new file is invalid."""
+    new_settings = load_settings(settings.active_settings_file, raise_errors=True)
+    old_models = settings.get_models_by_name()
+    restart_required = settings.update_from(new_settings)
+    summary = model_manager.apply_models(old_models, settings.get_models_by_name())
+    summary["restart_required"] = restart_required
+    summary["models_loading"] += preload_models()
+    return summary
+
+def preload_models():
+    """Load models with property 'preload' or 'pin' in background and apply 'pin'.
+    Returns names of models that started loading."""
+    loading = []
+    for name, (model_key, _, _) in settings.get_models_by_name().items():
+        properties = settings.asr_model_properties[settings.get_model_index_by_name(name)]
+        if not model_manager.has_loader(model_key[0]):
+            continue
+        if (properties.get("preload") or properties.get("pin")) and (
+                not model_manager.is_loaded(model_key)):
+            loading.append(name)
+        if "pin" in properties:
+            model_manager.pin(model_key, properties["pin"])
+        if properties.get("preload"):
+            model_manager.load_in_background(model_key)
+    return loading
+
 # Load settings
-settings = SettingsFile(args.settings)
-# overwrite some file settings with arguments
-settings.code_reload = args.code    # this is only accessible via command line
-if args.port is not None:
-    settings.port = int(args.port)
-if args.engine is not None:
-    settings.asr_engine = args.engine
-if args.model is not None:
-    settings.asr_model_paths = [args.model]
-if args.recordings is not None:
-    settings.recordings_path = args.recordings
-if args.log_level is not None:
-    settings.log_level = args.log_level
+settings = load_settings(args.settings)
 
 #use Fast API logger here? How? ^^
 print(f"SEPIA STT Server - Settings file used: '{settings.active_settings_file}'")
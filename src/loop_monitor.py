@@ -0,0 +1,110 @@
+"""Event loop lag monitor and watchdog that logs the stack of code blocking the loop"""
+
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+
+from uvicorn.config import logger
+
+import metrics
+
+# Time between two lag samples (s) and number of samples used for percentiles (last minute)
+SAMPLE_INTERVAL_S = 0.1
+WINDOW_SIZE = 600
+
+class LoopMonitor:
+    """Sample event loop lag continuously (delay of a periodic task) and log the stack
+    of the loop thread via watchdog thread when the loop is blocked longer than 'stall_s'"""
+    def __init__(self, stall_s: float):
+        self.stall_s = stall_s
+        self._samples = deque(maxlen=WINDOW_SIZE)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id = None
+        self._task = None
+        self._watchdog = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start sampler on running loop and watchdog thread (call from loop thread)"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        metrics.loop_lag_quantiles.function = self.get_quantiles_metric
+
+    def stop(self):
+        """Stop sampler and watchdog"""
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_percentiles(self):
+        """Get lag percentiles of recent samples in ms (None if there are no samples yet)"""
+        samples = sorted(self._samples)
+        if not samples:
+            return None
+        def percentile(fraction):
+            return round(samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000, 3)
+        return {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99),
+            "max": round(samples[-1] * 1000, 3)}
+
+    def get_quantiles_metric(self):
+        """Get lag percentiles in seconds for metrics (by quantile label)"""
+        percentiles = self.get_percentiles()
+        if percentiles is None:
+            return {}
+        return {("0.5",): percentiles["p50"] / 1000, ("0.9",): percentiles["p90"] / 1000,
+            ("0.99",): percentiles["p99"] / 1000}
+
+    async def _sample_loop(self):
+        """Sleep for a fixed interval and measure how late the loop wakes us up"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(SAMPLE_INTERVAL_S)
+            lag = max(0, loop.time() - start - SAMPLE_INTERVAL_S)
+            self._last_beat = time.monotonic()
+            self._samples.append(lag)
+            metrics.loop_lag.observe(lag)
+
+    def _watch(self):
+        """Watchdog thread: log stack of loop thread once per stall"""
+        reported_beat = None
+        while not self._stop_event.wait(self.stall_s / 2):
+            last_beat = self._last_beat
+            blocked_s = time.monotonic() - last_beat - SAMPLE_INTERVAL_S
+            if blocked_s < self.stall_s or reported_beat == last_beat:
+                continue
+            reported_beat = last_beat
+            metrics.loop_stalls.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)  # pylint: disable=protected-access
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "-"
+            logger.warning("LoopMonitor - Event loop blocked for more than %.0fms, stack:\n%s",
+                blocked_s * 1000, stack)
+
+# Shared instance, created by 'start_loop_monitor'
+loop_monitor = None
+
+def start_loop_monitor(stall_ms: int):
+    """Start monitor on running loop (does nothing if 'stall_ms' is 0)"""
+    global loop_monitor
+    if stall_ms <= 0:
+        return None
+    loop_monitor = LoopMonitor(stall_ms / 1000)
+    loop_monitor.start()
+    return loop_monitor
+
+def get_loop_lag_percentiles():
+    """Get lag percentiles in ms of running monitor or None"""
+    return loop_monitor.get_percentiles() if loop_monitor is not None else None
+
+def stop_loop_monitor():
+    """Stop monitor (e.g. on server shutdown)"""
+    if loop_monitor is not None:
+        loop_monitor.stop()
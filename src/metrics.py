@@ -0,0 +1,196 @@
+"""Server metrics (counters, gauges, histograms) in Prometheus text format for '/metrics'"""
+
+import bisect
+import threading
+
+# Metrics are only recorded if enabled (see 'set_enabled'), else every call returns at once
+_enabled = False
+_registry = []
+
+# Default histogram buckets (seconds)
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def set_enabled(enabled: bool):
+    """Turn recording of metrics on or off"""
+    global _enabled
+    _enabled = enabled
+
+def is_enabled():
+    """Check if metrics are recorded"""
+    return _enabled
+
+def format_labels(label_names: tuple, label_values: tuple, extra: str = ""):
+    """Build label string, e.g.: {engine="vosk",model="abc"}"""
+    labels = [f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+def escape_label_value(value):
+    """Escape label value for text format"""
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+def format_value(value):
+    """Format number for text format"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+class Metric:
+    """Base class of all metrics with name, help text and label names. Optionally the values
+    are read via 'function' when metrics are rendered (returns value or dict: label values -> value)."""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), function = None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.function = function
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self):
+        """Get metric in text format (list of lines)"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        for label_values, value in self.get_values().items():
+            lines.append(f"{self.name}{format_labels(self.label_names, label_values)} "
+                f"{format_value(value)}")
+        return lines
+
+    def get_values(self):
+        """Get copy of values by label values (calls 'function' if given)"""
+        if self.function is not None:
+            values = self.function()
+            return values if isinstance(values, dict) else {(): values}
+        with self._lock:
+            return dict(self._values)
+
+class Counter(Metric):
+    """Value that only goes up, e.g. number of sessions"""
+    metric_type = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+        """Increase counter of given labels"""
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+class Gauge(Metric):
+    """Value that goes up and down, e.g. active sessions"""
+    metric_type = "gauge"
+
+    def inc(self, *label_values, amount: float = 1):
+        """Increase gauge of given labels"""
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1):
+        """Decrease gauge of given labels"""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values):
+        """Set gauge of given labels"""
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[label_values] = value
+
+class Histogram(Metric):
+    """Distribution of values in buckets, e.g. durations"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (),
+            buckets: tuple = TIME_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values):
+        """Add value to histogram of given labels"""
+        if not _enabled:
+            return
+        with self._lock:
+            stats = self._values.get(label_values)
+            if stats is None:
+                # counts per bucket (last one is '+Inf'), sum
+                stats = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0]
+            stats[0][bisect.bisect_left(self.buckets, value)] += 1
+            stats[1] += value
+
+    def render(self):
+        """Get histogram in text format (cumulative buckets, sum and count)"""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            values = [(label_values, list(counts), total)
+                for label_values, (counts, total) in self._values.items()]
+        for label_values, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le_label = 'le="{}"'.format("+Inf" if bound == float("inf") else bound)
+                lines.append(f"{self.name}_bucket"
+                    f"{format_labels(self.label_names, label_values, le_label)} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+def render_metrics():
+    """Get all metrics in Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# --- Server metrics ---
+
+sessions_opened = Counter("stt_sessions_opened_total",
+    "ASR sessions (processors) opened", ("engine", "model"))
+sessions_closed = Counter("stt_sessions_closed_total",
+    "ASR sessions (processors) closed", ("engine", "model"))
+sessions_rejected = Counter("stt_sessions_rejected_total",
+    "ASR sessions that failed to open", ("engine", "model", "reason"))
+sessions_active = Gauge("stt_sessions_active",
+    "ASR sessions currently open", ("engine", "model"))
+audio_seconds = Counter("stt_audio_seconds_total",
+    "Seconds of audio received for processing", ("engine", "model"))
+decode_seconds = Histogram("stt_decode_seconds",
+    "Decoding time per audio chunk (and final result)", ("engine",))
+real_time_factor = Histogram("stt_real_time_factor",
+    "Decoding time divided by audio duration of a session", ("engine",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0))
+results_sent = Counter("stt_results_sent_total",
+    "Transcription results sent to clients", ("engine", "type"))
+postprocessing_seconds = Histogram("stt_postprocessing_seconds",
+    "Text post-processing time per result", ("type",))
+socket_connections = Gauge("stt_socket_connections",
+    "Open WebSocket connections")   # function set by 'SocketManager'
+suspended_sessions = Gauge("stt_suspended_sessions",
+    "Sessions of disconnected clients waiting for resume")   # function set by 'SocketManager'
+executor_queue_depth = Gauge("stt_executor_queue_depth",
+    "Tasks waiting for a thread of a pool", ("pool",))   # function set by 'engine_interface'
+heartbeat_timeouts = Counter("stt_heartbeat_timeouts_total",
+    "Clients kicked because of inactivity")
+model_requests = Counter("stt_model_requests_total",
+    "Requests for shared models by result (hit: loaded already, miss: load required)",
+    ("result",))
+text2num_cache_requests = Counter("stt_text2num_cache_requests_total",
+    "Requests for cached text2num results by result (hit, miss)",
+    ("result",))   # function set by server
+text2num_cache_size = Gauge("stt_text2num_cache_size",
+    "Results in text2num cache")   # function set by server
+model_loads = Counter("stt_model_loads_total",
+    "Models loaded by engine and result", ("engine", "result"))
+model_load_seconds = Histogram("stt_model_load_seconds",
+    "Time to load a model", ("engine",), buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+loop_lag = Histogram("stt_event_loop_lag_seconds",
+    "Event loop lag (delay of periodic monitor task)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+loop_lag_quantiles = Gauge("stt_event_loop_lag_quantile_seconds",
+    "Event loop lag percentiles of the last minute", ("quantile",))   # function set by monitor
+loop_stalls = Counter("stt_event_loop_stalls_total",
+    "Event loop blocked longer than 'loop_stall_ms' (stack is logged)")
@@ -0,0 +1,266 @@
+"""Shared ASR models with reference counting, background loading and hot reload of settings"""
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from uvicorn.config import logger
+
+import metrics
+
+class ModelEntry:
+    """A loaded (or loading) model shared by all sessions with the same model key"""
+    def __init__(self, key: tuple):
+        self.key = key              # (engine, path, scorer) - see 'SettingsFile.get_model_key'
+        self.model = None
+        self.error = None
+        self.refcount = 0
+        self.retired = False        # removed or changed in settings, unload when idle
+        self.pinned = False         # never unload when idle (see 'unload_idle')
+        self.loaded = Future()      # done when model is loaded (or failed to load)
+        self.load_time_s = 0
+        self.memory_bytes = None    # approx. (growth of process memory during load)
+        self.last_used = time.time()
+
+    def get_status(self):
+        """Get state of model as dict"""
+        if self.retired:
+            state = "retired"
+        elif self.loaded.done():
+            state = "loaded"
+        else:
+            state = "loading"
+        return {
+            "engine": self.key[0], "path": self.key[1], "scorer": self.key[2],
+            "state": state,
+            "refcount": self.refcount,
+            "pinned": self.pinned,
+            "load_time_s": round(self.load_time_s, 3),
+            "idle_s": round(time.time() - self.last_used) if self.refcount <= 0 else 0,
+            "memory_mb": (round(self.memory_bytes / 1048576, 1)
+                if self.memory_bytes is not None else None)
+        }
+
+def get_rss_bytes():
+    """Get resident memory of this process in bytes (Linux only, else None)"""
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class ModelManager:
+    """Load each model once and share it between sessions. Models stay loaded when idle
+    (fast start of next session) until they are retired (e.g. settings reload)."""
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._retired = set()       # retired entries that are still used by sessions
+        self._sessions = {}         # active sessions by model name (see 'open_session')
+        self._lock = threading.Lock()
+
+    def register_loader(self, engine: str, load_function):
+        """Register function 'load(path, scorer)' that loads models of an engine"""
+        self._loaders[engine] = load_function
+
+    def has_loader(self, engine: str):
+        """Check if models of this engine can be managed"""
+        return engine in self._loaders
+
+    async def acquire(self, key: tuple):
+        """Get model entry for session. Loads model in a thread if required or waits until
+        it is loaded (e.g. in background), the event loop is never blocked.
+        Call 'release' when the session is closed."""
+        entry, must_load = self._get_or_create(key)
+        metrics.model_requests.inc("miss" if must_load else "hit")
+        if must_load:
+            load = asyncio.get_running_loop().run_in_executor(None, self._load, entry)
+        else:
+            load = asyncio.wrap_future(entry.loaded)
+        try:
+            # shield: a session that gives up (e.g. disconnect) must not cancel the load
+            await asyncio.shield(load)
+        except asyncio.CancelledError:
+            self.release(entry)
+            raise
+        if entry.error is not None:
+            self.release(entry)
+            raise entry.error
+        return entry
+
+    def release(self, entry: ModelEntry):
+        """Session does not need model anymore"""
+        with self._lock:
+            entry.refcount -= 1
+            entry.last_used = time.time()
+            if entry.retired and entry.refcount <= 0:
+                self._drop(entry)
+
+    def open_session(self, model_name: str, max_sessions: int = 0):
+        """Count new session of model, returns False if 'max_sessions' (0: no limit) is reached"""
+        with self._lock:
+            sessions = self._sessions.get(model_name, 0)
+            if 0 < max_sessions <= sessions:
+                return False
+            self._sessions[model_name] = sessions + 1
+            return True
+
+    def close_session(self, model_name: str):
+        """Session of model was closed"""
+        with self._lock:
+            sessions = self._sessions.get(model_name, 0) - 1
+            if sessions > 0:
+                self._sessions[model_name] = sessions
+            else:
+                self._sessions.pop(model_name, None)
+
+    def get_sessions(self):
+        """Get number of active sessions by model name"""
+        with self._lock:
+            return dict(self._sessions)
+
+    def load_in_background(self, key: tuple):
+        """Load model in a separate thread (does nothing if model is loaded already)"""
+        with self._lock:
+            if key in self._models:
+                return None
+            entry = self._models[key] = ModelEntry(key)
+        thread = threading.Thread(target=self._load, args=(entry,),
+            name="model-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def retire(self, key: tuple):
+        """Remove model from shared models. Sessions keep it until they close, new sessions
+        get a new instance."""
+        with self._lock:
+            entry = self._models.pop(key, None)
+            if entry is None:
+                return
+            entry.retired = True
+            if entry.refcount <= 0:
+                self._drop(entry)
+            else:
+                self._retired.add(entry)
+
+    def pin(self, key: tuple, pinned: bool = True):
+        """Pin model to keep it loaded when idle (loads model in background if required)
+        or unpin it again. Returns False if model is not loaded when unpinning."""
+        if pinned:
+            self.load_in_background(key)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return False
+            entry.pinned = pinned
+            return True
+
+    def unload_idle(self, min_idle_s: float = 0):
+        """Unload all models that are not used by sessions and not pinned.
+        Returns keys of unloaded models."""
+        now = time.time()
+        with self._lock:
+            keys = [key for key, entry in self._models.items()
+                if entry.refcount <= 0 and not entry.pinned and entry.loaded.done()
+                and now - entry.last_used >= min_idle_s]
+        for key in keys:
+            self.retire(key)
+        return keys
+
+    def get_status(self):
+        """Get state of all shared and retired (but still used) models"""
+        with self._lock:
+            entries = list(self._models.values()) + list(self._retired)
+        return [entry.get_status() for entry in entries]
+
+    def apply_models(self, old_models: dict, new_models: dict):
+        """Apply changed models of settings (dicts: model name -> (model key, language, task)).
+        Models that are gone are retired. If a loaded model was changed (same name or new model
+        for same language and task) the new one is loaded in background.
+        Returns summary of changes (model names)."""
+        old_keys = {model[0] for model in old_models.values()}
+        new_keys = {model[0] for model in new_models.values()}
+        new_paths = {(key[0], key[1]) for key in new_keys}
+        old_key_by_slot = {}
+        for key, language, task in old_models.values():
+            old_key_by_slot.setdefault((language, task), key)
+        changed = []
+        loading = []
+        for name, (key, language, task) in new_models.items():
+            old_key = (old_models[name][0] if name in old_models
+                else old_key_by_slot.get((language, task)))
+            if old_key is None or old_key == key or key in old_keys:
+                continue
+            changed.append(name)
+            if self.is_loaded(old_key) and self.has_loader(key[0]):
+                loading.append(name)
+        # retire models of settings that are gone and variants (e.g. scorer) of removed paths
+        for key in self.get_keys():
+            if key not in new_keys and (key in old_keys or (key[0], key[1]) not in new_paths):
+                self.retire(key)
+        for name in loading:
+            self.load_in_background(new_models[name][0])
+        return {
+            "models_added": [name for name in new_models if name not in old_models],
+            "models_removed": [name for name in old_models if name not in new_models],
+            "models_changed": changed,
+            "models_loading": loading
+        }
+
+    def get_keys(self):
+        """Get keys of all shared (loaded or loading) models"""
+        with self._lock:
+            return list(self._models)
+
+    def is_loaded(self, key: tuple):
+        """Check if model is loaded (or loading)"""
+        with self._lock:
+            return key in self._models
+
+    def _get_or_create(self, key: tuple):
+        """Get entry and add reference, returns tuple (entry, must_load)"""
+        with self._lock:
+            entry = self._models.get(key)
+            must_load = entry is None
+            if must_load:
+                entry = self._models[key] = ModelEntry(key)
+            entry.refcount += 1
+            return entry, must_load
+
+    def _load(self, entry: ModelEntry):
+        """Load model of entry (sets result of 'loaded' even on error)"""
+        engine, path, scorer = entry.key
+        start = time.perf_counter()
+        rss_before = get_rss_bytes()
+        try:
+            entry.model = self._loaders[engine](path, scorer)
+            entry.load_time_s = time.perf_counter() - start
+            rss_after = get_rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                entry.memory_bytes = max(0, rss_after - rss_before)
+            logger.info("ModelManager - Loaded model: %s (%.2fs)", entry.key, entry.load_time_s)
+            metrics.model_loads.inc(engine, "success")
+            metrics.model_load_seconds.observe(entry.load_time_s, engine)
+        except Exception as err: # pylint: disable=broad-except
+            entry.error = err
+            metrics.model_loads.inc(engine, "error")
+            logger.error("ModelManager - Failed to load model: %s - %s", entry.key, err)
+            with self._lock:
+                # next request will try again
+                if self._models.get(entry.key) is entry:
+                    del self._models[entry.key]
+        entry.loaded.set_result(None)
+
+    def _drop(self, entry: ModelEntry):
+        """Free model of retired entry (requires lock)"""
+        if self._models.get(entry.key) is entry:
+            del self._models[entry.key]
+        self._retired.discard(entry)
+        if entry.model is not None:
+            logger.info("ModelManager - Unloaded model: %s", entry.key)
+        entry.model = None
+
+# Shared instance for all engines
+model_manager = ModelManager()
@@ -1,14 +1,24 @@
 """Fast-API Module for SEPIA STT Server"""
 
-from fastapi import FastAPI, Response, WebSocket, status
+import signal
+import asyncio
+
+from fastapi import FastAPI, Request, Response, WebSocket, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 
-from settings import SERVER_NAME, SERVER_VERSION
-from launch_setup import settings
+from uvicorn.config import logger
+
+from settings import SERVER_NAME, SERVER_VERSION, SettingsError
+from launch_setup import settings, reload_settings, preload_models
 from http_api import HttpApiEndpoint, SettingsRequest
 from socket_api import WebsocketApiEndpoint
+from engine_interface import shutdown_text_executor, shutdown_decode_executors
+from text_processor import get_text_pipeline
+from text_to_num import set_alpha2digit_cache_size, alpha2digit_cache_info
+import metrics
+from loop_monitor import start_loop_monitor, stop_loop_monitor, get_loop_lag_percentiles
 
 # App
 app = FastAPI()
@@ -23,9 +33,52 @@ app.add_middleware(
     allow_methods=["*"]
 )
 
+# Record metrics only if the '/metrics' endpoint is enabled
+metrics.set_enabled(settings.metrics_enabled)
+
 http_endpoint = HttpApiEndpoint()
 socket_endpoint = WebsocketApiEndpoint()
 
+def get_text2num_cache_requests():
+    """Hits and misses of text2num result cache (for metrics)"""
+    info = alpha2digit_cache_info()
+    return {("hit",): info.hits, ("miss",): info.misses}
+
+@app.on_event("startup")
+async def startup():
+    """Prepare shared resources before first connection"""
+    # Prepare text post-processing cache and pipelines for all model languages
+    set_alpha2digit_cache_size(settings.text2num_cache_size)
+    metrics.text2num_cache_requests.function = get_text2num_cache_requests
+    metrics.text2num_cache_size.function = lambda: alpha2digit_cache_info().currsize
+    for language in set(settings.asr_model_languages):
+        get_text_pipeline(language)
+        get_text_pipeline(language, use_cache=False)    # for partial results
+    # Load models with 'preload' or 'pin' property in background
+    preload_models()
+    # Measure event loop lag and log stack of blocking code
+    start_loop_monitor(settings.loop_stall_ms)
+    # Reload settings on SIGHUP (not available on all platforms)
+    if hasattr(signal, "SIGHUP"):
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, on_reload_signal)
+        except (NotImplementedError, RuntimeError):
+            logger.warning("Failed to register SIGHUP handler for settings reload")
+
+def on_reload_signal():
+    """Reload settings file (SIGHUP)"""
+    try:
+        logger.info("Settings reloaded: %s", reload_settings())
+    except SettingsError as err:
+        logger.error("Failed to reload settings: %s", err)
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release shared resources"""
+    stop_loop_monitor()
+    shutdown_text_executor()
+    shutdown_decode_executors()
+
 @app.get("/")
 async def get():
     """Redirect to web interface or docs page"""
@@ -40,13 +93,22 @@ async def get_online():
 async def get_ping():
     """Endpoint to get some public server info"""
     return {
-        "result": "success", "server": SERVER_NAME, "version": SERVER_VERSION
+        "result": "success", "server": SERVER_NAME, "version": SERVER_VERSION,
+        "loop_lag_ms": get_loop_lag_percentiles()
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """Endpoint to get server metrics in Prometheus text format (if enabled)"""
+    if not settings.metrics_enabled:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    return Response(content=metrics.render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/settings")
-async def get_settings():
+async def get_settings(request: Request):
     """Endpoint to GET server settings remotely"""
-    return http_endpoint.handle_settings_req_get()
+    return http_endpoint.handle_settings_req_get(request)
 
 @app.post("/settings")
 async def post_settings(req: SettingsRequest, response: Response):
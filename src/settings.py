@@ -3,6 +3,8 @@
 import os
 import sys
 import re
+import json
+import hashlib
 import configparser
 
 # Server constants
@@ -15,12 +17,27 @@ SETTINGS_PATHS = [
     "./server.conf"
 ]
 
+# Optional model properties with non-string values (resource profile of a model)
+MODEL_PROPERTY_TYPES = {
+    "max_sessions": int,        # max. number of sessions using the model at the same time
+    "decode_threads": int,      # decode audio in this number of threads (off the event loop)
+    "partial_interval_ms": int, # min. time between two partial results sent to client
+    "preload": bool,            # load model at server start (or settings reload)
+    "pin": bool                 # load model at start and never unload it when idle
+}
+
 class SettingsError(Exception):
     """Exception for invalid settings or parser errors."""
 
+# Settings that are only applied at server start (ignored by 'update_from')
+RESTART_REQUIRED = ("host", "port", "cors_origins", "log_level", "code_reload",
+    "socket_heartbeat_s", "socket_timeout_s", "asr_engine", "hot_swap_engines",
+    "text2num_cache_size", "text_processing_threads", "metrics_enabled",
+    "loop_stall_ms")
+
 class SettingsFile:
     """File handler for server settings (e.g. server.conf)"""
-    def __init__(self, file_path = None):
+    def __init__(self, file_path = None, raise_errors = False):
         # Read ONE single "best" settings file
         settings = configparser.ConfigParser()
         env_settings_path = os.getenv("SEPIA_STT_SETTINGS")
@@ -41,12 +58,19 @@ class SettingsFile:
                     settings_read = settings.read(settings_file)
                     break
         if not settings_read:
+            if raise_errors:
+                raise SettingsError("No settings file found at: " + path_checked)
             print("No settings file found at: " + path_checked, file=sys.stderr)
             sys.exit(1)
 
         # We only read ONE file so this is our active file
         self.active_settings_file = settings_read[0]
 
+        # Cache for 'get_settings_response' (built on first request)
+        self._settings_response = None
+        self._settings_response_json = None
+        self._settings_response_etag = None
+
         # Validate config:
         try:
             self.settings_tag = settings.get("info", "settings_tag")
@@ -61,8 +85,16 @@ class SettingsFile:
                 "server", "socket_heartbeat_s", fallback="10"))
             self.socket_timeout_s = int(settings.get(
                 "server", "socket_timeout_s", fallback="15"))
+            self.socket_max_streams = int(settings.get(
+                "server", "socket_max_streams", fallback="32"))
+            self.socket_resume_s = int(settings.get(
+                "server", "socket_resume_s", fallback="0"))
+            self.metrics_enabled = settings.getboolean("server", "metrics", fallback=False)
+            self.loop_stall_ms = int(settings.get(
+                "server", "loop_stall_ms", fallback="500"))
             # Auth
             self.common_auth_token = settings.get("users", "common_auth_token")
+            self.admin_token = settings.get("users", "admin_token", fallback="")
             self.user_tokens = {}
             last_user = ""
             for key, val in settings.items("users"):
@@ -75,6 +107,10 @@ class SettingsFile:
             self.asr_engine = settings.get("app", "asr_engine", fallback="dynamic")
             if self.asr_engine == "all":
                 self.asr_engine = "dynamic" # alias for 'dynamic'
+            self.text2num_cache_size = int(settings.get(
+                "app", "text2num_cache_size", fallback="1024"))
+            self.text_processing_threads = int(settings.get(
+                "app", "text_processing_threads", fallback="2"))
             self.hot_swap_engines = True if self.asr_engine == "dynamic" else False
             self._available_engines = set({})   # keep track of all 'dynamic' engines in a set
             self.asr_model_paths = []       # required: folder
@@ -82,6 +118,7 @@ class SettingsFile:
             self.asr_model_properties = []  # optional: engine, scorer, tasks, ...
             self.asr_models_folder = settings.get("asr_models", "base_folder")
             self.asr_model_names = []  # build from path + optional (task|scorer) to distinguish
+            self._reset_model_indexes()
             # Load all model parameters for each model 1...N and filter by engine
             model_index = 1
             num_section_items = len(settings.items("asr_models"))
@@ -136,7 +173,11 @@ class SettingsFile:
                 self.has_speaker_detection_model = False
                 self.speaker_model_paths.append(None)
 
-        except configparser.Error as err:
+        except (configparser.Error, SettingsError, ValueError) as err:
+            if raise_errors:
+                if isinstance(err, SettingsError):
+                    raise
+                raise SettingsError(f"Settings error: {err}") from err
             print("Settings error:", err, file=sys.stderr)
             sys.exit(1)
 
@@ -149,6 +190,7 @@ class SettingsFile:
         # else we add all models that have no engine parameter or one that fits
         elif (self.asr_engine == "dynamic" or
             "engine" not in params or self.asr_engine == params["engine"]):
+            self.parse_model_properties(params)
             # build name for model from name/task/scorer/path
             if name:
                 self.asr_model_names.append(name)
@@ -163,8 +205,76 @@ class SettingsFile:
             self.asr_model_paths.append(path)
             self.asr_model_languages.append(lang)
             self.asr_model_properties.append(params)
+            self._index_model(len(self.asr_model_names) - 1)
             #print(f"ASR model added: {path}") # DEBUG
 
+    @staticmethod
+    def parse_model_properties(params: dict):
+        """Convert values of typed model properties (see 'MODEL_PROPERTY_TYPES')"""
+        for key, prop_type in MODEL_PROPERTY_TYPES.items():
+            if key not in params:
+                continue
+            val = params[key].strip().lower()
+            if prop_type is bool and val in configparser.ConfigParser.BOOLEAN_STATES:
+                params[key] = configparser.ConfigParser.BOOLEAN_STATES[val]
+            elif prop_type is int and val.isdigit():
+                params[key] = int(val)
+            else:
+                raise SettingsError(f"Invalid value of model property '{key}': {params[key]}")
+
+    def _reset_model_indexes(self):
+        """Clear lookup tables for model resolution"""
+        self._model_index_by_name = {}
+        self._model_index_by_language = {}
+        self._model_language_by_base = {}
+        self._model_index_by_language_task = {}
+
+    def _index_model(self, index):
+        """Add model at list index to lookup tables (first entry wins like a list scan)"""
+        lang = self.asr_model_languages[index]
+        self._model_index_by_name.setdefault(self.asr_model_names[index], index)
+        self._model_index_by_language.setdefault(lang, index)
+        self._model_language_by_base.setdefault(re.split("[-]", lang)[0].lower(), lang)
+        task = self.asr_model_properties[index].get("task")
+        if task is not None:
+            self._model_index_by_language_task.setdefault((lang, task), index)
+
+    def get_model_key(self, index):
+        """Get key of model at list index to share loaded models: (engine, path, scorer)"""
+        properties = self.asr_model_properties[index]
+        return (properties.get("engine", self.asr_engine),
+            self.asr_models_folder + self.asr_model_paths[index], properties.get("scorer"))
+
+    def get_models_by_name(self):
+        """Get (model key, language, task) of all models by model name"""
+        models = {}
+        for index, name in enumerate(self.asr_model_names):
+            models.setdefault(name, (self.get_model_key(index), self.asr_model_languages[index],
+                self.asr_model_properties[index].get("task")))
+        return models
+
+    def build_model_indexes(self):
+        """Rebuild lookup tables, e.g. after model lists have been modified directly"""
+        self._reset_model_indexes()
+        for index in range(len(self.asr_model_names)):
+            self._index_model(index)
+
+    def get_model_index_by_name(self, name):
+        """Get list index of model with given name or None"""
+        return self._model_index_by_name.get(name)
+
+    def get_model_index_by_language(self, language, task = None):
+        """Get list index of first model for full language (and task if possible) or None"""
+        if task is not None:
+            index = self._model_index_by_language_task.get((language, task))
+            if index is not None:
+                return index
+        return self._model_index_by_language.get(language)
+
+    def get_model_language_by_base(self, base_language):
+        """Get first full language code of models with given base language (e.g. 'de') or None"""
+        return self._model_language_by_base.get(base_language)
+
     def _get_vosk_features(self):
         """Features available for Vosk engine"""
         features = {"partial_results", "alternatives", "words_ts"}
@@ -182,8 +292,8 @@ class SettingsFile:
         # NOTE: typically used aliases: "words", "hotWords", "scorer"
         return features
 
-    def get_settings_response(self):
-        """Get (partially hard-coded) settings options for server info message"""
+    def _build_settings_response(self):
+        """Build (partially hard-coded) settings options for server info message"""
         features = set({})
         # Vosk features
         if self.asr_engine == "vosk":
@@ -198,9 +308,9 @@ class SettingsFile:
                 "basic": "engine_hot_swap"
             }
             if "vosk" in self._available_engines:
-                features["vosk"] = list(self._get_vosk_features())
+                features["vosk"] = sorted(self._get_vosk_features())
             if "coqui" in self._available_engines:
-                features["coqui"] = list(self._get_coqui_features())
+                features["coqui"] = sorted(self._get_coqui_features())
             # NOTE: individual engine features should be checked via welcome event
         # Debugging
         elif self.asr_engine == "wave_file_writer":
@@ -214,5 +324,48 @@ class SettingsFile:
             "models": self.asr_model_names,
             "languages": self.asr_model_languages,
             "modelProperties": self.asr_model_properties,
-            "features": list(features) if isinstance(features, set) else features
+            "features": sorted(features) if isinstance(features, set) else features
         }
+
+    def get_settings_response(self):
+        """Get settings options for server info message.
+        The result is built once and cached, call 'invalidate_settings_response'
+        after settings have been modified."""
+        if self._settings_response is None:
+            self._settings_response = self._build_settings_response()
+        # shallow copy because callers like to add fields (e.g. 'options')
+        return dict(self._settings_response)
+
+    def get_settings_response_json(self):
+        """Get pre-serialized HTTP settings response (bytes) and its ETag"""
+        if self._settings_response_json is None:
+            data = {
+                "result": "success",
+                "settings": self.get_settings_response()
+            }
+            # same format as FastAPI/Starlette 'JSONResponse'
+            self._settings_response_json = json.dumps(data,
+                ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+            ).encode("utf-8")
+            self._settings_response_etag = '"{}"'.format(
+                hashlib.sha1(self._settings_response_json).hexdigest())
+        return self._settings_response_json, self._settings_response_etag
+
+    def update_from(self, new_settings):
+        """Take over all settings of a new instance (e.g. reloaded file) except the ones
+        that require a restart. Returns list of ignored settings that changed."""
+        restart_required = []
+        for key, val in vars(new_settings).items():
+            if key in RESTART_REQUIRED:
+                if val != getattr(self, key, None):
+                    restart_required.append(key)
+            elif not key.startswith("_settings_response"):
+                setattr(self, key, val)
+        self.invalidate_settings_response()
+        return restart_required
+
+    def invalidate_settings_response(self):
+        """Clear cached settings response, e.g. after settings have been modified"""
+        self._settings_response = None
+        self._settings_response_json = None
+        self._settings_response_etag = None
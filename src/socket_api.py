@@ -1,22 +1,49 @@
 """Module to handle WebSocket connections and messages"""
 
+import time
+import asyncio
+
+from uvicorn.config import logger
 from fastapi import WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 from pydantic import ValidationError
 
+from launch_setup import settings
 from socket_messages import (SocketJsonInputMessage, SocketMessage,
-    SocketWelcomeMessage, SocketBroadcastMessage, SocketErrorMessage)
-from users import SocketUser
+    SocketWelcomeMessage, SocketBroadcastMessage, SocketErrorMessage,
+    parse_socket_json_message)
+from users import SocketUser, SuspendedSession, is_valid_stream_id
+import metrics
+
+# Max. number of users to ping concurrently in one heart-beat batch
+HEARTBEAT_BATCH_SIZE = 500
+# Max. time to ping (or kick) one user, e.g. if a client stops reading and the send blocks
+HEARTBEAT_USER_TIMEOUT_S = 2
 
 class SocketManager:
     """Manages WebSocket sessions"""
     def __init__(self):
         self.active_connections = {}
+        self.suspended_sessions = {}    # sessions waiting for resume by token
+        # Heart-beat timer wheel: one slot per second, each slot is checked every N seconds
+        self.heartbeat_delay = max(1, settings.socket_heartbeat_s)
+        self._heartbeat_wheel = [set() for _ in range(self.heartbeat_delay)]
+        self._heartbeat_tick = 0
+        self._heartbeat_task = None
+        # Metrics (read on request)
+        metrics.socket_connections.function = lambda: len(self.active_connections)
+        metrics.suspended_sessions.function = lambda: len(self.suspended_sessions)
 
     async def onopen(self, user: SocketUser):
         """WebSocket onopen event"""
         await user.socket.accept()
         self.active_connections[user.session_id] = user
+        # first check after one full turn of the wheel
+        user.heartbeat_slot = self._heartbeat_tick % self.heartbeat_delay
+        self._heartbeat_wheel[user.heartbeat_slot].add(user)
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.get_running_loop().create_task(
+                self.heartbeat_loop())
         # tell all clients that user connected
         #await self.broadcast_to_all(SocketBroadcastMessage(
         #    "chat", {"text": (f"User '{user.session_id}' connected")}))
@@ -25,12 +52,75 @@ class SocketManager:
         """WebSocket onclose event"""
         if self.active_connections[user.session_id] is not None:
             del self.active_connections[user.session_id]
+        if user.heartbeat_slot is not None:
+            self._heartbeat_wheel[user.heartbeat_slot].discard(user)
+            user.heartbeat_slot = None
         # tell all clients that user left
         #await self.broadcast_to_all(SocketBroadcastMessage(
         #    "chat", {"text": (f"User '{user.session_id}' left")}))
+        # keep active processors for a while if the user might come back
+        if settings.socket_resume_s > 0:
+            session = user.suspend()
+            if session is not None:
+                self.suspend_session(session)
         await user.on_closed()
         #print("CLIENT CLOSED")
 
+    def suspend_session(self, session: SuspendedSession):
+        """Keep session for resume until grace period is over"""
+        loop = asyncio.get_running_loop()
+        session.expire_handle = loop.call_later(settings.socket_resume_s,
+            self.expire_session, session.resume_token)
+        self.suspended_sessions[session.resume_token] = session
+
+    def expire_session(self, resume_token: str):
+        """Remove suspended session and close its processors"""
+        session = self.suspended_sessions.pop(resume_token, None)
+        if session is not None:
+            logger.info("SocketManager - Suspended session expired")
+            asyncio.ensure_future(session.close())
+
+    def resume_session(self, user: SocketUser, resume_token: str):
+        """Hand over processors of a suspended session to user. Returns success."""
+        session = self.suspended_sessions.pop(resume_token, None)
+        if session is None:
+            return False
+        session.expire_handle.cancel()
+        user.resume(session)
+        return True
+
+    async def heartbeat_loop(self):
+        """Continous heart-beat scheduler for all users. Every second it checks
+        one slot of the timer wheel, so each user is checked every 'heartbeat_delay'
+        seconds and the work is spread evenly."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += 1
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+            self._heartbeat_tick += 1
+            slot = self._heartbeat_wheel[self._heartbeat_tick % self.heartbeat_delay]
+            if slot:
+                await self.heartbeat_sweep(list(slot))
+
+    async def heartbeat_sweep(self, users: list):
+        """Ping users (or kick inactive ones) concurrently in batches. Each user has a timeout,
+        so one blocking client cannot stop the wheel, and the connection is dropped if it
+        is reached."""
+        now = int(time.time())
+        for i in range(0, len(users), HEARTBEAT_BATCH_SIZE):
+            results = await asyncio.gather(
+                *(asyncio.wait_for(user.heartbeat(now), timeout=HEARTBEAT_USER_TIMEOUT_S)
+                    for user in users[i:i + HEARTBEAT_BATCH_SIZE]),
+                return_exceptions=True)
+            for user, result in zip(users[i:i + HEARTBEAT_BATCH_SIZE], results):
+                if isinstance(result, asyncio.TimeoutError):
+                    # the client does not read anymore, don't wait for it again
+                    logger.info("SocketManager - Heart-beat timed out, dropping connection")
+                    user.abort()
+                elif isinstance(result, Exception):
+                    logger.debug("SocketManager - Heart-beat failed: %s", result)
+
     async def broadcast_to_all(self, message: SocketMessage):
         """Broadcast a message to all connected users"""
         for s_id in self.active_connections:
@@ -45,6 +135,7 @@ class WebsocketApiEndpoint:
         """Handle WebSocket events"""
         try:
             user = SocketUser(websocket)
+            user.handler_task = asyncio.current_task()
             await WebsocketApiEndpoint.socket_manager.onopen(user)
             # Main WS Loop
             while websocket.client_state == WebSocketState.CONNECTED:
@@ -53,9 +144,12 @@ class WebsocketApiEndpoint:
                 if "text" in data:
                     # JSON messages
                     try:
-                        json_obj = SocketJsonInputMessage.parse_raw(data['text'])
+                        json_obj = parse_socket_json_message(data['text'])
+                    except (ValidationError, ValueError):
+                        json_obj = None
+                    if json_obj is not None:
                         await on_json_message(json_obj, user)
-                    except ValidationError:
+                    else:
                         await user.send_message(SocketErrorMessage(400,
                             "InvalidMessage", "JSON message invalid or incomplete."))
                 elif "bytes" in data:
@@ -73,6 +167,10 @@ class WebsocketApiEndpoint:
         except RuntimeError:
             # broken disconnect
             await WebsocketApiEndpoint.socket_manager.onclose(user)
+        except asyncio.CancelledError:
+            # connection was dropped (see 'SocketUser.abort') or server is shutting down
+            await WebsocketApiEndpoint.socket_manager.onclose(user)
+            raise
 
 # Message handlers:
 
@@ -87,20 +185,39 @@ async def on_json_message(socket_message: SocketJsonInputMessage, user: SocketUs
         # Note that client was active
         user.on_client_activity(True)
 
+        if socket_message.stream_id is not None and not is_valid_stream_id(
+                socket_message.stream_id):
+            # Stream IDs must fit into the header of binary frames (first or new stream)
+            await user.send_message(SocketErrorMessage(400,
+                "InvalidStreamId", "Stream ID must be an integer from 0 to 4294967295."))
+            return
+        if user.is_authenticated and user.is_multiplexed:
+            # Multiplexed sessions can open new streams via 'welcome' (no new auth. required)
+            await open_stream(socket_message, user)
+            return
         if user.is_authenticated and user.processor:
             # User was already auth. and processor was created - for safety we block this atm
             await user.send_message(SocketErrorMessage(418,
                 "NotPossible", "Multiple 'welcome' messages in one session are not supported."))
             return
+        if socket_message.resume_token and not user.is_authenticated:
+            # Continue with processors of a disconnected session
+            await resume_session(socket_message, user)
+            return
 
         await user.authenticate(socket_message)
-        if not user.processor:
+        processor = user.get_processor(socket_message.stream_id)
+        if not processor:
             await user.send_message(SocketErrorMessage(500,
                 "Error", "ChunkProcessorError failed to load."))
             await user.socket.close(1000)
         elif user.is_authenticated:
             welcome_message = SocketWelcomeMessage(
-                socket_message.msg_id, user.processor.get_options())
+                socket_message.msg_id, processor.get_options())
+            if user.is_multiplexed:
+                welcome_message.set_field("stream_id", socket_message.stream_id)
+            if user.resume_token:
+                welcome_message.set_field("resume_token", user.resume_token)
             await user.send_message(welcome_message)
         else:
             await user.send_message(SocketErrorMessage(401,
@@ -128,6 +245,39 @@ async def on_json_message(socket_message: SocketJsonInputMessage, user: SocketUs
         await user.send_message(SocketErrorMessage(401,
             "Unauthorized", "In current state only 'welcome' message is allowed."))
 
+async def resume_session(socket_message: SocketJsonInputMessage, user: SocketUser):
+    """Resume a disconnected session via token"""
+    if not WebsocketApiEndpoint.socket_manager.resume_session(user, socket_message.resume_token):
+        await user.send_message(SocketErrorMessage(410,
+            "ResumeFailed", "Session expired or unknown. Please start a new one."))
+        return
+    welcome_message = SocketWelcomeMessage(socket_message.msg_id,
+        user.processor.get_options() if user.processor else None)
+    welcome_message.set_field("resume_token", user.resume_token)
+    welcome_message.set_field("resumed", True)
+    if user.is_multiplexed:
+        welcome_message.set_field("streams", list(user.streams))
+    await user.send_message(welcome_message)
+
+async def open_stream(socket_message: SocketJsonInputMessage, user: SocketUser):
+    """Open a new stream in a multiplexed session (requires authenticated client)"""
+    stream_id = socket_message.stream_id
+    if stream_id is None:
+        await user.send_message(SocketErrorMessage(418,
+            "NotPossible", "Multiplexed sessions require a 'stream_id' in each 'welcome' message."))
+    elif stream_id in user.streams:
+        await user.send_stream_message(stream_id, SocketErrorMessage(409,
+            "StreamExists", "Stream ID is already in use."))
+    elif len(user.streams) >= settings.socket_max_streams:
+        await user.send_stream_message(stream_id, SocketErrorMessage(429,
+            "TooManyStreams", "Max. number of parallel streams reached."))
+    else:
+        processor = await user.create_processor(socket_message)
+        if processor:
+            welcome_message = SocketWelcomeMessage(socket_message.msg_id, processor.get_options())
+            welcome_message.set_field("stream_id", stream_id)
+            await user.send_message(welcome_message)
+
 async def on_binary_message(binary_data: bytes, user: SocketUser):
     """Handle binary data (requires authenticated client)"""
 
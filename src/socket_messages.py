@@ -1,5 +1,6 @@
 """Different socket message classes for convenience"""
 
+import json
 from typing import Optional
 
 from pydantic import BaseModel
@@ -26,9 +27,43 @@ class SocketJsonInputMessage(BaseModel):
     access_token: Optional[str] = None
     client_id: Optional[str] = None
     msg_id: int
+    stream_id: Optional[int] = None     # only used in multiplexed sessions
+    resume_token: Optional[str] = None  # used to resume a disconnected session
     # {"type": "welcome", "data": { "language": "en-US", "model": "...", "grammar": "..." },
     #    "access_token": "", "client_id": "", "ts": 1620804751062, "msg_id": 1 }
 
+class SocketJsonControlMessage:
+    """Incoming high-frequency control message (e.g. 'pong') in JSON format.
+    Has the same fields as 'SocketJsonInputMessage' but skips model validation."""
+    # message types that can use this class
+    TYPES = {"pong", "audioend"}
+
+    def __init__(self, msg_type: str, msg_id: int, data: dict = None, stream_id: int = None):
+        self.type = msg_type
+        self.data = data
+        self.access_token = None
+        self.client_id = None
+        self.msg_id = msg_id
+        self.stream_id = stream_id
+        self.resume_token = None
+
+def parse_socket_json_message(text: str):
+    """Parse incoming JSON message. Well-formed control messages take a fast path,
+    everything else is validated via 'SocketJsonInputMessage'.
+    Raises ValueError (or pydantic 'ValidationError') if message is invalid."""
+    json_obj = json.loads(text)
+    if isinstance(json_obj, dict):
+        msg_type = json_obj.get("type")
+        if isinstance(msg_type, str) and msg_type in SocketJsonControlMessage.TYPES:
+            msg_id = json_obj.get("msg_id")
+            data = json_obj.get("data")
+            stream_id = json_obj.get("stream_id")
+            # anything unusual is left to the full validation (e.g. type coercion)
+            if (type(msg_id) is int and (data is None or isinstance(data, dict))
+                    and (stream_id is None or type(stream_id) is int)):
+                return SocketJsonControlMessage(msg_type, msg_id, data, stream_id)
+    return SocketJsonInputMessage.parse_obj(json_obj)
+
 class SocketMessage():
     """Default socket message"""
     def __init__(self, msg_type, msg_id = None):
@@ -0,0 +1,29 @@
+"""Unit tests for engine_interface (uses settings of 'server-test.conf')"""
+
+import os
+import sys
+import unittest
+
+# Settings are loaded on first import of server modules ('test' engine, no ASR models required)
+sys.argv = sys.argv[:1] + ["--settings",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "server-test.conf")]
+
+from engine_interface import EngineInterface, InvalidOptions  # pylint: disable=wrong-import-position
+
+class TestEngineInterface(unittest.TestCase):
+    """Common options of all engines"""
+
+    def test_samplerate(self):
+        """Sample rate must be a positive number"""
+
+        self.assertEqual(EngineInterface(options={})._sample_rate, 16000)
+        engine = EngineInterface(options={"samplerate": 8000})
+        self.assertEqual(engine.register_audio_chunk(16000), 1)
+        engine.release_model()
+        for samplerate in [0, -16000, "16000", None, True, float("nan"), float("inf")]:
+            with self.assertRaises(InvalidOptions, msg=repr(samplerate)):
+                EngineInterface(options={"samplerate": samplerate})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Unit tests for HTTP endpoints (uses settings of 'server-test.conf')"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+os.chdir(os.path.dirname(os.path.abspath(__file__)))   # server mounts 'www' folder
+sys.argv = sys.argv[:1] + ["--settings", os.path.abspath("server-test.conf")]
+
+# pylint: disable=wrong-import-position
+from fastapi.testclient import TestClient
+
+import server
+from http_api import etag_matches
+from launch_setup import settings, reload_settings
+from model_manager import model_manager
+
+class TestSettingsEtag(unittest.TestCase):
+    """GET /settings with ETag and 'If-None-Match'"""
+
+    def setUp(self):
+        self.client = TestClient(server.app)
+
+    def test_etag(self):
+        """Response has ETag, matching 'If-None-Match' gives 304 without body"""
+
+        response = self.client.get("/settings")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["etag"]
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        self.assertEqual(response.json()["result"], "success")
+        for if_none_match in [etag, "W/" + etag, "*", f'"other", {etag}', f'W/"a",W/{etag}']:
+            response = self.client.get("/settings", headers={"If-None-Match": if_none_match})
+            self.assertEqual(response.status_code, 304, if_none_match)
+            self.assertEqual(response.headers["etag"], etag)
+            self.assertEqual(response.content, b"")
+        for if_none_match in ['"other"', etag[1:-1], '"a", "b"']:
+            response = self.client.get("/settings", headers={"If-None-Match": if_none_match})
+            self.assertEqual(response.status_code, 200, if_none_match)
+
+    def test_etag_matches(self):
+        """Header value parser"""
+
+        self.assertTrue(etag_matches('"a"', '"a"'))
+        self.assertTrue(etag_matches(' W/"a" ', '"a"'))
+        self.assertTrue(etag_matches('"b",  "a"', '"a"'))
+        self.assertTrue(etag_matches('*', '"a"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+        self.assertFalse(etag_matches('', '"a"'))
+        self.assertFalse(etag_matches('"ab"', '"a"'))
+        self.assertFalse(etag_matches('"b", W/"c"', '"a"'))
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """GET /metrics"""
+
+    def test_enabled_setting(self):
+        """Endpoint is off by default and renders all metrics if enabled"""
+
+        client = TestClient(server.app)
+        self.assertFalse(settings.metrics_enabled)
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.content, b"")
+        with mock.patch.object(settings, "metrics_enabled", True):
+            response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE stt_sessions_opened_total counter\n", response.text)
+        self.assertIn("# TYPE stt_decode_seconds histogram\n", response.text)
+        self.assertRegex(response.text, r"\nstt_socket_connections \d+\n")
+
+class TestAdminSettings(unittest.TestCase):
+    """POST /settings admin actions (reload uses a copy of the settings file)"""
+
+    def setUp(self):
+        self.client = TestClient(server.app)
+        self.loads = []
+        self.original_file = settings.active_settings_file
+        self.folder = tempfile.mkdtemp()
+        self.settings_file = os.path.join(self.folder, "server-test.conf")
+        self.write_settings({"lang2=en-US": "lang2=en-US\nname2=english"})
+        settings.active_settings_file = self.settings_file
+        # 'test' engine has no models, use a fake loader to see what the manager does
+        loaders = mock.patch.dict(model_manager._loaders, {"test": self.load})
+        loaders.start()
+        self.addCleanup(loaders.stop)
+        reload_settings()
+
+    def tearDown(self):
+        settings.active_settings_file = self.original_file
+        reload_settings()
+        model_manager.unload_idle()
+        shutil.rmtree(self.folder)
+
+    def load(self, path, scorer):
+        """Fake model loader"""
+        self.loads.append((path, scorer))
+        return path
+
+    def write_settings(self, replace: dict):
+        """Write copy of test settings with some lines replaced"""
+        with open(self.original_file, encoding="utf-8") as file:
+            content = file.read()
+        for old, new in replace.items():
+            content = content.replace(old, new)
+        with open(self.settings_file, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def post(self, **data):
+        """Send admin request"""
+        return self.client.post("/settings", json=data)
+
+    def wait_for_model(self, key):
+        """Wait until background load is done"""
+        for _ in range(100):
+            if model_manager.is_loaded(key):
+                return
+            time.sleep(0.01)
+        self.fail(f"Model not loaded: {key}")
+
+    def test_admin_token(self):
+        """Actions require the admin token of the settings"""
+
+        response = self.post(token="admin1234")
+        self.assertEqual(response.status_code, 400)
+        for token in [None, "", "admin", "admin1234 ", "test1234", "ädmin1234"]:
+            response = self.post(action="models", token=token)
+            self.assertEqual(response.status_code, 401, token)
+            self.assertEqual(response.json()["result"], "fail")
+        response = self.post(action="models", token="admin1234")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["models"], [])
+        with mock.patch.object(settings, "admin_token", ""):
+            response = self.post(action="models", token="")
+            self.assertEqual(response.status_code, 403)
+        response = self.post(action="unknown", token="admin1234")
+        self.assertEqual(response.status_code, 400)
+
+    def test_reload(self):
+        """Reload applies model changes and skips settings that require a restart"""
+
+        old_key = ("test", "../models/test-model-en", None)
+        new_key = ("test", "../models/test-model-en-v2", None)
+        response = self.post(action="preload", model="english", token="admin1234")
+        self.assertEqual(response.status_code, 200)
+        self.wait_for_model(old_key)
+        response = self.post(action="preload", model="unknown", token="admin1234")
+        self.assertEqual(response.status_code, 404)
+        _, etag = settings.get_settings_response_json()
+        self.write_settings({
+            "lang2=en-US": "lang2=en-US\nname2=english",
+            "path1=test-model-de\nlang1=de-DE\n": "",
+            "path2=test-model-en": "path1=test-model-en-v2",
+            "lang2=": "lang1=",
+            "name2=": "name1=",
+            "port=20741": "port=20742",
+            "socket_heartbeat_s = 10": "socket_heartbeat_s = 5",
+            "socket_max_streams = 2": "socket_max_streams = 4",
+            "settings_tag=Unit test settings": "settings_tag=Reloaded"
+        })
+        response = self.post(action="reload", token="admin1234")
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()["reload"]
+        self.assertEqual(sorted(summary["restart_required"]), ["port", "socket_heartbeat_s"])
+        self.assertEqual(summary["models_removed"], ["test-model-de"])
+        self.assertEqual(summary["models_changed"], ["english"])
+        self.assertEqual(summary["models_loading"], ["english"])
+        self.assertEqual(settings.port, 20741)
+        self.assertEqual(settings.socket_heartbeat_s, 10)
+        self.assertEqual(settings.socket_max_streams, 4)
+        self.assertEqual(settings.settings_tag, "Reloaded")
+        # changed loaded model is replaced in background, settings response is rebuilt
+        self.wait_for_model(new_key)
+        self.assertFalse(model_manager.is_loaded(old_key))
+        self.assertEqual(self.loads, [(old_key[1], None), (new_key[1], None)])
+        response = self.client.get("/settings", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["etag"], etag)
+        response = self.post(action="models", token="admin1234")
+        self.assertEqual([model["names"] for model in response.json()["models"]], [["english"]])
+
+    def test_reload_error(self):
+        """Invalid settings file is refused and nothing changes"""
+
+        self.write_settings({"socket_max_streams = 2": "socket_max_streams = many"})
+        response = self.post(action="reload", token="admin1234")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["result"], "fail")
+        self.assertEqual(settings.socket_max_streams, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
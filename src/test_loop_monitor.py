@@ -0,0 +1,47 @@
+"""Unit tests for loop_monitor"""
+
+import time
+import asyncio
+import unittest
+from unittest import mock
+
+import loop_monitor
+from loop_monitor import LoopMonitor
+
+class TestLoopMonitor(unittest.IsolatedAsyncioTestCase):
+    """Lag samples and watchdog"""
+
+    async def test_blocked_loop(self):
+        """Blocking call is recorded as lag, logged once with stack and the watchdog stops"""
+
+        with mock.patch.object(loop_monitor, "SAMPLE_INTERVAL_S", 0.01), \
+                mock.patch.object(loop_monitor.metrics.loop_stalls, "inc") as stalls_inc, \
+                mock.patch.object(loop_monitor, "logger") as logger:
+            monitor = LoopMonitor(stall_s=0.05)
+            self.assertIsNone(monitor.get_percentiles())
+            monitor.start()
+            await asyncio.sleep(0.05)
+            self.assertLess(monitor.get_percentiles()["p50"], 50)
+            time.sleep(0.2)     # block the loop
+            await asyncio.sleep(0.05)
+            percentiles = monitor.get_percentiles()
+            self.assertGreaterEqual(percentiles["max"], 150)
+            self.assertLess(percentiles["p50"], 150)
+            self.assertEqual(set(monitor.get_quantiles_metric()), {("0.5",), ("0.9",), ("0.99",)})
+            stalls_inc.assert_called_once()
+            logger.warning.assert_called_once()
+            self.assertIn("test_blocked_loop", logger.warning.call_args[0][2])
+            monitor.stop()
+            monitor._watchdog.join(1)
+            self.assertFalse(monitor._watchdog.is_alive())
+
+    async def test_off(self):
+        """Monitor is not started if 'stall_ms' is 0"""
+
+        self.assertIsNone(loop_monitor.start_loop_monitor(0))
+        self.assertIsNone(loop_monitor.get_loop_lag_percentiles())
+        loop_monitor.stop_loop_monitor()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Unit tests for metrics (Prometheus text format)"""
+
+import unittest
+from unittest import mock
+
+import metrics
+from metrics import Counter, Gauge, Histogram
+
+class TestMetrics(unittest.TestCase):
+    """Recording and exposition format"""
+
+    def setUp(self):
+        enabled = mock.patch.object(metrics, "_enabled", True)
+        enabled.start()
+        self.addCleanup(enabled.stop)
+        # keep test metrics out of the server registry
+        registry = mock.patch.object(metrics, "_registry", [])
+        registry.start()
+        self.addCleanup(registry.stop)
+
+    def test_counter(self):
+        """Counter with and without labels"""
+
+        counter = Counter("test_total", "Test counter", ("engine", "model"))
+        counter.inc("vosk", "a")
+        counter.inc("vosk", "a", amount=2)
+        counter.inc("coqui", "b", amount=0.5)
+        self.assertEqual(counter.render(), [
+            "# HELP test_total Test counter",
+            "# TYPE test_total counter",
+            'test_total{engine="vosk",model="a"} 3',
+            'test_total{engine="coqui",model="b"} 0.5'
+        ])
+        plain = Counter("plain_total", "No labels")
+        plain.inc()
+        self.assertEqual(plain.render()[2], "plain_total 1")
+
+    def test_gauge(self):
+        """Gauge set, inc, dec and values read via function"""
+
+        gauge = Gauge("test_gauge", "Test gauge", ("pool",))
+        gauge.set(5, "text")
+        gauge.dec("text", amount=2)
+        gauge.inc("decode")
+        self.assertEqual(gauge.render()[1:], [
+            "# TYPE test_gauge gauge",
+            'test_gauge{pool="text"} 3',
+            'test_gauge{pool="decode"} 1'
+        ])
+        gauge.function = lambda: {("a",): 1.0, ("b",): 2.5}
+        self.assertEqual(gauge.render()[2:], ['test_gauge{pool="a"} 1', 'test_gauge{pool="b"} 2.5'])
+        plain = Gauge("plain_gauge", "No labels", function=lambda: 7)
+        self.assertEqual(plain.render()[2:], ["plain_gauge 7"])
+
+    def test_histogram(self):
+        """Cumulative buckets incl. '+Inf', sum and count"""
+
+        histogram = Histogram("test_seconds", "Test histogram", ("engine",), buckets=(0.5, 0.1))
+        for value in [0.05, 0.1, 0.3, 2]:
+            histogram.observe(value, "vosk")
+        self.assertEqual(histogram.render(), [
+            "# HELP test_seconds Test histogram",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{engine="vosk",le="0.1"} 2',
+            'test_seconds_bucket{engine="vosk",le="0.5"} 3',
+            'test_seconds_bucket{engine="vosk",le="+Inf"} 4',
+            'test_seconds_sum{engine="vosk"} 2.45',
+            'test_seconds_count{engine="vosk"} 4'
+        ])
+        plain = Histogram("plain_seconds", "No labels", buckets=(1,))
+        plain.observe(1)
+        self.assertEqual(plain.render()[2:], [
+            'plain_seconds_bucket{le="1"} 1',
+            'plain_seconds_bucket{le="+Inf"} 1',
+            "plain_seconds_sum 1",
+            "plain_seconds_count 1"
+        ])
+
+    def test_label_escaping(self):
+        """Backslash, quote and new line are escaped in label values"""
+
+        self.assertEqual(metrics.escape_label_value('a\\b"c\nd'), r'a\\b\"c\nd')
+        self.assertEqual(metrics.format_labels(("a", "b"), ("x", 1), 'le="+Inf"'),
+            '{a="x",b="1",le="+Inf"}')
+        self.assertEqual(metrics.format_labels((), ()), "")
+        counter = Counter("test_total", "Test counter", ("model",))
+        counter.inc('my "model"\\v2')
+        self.assertEqual(counter.render()[2], r'test_total{model="my \"model\"\\v2"} 1')
+
+    def test_disabled(self):
+        """Nothing is recorded if metrics are off"""
+
+        metrics.set_enabled(False)
+        counter = Counter("test_total", "Test counter")
+        histogram = Histogram("test_seconds", "Test histogram")
+        counter.inc()
+        histogram.observe(1)
+        self.assertEqual(metrics.render_metrics(), "\n".join([
+            "# HELP test_total Test counter",
+            "# TYPE test_total counter",
+            "# HELP test_seconds Test histogram",
+            "# TYPE test_seconds histogram"
+        ]) + "\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+"""Unit tests for model_manager"""
+
+import asyncio
+import threading
+import unittest
+from model_manager import ModelManager
+
+class FakeModel:
+    """Model returned by fake loader"""
+    def __init__(self, path, scorer):
+        self.path = path
+        self.scorer = scorer
+
+class TestModelManager(unittest.IsolatedAsyncioTestCase):
+    """Shared models: reference counting, retire and settings reload"""
+
+    def setUp(self):
+        self.loads = []
+        self.unblock = threading.Event()
+        self.manager = ModelManager()
+        self.manager.register_loader("fake", self.load)
+
+    def load(self, path, scorer):
+        """Fake loader (fails for path 'broken', waits for 'unblock' if path is 'slow')"""
+        self.loads.append((path, scorer))
+        if path == "slow":
+            self.unblock.wait(5)
+        if path == "broken":
+            raise RuntimeError("broken model")
+        return FakeModel(path, scorer)
+
+    async def test_refcount(self):
+        """Model is loaded once, shared and stays loaded when idle"""
+
+        key = ("fake", "model-a", None)
+        entry_1 = await self.manager.acquire(key)
+        entry_2 = await self.manager.acquire(key)
+        self.assertIs(entry_1, entry_2)
+        self.assertEqual(entry_1.refcount, 2)
+        self.assertEqual(self.loads, [("model-a", None)])
+        self.manager.release(entry_1)
+        self.manager.release(entry_2)
+        self.assertEqual(entry_1.refcount, 0)
+        self.assertIsNotNone(entry_1.model)
+        self.assertTrue(self.manager.is_loaded(key))
+        self.assertIs(await self.manager.acquire(key), entry_1)
+        self.assertEqual(len(self.loads), 1)
+
+    async def test_load_error(self):
+        """Failed load raises for the session and is tried again on next request"""
+
+        key = ("fake", "broken", None)
+        with self.assertRaises(RuntimeError):
+            await self.manager.acquire(key)
+        self.assertFalse(self.manager.is_loaded(key))
+        with self.assertRaises(RuntimeError):
+            await self.manager.acquire(key)
+        self.assertEqual(len(self.loads), 2)
+
+    async def test_acquire_does_not_block_loop(self):
+        """Sessions wait for a loading model without blocking the event loop"""
+
+        key = ("fake", "slow", None)
+        self.manager.load_in_background(key)
+        waiting = [asyncio.create_task(self.manager.acquire(key)) for _ in range(2)]
+        # first load of new key runs in a thread too
+        other_key = ("fake", "slow", "scorer")
+        waiting.append(asyncio.create_task(self.manager.acquire(other_key)))
+        await asyncio.sleep(0.05)
+        self.assertFalse(any(task.done() for task in waiting))
+        self.unblock.set()
+        entries = await asyncio.gather(*waiting)
+        self.assertIs(entries[0], entries[1])
+        self.assertEqual(entries[0].refcount, 2)
+        self.assertEqual(entries[2].model.scorer, "scorer")
+        # a session that gives up does not cancel the load for others
+        self.unblock.clear()
+        key = ("fake", "slow", "other")
+        tasks = [asyncio.create_task(self.manager.acquire(key)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        tasks[0].cancel()
+        self.unblock.set()
+        entry = await tasks[1]
+        self.assertTrue(tasks[0].cancelled())
+        self.assertIsNotNone(entry.model)
+        self.assertEqual(entry.refcount, 1)
+
+    async def test_retire(self):
+        """Retired model is kept until the last session releases it"""
+
+        key = ("fake", "model-a", None)
+        old_entry = await self.manager.acquire(key)
+        self.manager.retire(key)
+        self.assertIsNotNone(old_entry.model)
+        self.assertEqual([status["state"] for status in self.manager.get_status()], ["retired"])
+        # new sessions get a new instance
+        new_entry = await self.manager.acquire(key)
+        self.assertIsNot(new_entry, old_entry)
+        self.assertEqual(len(self.loads), 2)
+        self.manager.release(old_entry)
+        self.assertIsNone(old_entry.model)
+        self.assertEqual([status["state"] for status in self.manager.get_status()], ["loaded"])
+        # idle model is unloaded at once
+        self.manager.release(new_entry)
+        self.manager.retire(key)
+        self.assertIsNone(new_entry.model)
+        self.assertEqual(self.manager.get_status(), [])
+
+    async def test_apply_models(self):
+        """Settings reload: removed models are retired, changed loaded models are replaced"""
+
+        key_a = ("fake", "model-a", None)
+        key_b = ("fake", "model-b", None)
+        key_c = ("fake", "model-c", None)
+        key_d = ("fake", "model-d", None)
+        old_models = {
+            "a": (key_a, "de-DE", None),
+            "b": (key_b, "en-US", None),
+            "c": (key_c, "fr-FR", None)
+        }
+        new_models = {
+            "a": (key_a, "de-DE", None),
+            "b": (key_d, "en-US", None),
+            "e": (("fake", "model-e", None), "es-ES", None)
+        }
+        entry_a = await self.manager.acquire(key_a)
+        entry_b = await self.manager.acquire(key_b)
+        self.manager.release(entry_b)
+        entry_c = await self.manager.acquire(key_c)
+        changes = self.manager.apply_models(old_models, new_models)
+        self.assertEqual(changes, {
+            "models_added": ["e"],
+            "models_removed": ["c"],
+            "models_changed": ["b"],
+            "models_loading": ["b"]
+        })
+        # unchanged model stays, idle changed model is unloaded, used removed one is kept
+        self.assertIsNotNone(entry_a.model)
+        self.assertFalse(entry_a.retired)
+        self.assertIsNone(entry_b.model)
+        self.assertTrue(entry_c.retired)
+        self.assertIsNotNone(entry_c.model)
+        self.manager.release(entry_c)
+        self.assertIsNone(entry_c.model)
+        # new model of changed one is loaded in background
+        entry_d = await self.manager.acquire(key_d)
+        self.assertEqual(entry_d.model.path, "model-d")
+        self.assertEqual(self.loads.count(("model-d", None)), 1)
+        self.assertEqual(sorted(self.manager.get_keys()), [key_a, key_d])
+
+    async def test_unload_idle_and_pin(self):
+        """Only idle models that are not pinned are unloaded"""
+
+        key_a = ("fake", "model-a", None)
+        key_b = ("fake", "model-b", None)
+        key_c = ("fake", "model-c", None)
+        entry_a = await self.manager.acquire(key_a)
+        self.manager.release(await self.manager.acquire(key_b))
+        # pin loads model in background (wait for it via acquire)
+        self.assertTrue(self.manager.pin(key_c))
+        self.manager.release(await self.manager.acquire(key_c))
+        self.assertEqual(self.loads.count(("model-c", None)), 1)
+        self.assertEqual(self.manager.unload_idle(min_idle_s=3600), [])
+        self.assertEqual(self.manager.unload_idle(), [key_b])
+        self.assertIsNotNone(entry_a.model)
+        self.assertEqual(sorted(self.manager.get_keys()), [key_a, key_c])
+        # unpinned idle model can be unloaded
+        self.assertFalse(self.manager.pin(key_b, False))
+        self.assertTrue(self.manager.pin(key_c, False))
+        self.manager.release(entry_a)
+        self.assertEqual(sorted(self.manager.unload_idle()), [key_a, key_c])
+        self.assertIsNone(entry_a.model)
+        self.assertEqual(self.manager.get_status(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,287 @@
+"""Unit tests for socket_api and users (uses settings of 'server-test.conf')"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import unittest
+from unittest import mock
+
+# Settings are loaded on first import of server modules ('test' engine, no ASR models required)
+sys.argv = sys.argv[:1] + ["--settings",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "server-test.conf")]
+
+# pylint: disable=wrong-import-position
+from fastapi import WebSocketDisconnect
+from starlette.websockets import WebSocketState
+
+from launch_setup import settings
+import socket_api
+from socket_messages import parse_socket_json_message
+from users import SocketUser, STREAM_FRAME_HEADER
+
+def welcome(stream_id=None, **fields):
+    """Parse 'welcome' message of test user"""
+    return parse_socket_json_message(json.dumps({"type": "welcome", "msg_id": 1,
+        "client_id": "any", "access_token": "test1234", "stream_id": stream_id, **fields}))
+
+def frame(stream_id: int, chunk: bytes):
+    """Binary frame of multiplexed session"""
+    return STREAM_FRAME_HEADER.pack(stream_id) + chunk
+
+class FakeSocket:
+    """WebSocket that records sent messages, 'send_json' blocks forever if 'blocking'.
+    Client disconnects after the given incoming messages were received."""
+    def __init__(self, blocking: bool = False, messages: list = None):
+        self.client_state = WebSocketState.CONNECTED
+        self.blocking = blocking
+        self.messages = list(messages or [])
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        """Accept connection"""
+
+    async def send_json(self, data):
+        """Send message (or block like a client that stopped reading)"""
+        if self.blocking:
+            await asyncio.Event().wait()
+        self.sent.append(data)
+
+    async def receive(self):
+        """Receive next message"""
+        if not self.messages:
+            raise WebSocketDisconnect(1000)
+        return self.messages.pop(0)
+
+    async def close(self, code: int = 1000):
+        """Close connection"""
+        self.close_code = code
+        self.client_state = WebSocketState.DISCONNECTED
+
+class TestHeartbeat(unittest.IsolatedAsyncioTestCase):
+    """Heart-beat scheduler"""
+
+    async def test_ping_and_kick(self):
+        """Active users get a ping, inactive ones are kicked"""
+
+        manager = socket_api.SocketManager()
+        active_user = SocketUser(FakeSocket())
+        inactive_user = SocketUser(FakeSocket())
+        inactive_user.last_alive_sign = int(time.time()) - 3600
+        await manager.heartbeat_sweep([active_user, inactive_user])
+        self.assertEqual(active_user.socket.sent[0]["type"], "ping")
+        self.assertTrue(active_user.is_alive)
+        self.assertEqual(inactive_user.socket.sent[0]["code"], 408)
+        self.assertEqual(inactive_user.socket.close_code, 1013)
+        self.assertFalse(inactive_user.is_alive)
+
+    async def test_blocking_client(self):
+        """A client that stops reading is dropped and does not stop the others"""
+
+        manager = socket_api.SocketManager()
+        users = []
+        handlers = []
+        for blocking, inactive in [(True, True), (True, False), (False, False)]:
+            user = SocketUser(FakeSocket(blocking))
+            if inactive:
+                user.last_alive_sign = int(time.time()) - 3600
+            # connection handler waits for messages until it is cancelled
+            user.handler_task = asyncio.create_task(asyncio.Event().wait())
+            users.append(user)
+            handlers.append(user.handler_task)
+        with mock.patch.object(socket_api, "HEARTBEAT_USER_TIMEOUT_S", 0.05):
+            start = time.monotonic()
+            await manager.heartbeat_sweep(users)
+            self.assertLess(time.monotonic() - start, 1)
+        await asyncio.sleep(0)
+        for user, handler in zip(users[:2], handlers[:2]):
+            self.assertFalse(user.is_alive)
+            self.assertTrue(handler.cancelled())
+        self.assertTrue(users[2].is_alive)
+        self.assertEqual(users[2].socket.sent[0]["type"], "ping")
+        handlers[2].cancel()
+        # dropped users are skipped by the next sweep
+        with mock.patch.object(socket_api, "HEARTBEAT_USER_TIMEOUT_S", 5):
+            await asyncio.wait_for(manager.heartbeat_sweep(users[:2]), timeout=1)
+
+class TestStreams(unittest.IsolatedAsyncioTestCase):
+    """Multiplexed sessions ('test' engine, max. 2 streams)"""
+
+    async def asyncSetUp(self):
+        self.user = SocketUser(FakeSocket())
+        await socket_api.on_json_message(welcome(1), self.user)
+
+    async def test_open_and_frames(self):
+        """Binary frames are routed to the stream of their header"""
+
+        user = self.user
+        self.assertTrue(user.is_multiplexed)
+        self.assertEqual(user.socket.sent[-1]["type"], "welcome")
+        self.assertEqual(user.socket.sent[-1]["stream_id"], 1)
+        await socket_api.on_json_message(welcome(7), user)
+        self.assertEqual(user.socket.sent[-1]["stream_id"], 7)
+        self.assertEqual(sorted(user.streams), [1, 7])
+        await socket_api.on_binary_message(frame(1, b"1234"), user)
+        await socket_api.on_binary_message(frame(7, b"12"), user)
+        await socket_api.on_json_message(parse_socket_json_message(
+            '{"type": "audioend", "msg_id": 2, "stream_id": 7}'), user)
+        result = user.socket.sent[-1]
+        self.assertEqual(result["stream_id"], 7)
+        self.assertEqual(result["transcript"], "[processed bytes: 2]")
+        # stream ends with last result, the ID can be used again
+        self.assertEqual(list(user.streams), [1])
+        await socket_api.on_json_message(welcome(7), user)
+        self.assertEqual(user.socket.sent[-1]["type"], "welcome")
+
+    async def test_invalid_streams(self):
+        """Unknown, existing and out-of-range stream IDs and short frames are refused"""
+
+        user = self.user
+        await socket_api.on_binary_message(frame(3, b"1234"), user)
+        self.assertEqual(user.socket.sent[-1]["name"], "UnknownStream")
+        self.assertEqual(user.socket.sent[-1]["stream_id"], 3)
+        await socket_api.on_binary_message(b"12", user)
+        self.assertEqual(user.socket.sent[-1]["name"], "InvalidFrame")
+        await socket_api.on_json_message(welcome(1), user)
+        self.assertEqual(user.socket.sent[-1]["code"], 409)
+        for stream_id in [-1, 2**32]:
+            await socket_api.on_json_message(welcome(stream_id), user)
+            self.assertEqual(user.socket.sent[-1]["name"], "InvalidStreamId")
+        await socket_api.on_json_message(welcome(), user)
+        self.assertEqual(user.socket.sent[-1]["code"], 418)
+        self.assertEqual(list(user.streams), [1])
+        # new connection: first 'welcome' with oversized ID is refused before authentication
+        new_user = SocketUser(FakeSocket())
+        await socket_api.on_json_message(welcome(2**32), new_user)
+        self.assertEqual(new_user.socket.sent[-1]["name"], "InvalidStreamId")
+        self.assertFalse(new_user.is_authenticated)
+
+    async def test_stream_limit(self):
+        """Number of parallel streams per connection is limited"""
+
+        user = self.user
+        await socket_api.on_json_message(welcome(2), user)
+        await socket_api.on_json_message(welcome(3), user)
+        self.assertEqual(user.socket.sent[-1]["code"], 429)
+        self.assertEqual(user.socket.sent[-1]["stream_id"], 3)
+        self.assertEqual(sorted(user.streams), [1, 2])
+
+    async def test_close(self):
+        """All streams are closed with the connection"""
+
+        user = self.user
+        await socket_api.on_json_message(welcome(2), user)
+        processors = list(user.streams.values())
+        await user.on_closed()
+        self.assertEqual(user.streams, {})
+        for processor in processors:
+            self.assertIsNone(processor.processor.compute_async)
+
+class TestResume(unittest.IsolatedAsyncioTestCase):
+    """Resume of disconnected sessions via token ('socket_resume_s' = 30)"""
+
+    async def asyncSetUp(self):
+        socket_api.WebsocketApiEndpoint()
+        self.manager = socket_api.WebsocketApiEndpoint.socket_manager
+        self.user = await self.connect()
+        await socket_api.on_json_message(welcome(), self.user)
+        await socket_api.on_binary_message(b"1234", self.user)
+
+    async def asyncTearDown(self):
+        self.manager._heartbeat_task.cancel()
+        for token in list(self.manager.suspended_sessions):
+            self.manager.suspended_sessions[token].expire_handle.cancel()
+            await self.manager.suspended_sessions.pop(token).close()
+
+    async def connect(self):
+        """Open new connection"""
+        user = SocketUser(FakeSocket())
+        await self.manager.onopen(user)
+        return user
+
+    async def test_resume(self):
+        """Processor is handed over to new connection and token works only once"""
+
+        token = self.user.socket.sent[-1]["resume_token"]
+        self.assertTrue(token)
+        processor = self.user.processor
+        await self.manager.onclose(self.user)
+        self.assertIsNone(self.user.processor)
+        self.assertIs(self.manager.suspended_sessions[token].processor, processor)
+        new_user = await self.connect()
+        await socket_api.on_json_message(welcome(resume_token=token), new_user)
+        message = new_user.socket.sent[-1]
+        self.assertEqual(message["type"], "welcome")
+        self.assertTrue(message["resumed"])
+        self.assertEqual(message["resume_token"], token)
+        self.assertIs(new_user.processor, processor)
+        self.assertEqual(self.manager.suspended_sessions, {})
+        # results of resumed processor go to new connection
+        await socket_api.on_binary_message(b"12", new_user)
+        await socket_api.on_json_message(parse_socket_json_message(
+            '{"type": "audioend", "msg_id": 2}'), new_user)
+        self.assertEqual(new_user.socket.sent[-1]["transcript"], "[processed bytes: 6]")
+        # token was used
+        other_user = await self.connect()
+        await socket_api.on_json_message(welcome(resume_token=token), other_user)
+        self.assertEqual(other_user.socket.sent[-1]["code"], 410)
+        self.assertFalse(other_user.is_authenticated)
+
+    async def test_expire(self):
+        """Suspended session is closed after grace period"""
+
+        token = self.user.socket.sent[-1]["resume_token"]
+        processor = self.user.processor
+        with mock.patch.object(settings, "socket_resume_s", 0.01):
+            await self.manager.onclose(self.user)
+        self.assertIn(token, self.manager.suspended_sessions)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.manager.suspended_sessions, {})
+        self.assertIsNone(processor.processor.compute_async)
+        new_user = await self.connect()
+        await socket_api.on_json_message(welcome(resume_token=token), new_user)
+        self.assertEqual(new_user.socket.sent[-1]["code"], 410)
+        self.assertEqual(new_user.socket.sent[-1]["name"], "ResumeFailed")
+
+    async def test_no_resume(self):
+        """Unknown tokens fail, without 'socket_resume_s' no token is issued"""
+
+        new_user = await self.connect()
+        await socket_api.on_json_message(welcome(resume_token="unknown"), new_user)
+        self.assertEqual(new_user.socket.sent[-1]["name"], "ResumeFailed")
+        with mock.patch.object(settings, "socket_resume_s", 0):
+            other_user = await self.connect()
+            await socket_api.on_json_message(welcome(), other_user)
+            self.assertNotIn("resume_token", other_user.socket.sent[-1])
+            processor = other_user.processor
+            await self.manager.onclose(other_user)
+        self.assertEqual(self.manager.suspended_sessions, {})
+        self.assertIsNone(processor.processor.compute_async)
+
+class TestHandle(unittest.IsolatedAsyncioTestCase):
+    """Connection handler"""
+
+    async def test_invalid_message(self):
+        """Malformed or incomplete JSON is answered with 'InvalidMessage'"""
+
+        endpoint = socket_api.WebsocketApiEndpoint()
+        socket = FakeSocket(messages=[
+            {"text": '{"type": "pong", "msg_id": 1'},
+            {"text": '{"type": "audioend"}'},
+            {"text": '{"type": "pong", "msg_id": 1, "data": [1]}'},
+            {"text": '{"type": "pong", "msg_id": 1}'}
+        ])
+        await endpoint.handle(socket)
+        endpoint.socket_manager._heartbeat_task.cancel()
+        self.assertEqual([message["name"] for message in socket.sent[:3]],
+            ["InvalidMessage"] * 3)
+        self.assertEqual([message["code"] for message in socket.sent[:3]], [400] * 3)
+        # valid 'pong' before 'welcome' is refused as usual
+        self.assertEqual(socket.sent[3]["code"], 401)
+        self.assertEqual(endpoint.socket_manager.active_connections, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
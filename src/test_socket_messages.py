@@ -0,0 +1,72 @@
+"""Unit tests for socket_messages (uses settings of 'server-test.conf')"""
+
+import os
+import sys
+import unittest
+
+sys.argv = sys.argv[:1] + ["--settings",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "server-test.conf")]
+
+# pylint: disable=wrong-import-position
+from pydantic import ValidationError
+
+from socket_messages import (SocketJsonInputMessage, SocketJsonControlMessage,
+    parse_socket_json_message)
+
+FIELDS = list(SocketJsonInputMessage.__fields__)
+
+class TestParseMessage(unittest.TestCase):
+    """Fast path for control messages and full validation give the same result"""
+
+    def assert_same_fields(self, message, text):
+        """Compare all fields with result of full validation"""
+        expected = SocketJsonInputMessage.parse_raw(text)
+        for field in FIELDS:
+            self.assertEqual(getattr(message, field), getattr(expected, field), field)
+
+    def test_fast_path(self):
+        """Well-formed control messages skip the model validation"""
+
+        for text in [
+            '{"type": "pong", "msg_id": 3}',
+            '{"type": "audioend", "msg_id": 4, "data": {"a": 1}}',
+            '{"type": "audioend", "msg_id": 5, "stream_id": 2, "ts": 1620804751062}',
+            '{"type": "pong", "msg_id": 6, "data": null, "stream_id": null}'
+        ]:
+            message = parse_socket_json_message(text)
+            self.assertIsInstance(message, SocketJsonControlMessage, text)
+            self.assert_same_fields(message, text)
+
+    def test_full_validation(self):
+        """Other messages and unusual control messages are validated by the model"""
+
+        for text in [
+            '{"type": "welcome", "msg_id": 1, "access_token": "t", "data": {"language": "de"}}',
+            '{"type": "pong", "msg_id": "7"}',
+            '{"type": "audioend", "msg_id": 8, "stream_id": "2"}',
+            '{"type": "chat", "msg_id": 9, "data": {"text": "hi"}}'
+        ]:
+            message = parse_socket_json_message(text)
+            self.assertIsInstance(message, SocketJsonInputMessage, text)
+            self.assert_same_fields(message, text)
+
+    def test_invalid(self):
+        """Malformed or incomplete messages raise for both paths"""
+
+        for text in [
+            '{"type": "pong", "msg_id": 1',
+            '',
+            'null',
+            '["pong", 1]',
+            '{"type": "pong"}',
+            '{"msg_id": 1}',
+            '{"type": "audioend", "msg_id": "x"}',
+            '{"type": "pong", "msg_id": 1, "data": [1]}',
+            '{"type": "audioend", "msg_id": 1, "stream_id": "x"}'
+        ]:
+            with self.assertRaises((ValidationError, ValueError), msg=text):
+                parse_socket_json_message(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
 """Unit tests for text_processor"""
 
 import unittest
-from text_to_num import alpha2digit
-from text_processor import DateAndTimeOptimizer
+from unittest import mock
+from text_to_num import alpha2digit, alpha2digit_batch, alpha2digit_cache_info
+from text_to_num import transforms
+from text_to_num.lang import LANG
+from text_to_num.lang.portuguese import OrdinalsMerger
+from text_to_num.parsers import WordStreamValueParserGerman
+from text_processor import DateAndTimeOptimizer, get_text_pipeline, PartialResultOptimizer
 
 optimizer = {
     "de": DateAndTimeOptimizer("de"),
@@ -128,12 +133,146 @@ class TestTextProcessor(unittest.TestCase):
             "8 PM, 6:30 AM, 10 o clock, 12 o'clock, 5 o`clock"
         )
 
+        self.assertEqual(apply_optimize_pipeline(
+            "six thirty pm and seven forty five pm", self.EN),
+            "6:30 pm and 7:45 pm"
+        )
+
         # TODO: expected to fail atm:
         self.assertEqual(apply_optimize_pipeline(
             "we meet at quarter past nine", self.EN),
             "we meet at quarter past 9"
         )
 
+    def test_pipeline(self):
+        """Shared post-processing pipeline tests"""
+
+        self.assertIs(get_text_pipeline("de-DE"), get_text_pipeline("de_DE"))
+        self.assertEqual(get_text_pipeline("de-DE").process(
+            "Um zwölf Uhr dreißig und siebzehn uhr fünfzehn."),
+            "Um 12:30 Uhr und 17:15 Uhr."
+        )
+        self.assertEqual(get_text_pipeline("en-US").process(
+            "six thirty pm"),
+            "6:30 pm"
+        )
+        self.assertEqual(get_text_pipeline("xx-XX").process("eins zwei"), "eins zwei")
+        self.assertEqual(get_text_pipeline("de-DE").process(""), "")
+
+    def test_partial_results(self):
+        """Incremental post-processing of partial results"""
+
+        for language, text in [
+            ("de-DE", "weck mich um sieben Uhr dreißig und kauf zwei hundert Kisten im Osten"),
+            ("en-US", "wake me at six thirty pm and buy two hundred boxes in the east")
+        ]:
+            pipeline = get_text_pipeline(language)
+            optimizer = PartialResultOptimizer(pipeline)
+            words = text.split()
+            for i in range(1, len(words) + 1):
+                partial = " ".join(words[:i])
+                self.assertEqual(optimizer.process(partial), pipeline.process(partial))
+        # changed tail and new utterance (English)
+        self.assertEqual(optimizer.process("wake me at six"), "wake me at 6")
+        self.assertEqual(optimizer.process("two"), pipeline.process("two"))
+        # partial results don't use (and don't fill) the shared result cache
+        pipeline = get_text_pipeline("en-US", use_cache=False)
+        self.assertIsNot(pipeline, get_text_pipeline("en-US"))
+        cache_size = alpha2digit_cache_info().currsize
+        optimizer = PartialResultOptimizer(pipeline)
+        self.assertEqual(optimizer.process("buy three hundred twelve boxes"),
+            "buy 312 boxes")
+        self.assertEqual(alpha2digit_cache_info().currsize, cache_size)
+
+    def test_german_number_parser(self):
+        """Incremental German parser: 'push' of each token gives the same result as 'parse'"""
+
+        def parse(text):
+            parser = WordStreamValueParserGerman(LANG["de"], relaxed=True)
+            try:
+                parser.parse(text)
+            except ValueError:
+                return None
+            return parser.value
+
+        for text in [
+            "dreiundfünfzig millionen zweihundertdreiundvierzigtausendsiebenhundertvierundzwanzig",
+            "zwei hundert drei und vierzig tausend sieben hundert ein und zwanzig",
+            "eine million zweihunderttausend",
+            "tausend einhundert zwei tausend",
+            "neunzehnhundertneunundneunzig",
+            "null komma fünf",
+            "zwei und und drei"
+        ]:
+            parser = WordStreamValueParserGerman(LANG["de"], relaxed=True)
+            tokens = text.split()
+            for i, token in enumerate(tokens):
+                expected = parse(" ".join(tokens[:i + 1]))
+                self.assertEqual(parser.push(token), expected is not None, text)
+                if expected is not None:
+                    self.assertEqual(parser.value, expected, text)
+        self.assertEqual(parse("dreiundfünfzig millionen "
+            "zweihundertdreiundvierzigtausendsiebenhundertvierundzwanzig"), 53243724)
+        # misplaced 'und' is an invalid number (no KeyError)
+        for text in ["und tausend", "zwei und und", "hundert und million"]:
+            self.assertIsNone(parse(text), text)
+        self.assertEqual(alpha2digit("zwei und und drei", "de"), "2 und und 3")
+        # signed numbers
+        self.assertEqual(alpha2digit("minus zweihundert tausend", "de"), "-200000")
+        self.assertEqual(alpha2digit(
+            "es hat minus zweihundert tausend grad und minus fünf", "de"),
+            "es hat -200000 grad und -5"
+        )
+        self.assertEqual(alpha2digit("plus drei tausend zwei hundert", "de"), "+3200")
+        self.assertEqual(alpha2digit("minus eine million zweihunderttausend", "de"), "-1200000")
+        self.assertEqual(alpha2digit("minus null komma fünf", "de"), "-0,5")
+
+    def test_alpha2digit_batch(self):
+        """Batch conversion gives the same results as single texts (with and without pool)"""
+
+        texts = {
+            "de": ["wecke mich um sieben Uhr dreißig", "am ersten zweiten zwei tausend",
+                "minus zweihundert tausend", "zwei und und drei", ""],
+            "en": ["wake me at six thirty pm", "the twenty first of march",
+                "minus two hundred thousand", "one two three", ""],
+            "fr": ["trois cent vingt-cinq euros", "le vingt et un mars", "moins cinq", ""],
+            "es": ["trescientos veinticinco euros", "el veintiuno de marzo", "menos cinco", ""],
+            "pt": ["trezentos e vinte e cinco euros", "vigésimo primeiro dia", "menos cinco", ""]
+        }
+        self.assertEqual(sorted(texts), sorted(LANG))
+        for lang, lang_texts in texts.items():
+            self.assertEqual(alpha2digit_batch(lang_texts, lang, relaxed=True),
+                [alpha2digit(text, lang, relaxed=True) for text in lang_texts], lang)
+        # process pool for large batches
+        lang_texts = texts["de"] * 3
+        with mock.patch.object(transforms, "BATCH_MIN_TEXTS_PER_PROCESS", 2):
+            self.assertEqual(alpha2digit_batch(lang_texts, "de", processes=2),
+                [alpha2digit(text, "de") for text in lang_texts])
+
+    def test_ordinals_merger_pt(self):
+        """Portuguese compound ordinals for text and pre-split segments"""
+
+        self.assertEqual(alpha2digit(
+            "vigésimo primeiro dia, trigésima sétima vez.", "pt"),
+            "21º dia, 37ª vez."
+        )
+        self.assertEqual(alpha2digit(
+            "o vigésimo segundo dia custa três vírgula cinco euros", "pt"),
+            "o 22º dia custa 3,5 euros"
+        )
+        merger = OrdinalsMerger()
+        self.assertEqual(merger.merge_compound_ordinals_pt(
+            "20º 7º, 1º lugar e 2ª vez"),
+            "27º, primeiro lugar e segunda vez"
+        )
+        self.assertEqual(merger.merge_segments(
+            [["20º", "7º"], ["1º", "lugar", "e", "2ª", "vez"]], [", ", ""]),
+            "27º, primeiro lugar e segunda vez"
+        )
+        self.assertEqual(merger.merge_segments([["20º", "3,5"], ["7º"]], [" (", ")"]),
+            merger.merge_compound_ordinals_pt("20º 3,5 (7º)")
+        )
+
 
 if __name__ == '__main__':
 
@@ -1,13 +1,18 @@
 """Tools to post-process text results like text2number"""
 
 import re
+import threading
+from functools import lru_cache
 from typing import Optional
 
 from text_to_num.lang import LANG
-from text_to_num import alpha2digit
+from text_to_num import alpha2digit, alpha2digit_cached
 
 class TextProcessor():
     """Common text processor interface"""
+    # Processors with result caches only use them if True (see 'get_text_pipeline')
+    use_cache = True
+
     def __init__(self, language_code: str = None):
         """Create new processor for specific language.
         Use language format xx_XX, e.g. de_DE or en_US."""
@@ -22,6 +27,12 @@ class TextProcessor():
     def process(self, text_input: str):
         """Process string and return new string"""
 
+    def is_boundary_word(self, word: str):
+        """True if 'word' can never be part of a text this processor changes, so a text
+        can be split between two such words and processed in parts (see
+        'PartialResultOptimizer'). Default is False (always process whole text)."""
+        return False
+
 # Tools:
 
 def search_via_regex(text_in: str, pattern: str) -> Optional[dict]:
@@ -54,12 +65,33 @@ class TextToNumberProcessor(TextProcessor):
         super().__init__(language_code)
         if self.language_code_short in LANG:
             self.supports_language = True
+        # cache result for each word (checked for every new word of partial results)
+        self.is_boundary_word = lru_cache(maxsize=4096)(self.is_boundary_word)
+
+    def is_boundary_word(self, word: str):
+        """Word without digits, punctuation and number words (incl. parts of compounds)"""
+        if not word.isalpha():
+            return False
+        if not self.supports_language:
+            return True
+        language = LANG[self.language_code_short]
+        word = word.lower()
+        if language.AGGLUTINATIVE and language.split_number_word(
+                word, prefix_length=4).split() != [word]:
+            # contains number words or ordinal endings (as after other words)
+            return False
+        parts = [word, language.normalize(word)]
+        return language.ord2card(word) is None and not any(
+            part in language.NUMBERS or part in language.ZERO or part in language.SIGN
+            or part in language.NEVER_IF_ALONE or part == language.AND
+            or part == language.DECIMAL_SEP for part in parts)
 
     def process(self, text_input: str):
         """Take input text and replace number strings with real numbers"""
         if text_input and self.supports_language:
-            # convert numbers in text to digits
-            return alpha2digit(text_input, self.language_code_short,
+            # convert numbers in text to digits (cached, final results are often repeated)
+            convert = alpha2digit_cached if self.use_cache else alpha2digit
+            return convert(text_input, self.language_code_short,
                 relaxed=True, ordinal_threshold=0)
         elif text_input:
             # return unchanged
@@ -86,85 +118,89 @@ class DateAndTimeOptimizer(TextProcessor):
             elif self.language_code_short == "en":
                 self.time_optimizer = DateAndTimeOptimizer.optimize_time_en
                 self.date_optimizer = DateAndTimeOptimizer.optimize_date_en
+        self.context_words = DateAndTimeOptimizer.CONTEXT_WORDS.get(self.language_code_short, set())
+
+    # Words (besides numbers) used by the scanners below
+    CONTEXT_WORDS = {
+        "de": {"ein", "uhr"},
+        "en": {"one", "am", "pm", "o", "clock"}
+    }
+
+    # Precompiled scanners - boundaries are checked via lookarounds so each
+    # text is scanned once without splitting and recursion
+    _RE_TIME_DE_ONE = re.compile(r"(?<!\w)ein Uhr(?!\w)", flags=re.IGNORECASE)
+    _RE_TIME_DE = re.compile(r"(?<!\w)(\d{1,2}) Uhr (\d{1,2})(?!\w)", flags=re.IGNORECASE)
+    _RE_TIME_EN_ONE = re.compile(r"(?<!\w)one (a\.m\.|am|p\.m\.|pm|o\Wclock)(?!\w)",
+        flags=re.IGNORECASE)
+    _RE_TIME_EN = re.compile(
+        r"(?<!\w)(\d{1,2}) (\d{1,2})(?:\s|)(a\.m\.|am|p\.m\.|pm|o\Wclock)(?!\w)",
+        flags=re.IGNORECASE)
+    _RE_DATE_DDMMYYYY_DOT = re.compile(r"(?<!\w)(\d{1,2})\. (\d{1,2})\.( \d{4}|)(?!\w)",
+        flags=re.IGNORECASE)
+
+    @staticmethod
+    def _replace_time_de(match):
+        """Replace valid German time match ('12 Uhr 30' -> '12:30 Uhr')"""
+        hour = int(match.group(1))
+        minutes = int(match.group(2))
+        if hour <= 24 and minutes < 60:
+            return str(hour) + ":" + str(minutes).zfill(2) + " Uhr"
+        # invalid times - keep org
+        return match.group(0)
 
     @staticmethod
     def optimize_time_de(text_in: str):
         """Optimize time presentation for German"""
-        opt_text = re.sub(r"(^|\W)(ein Uhr)($|\W)",
-            r"\g<1>1 Uhr\g<3>", text_in, flags=re.IGNORECASE)
-        search_res = search_via_regex(opt_text, r"\d{1,2} Uhr \d{1,2}")
-        if not search_res:
-            return opt_text
-        # match
-        parts = re.split(r"\s+", search_res['text_match'])
-        hour = int(parts[0])
-        minutes = int(parts[2])
-        opt_text = search_res['text_before']
+        opt_text = DateAndTimeOptimizer._RE_TIME_DE_ONE.sub("1 Uhr", text_in)
+        return DateAndTimeOptimizer._RE_TIME_DE.sub(
+            DateAndTimeOptimizer._replace_time_de, opt_text)
+
+    @staticmethod
+    def _replace_time_en(match):
+        """Replace valid English time match ('8 30 am' -> '8:30 am')"""
+        hour = int(match.group(1))
+        minutes = int(match.group(2))
         if hour <= 24 and minutes < 60:
-            # valid times - replace and continue search in rest
-            opt_text += str(hour) + ":" + str(minutes).zfill(2) + " Uhr"
-        else:
-            # invalid times - keep org
-            opt_text += search_res['text_match']
-        # continue search in rest
-        return opt_text + DateAndTimeOptimizer.optimize_time_de(search_res['text_after'])
+            # time_ind = time_ind.lower().replace("am", "a.m.").replace("pm", "p.m.")
+            # time_ind = time_ind.replace("o clock", "o'clock")
+            return str(hour) + ":" + str(minutes).zfill(2) + " " + match.group(3)
+        # invalid times - keep org
+        return match.group(0)
 
     @staticmethod
     def optimize_time_en(text_in: str):
         """Optimize time presentation for English"""
-        opt_text = re.sub(r"(^|\W)(one (a\.m\.|am|p\.m\.|pm|o\Wclock))($|\W)",
-            r"\g<1>1 \g<3>\g<4>", text_in, flags=re.IGNORECASE)
+        opt_text = DateAndTimeOptimizer._RE_TIME_EN_ONE.sub(r"1 \g<1>", text_in)
         # TODO: alarm/timer/reminder for/to 8 30
-        search_res = search_via_regex(opt_text,
-            r"\d{1,2} \d{1,2}(?:\s|)(a\.m\.|am|p\.m\.|pm|o\Wclock)")
-        if not search_res:
-            return opt_text
-        # match
-        nums = re.sub(r"(.*\d)(.*)", r"\g<1>", search_res['text_match'])
-        time_ind = search_res['text_match'].replace(nums, "").strip()
-        # time_ind = time_ind.lower().replace("am", "a.m.").replace("pm", "p.m.")
-        # time_ind = time_ind.replace("o clock", "o'clock")
-        parts = re.split(r"\s+", nums)
-        hour = int(parts[0])
-        minutes = int(parts[1])
-        opt_text = search_res['text_before']
-        if hour <= 24 and minutes < 60:
-            # valid times - replace and continue search in rest
-            opt_text += str(hour) + ":" + str(minutes).zfill(2) + " " + time_ind
-        else:
-            # invalid times - keep org
-            opt_text += search_res['text_match']
-        # continue search in rest
-        return opt_text + DateAndTimeOptimizer.optimize_time_de(search_res['text_after'])
+        return DateAndTimeOptimizer._RE_TIME_EN.sub(
+            DateAndTimeOptimizer._replace_time_en, opt_text)
+
+    @staticmethod
+    def _replace_date_ddmmyyyy_dot(match):
+        """Replace valid date match ('1. 2. 2022' -> '01.02.2022')"""
+        day = int(match.group(1))
+        month = int(match.group(2))
+        if day <= 31 and month <= 12:
+            year = match.group(3).strip()
+            return str(day).zfill(2) + "." + str(month).zfill(2) + "." + year
+        # invalid day/month - keep
+        return match.group(0)
 
     @staticmethod
     def optimize_date_ddmmyyyy_dot(text_in: str):
         """Optimize date presentation for format 'dd.MM.yyyy'"""
-        opt_text = text_in
-        search_res = search_via_regex(opt_text, r"\d{1,2}\. \d{1,2}\.( \d{4}|)")
-        if not search_res:
-            return opt_text
-        # match
-        parts = re.split(r"\s+", search_res['text_match'])
-        day = int(parts[0].replace(".", ""))
-        month = int(parts[1].replace(".", ""))
-        year = parts[2] if len(parts) == 3 else ""
-        opt_text = search_res['text_before']
-        if day <= 31 and month <= 12:
-            # valid date numbers - replace
-            opt_text += str(day).zfill(2) + "." + str(month).zfill(2) + "." + year
-        else:
-            # invalid day/month - keep
-            opt_text += search_res['text_match']
-        # continue search in rest
-        return (opt_text +
-            DateAndTimeOptimizer.optimize_date_ddmmyyyy_dot(search_res['text_after']))
+        return DateAndTimeOptimizer._RE_DATE_DDMMYYYY_DOT.sub(
+            DateAndTimeOptimizer._replace_date_ddmmyyyy_dot, text_in)
 
     @staticmethod
     def optimize_date_en(text_in: str):
         """Optimize date presentation for English"""
         return text_in
 
+    def is_boundary_word(self, word: str):
+        """Word without digits and punctuation that is not used by date/time scanners"""
+        return word.isalpha() and word.lower() not in self.context_words
+
     def process(self, text_input: str):
         """Take input text and optimize date and time presentation"""
         if not text_input:
@@ -177,3 +213,108 @@ class DateAndTimeOptimizer(TextProcessor):
         if self.date_optimizer:
             opt_text = self.date_optimizer(opt_text)
         return opt_text
+
+
+class TextPipeline(TextProcessor):
+    """Chain of text processors (stages) for one language, e.g. text2num and
+    date/time optimizer. Stages are created once and shared by all sessions."""
+    def __init__(self, language_code: str = None, stages: list = None, use_cache: bool = True):
+        """Create pipeline for specific language using given stage classes.
+        Set 'use_cache' to False for texts that are rarely repeated (e.g. partial results)."""
+        super().__init__(language_code)
+        if stages is None:
+            stages = PIPELINE_STAGES
+        self.use_cache = use_cache
+        # keep only stages that can do something for this language
+        self.stages = [stage for stage in (stage_class(self.language_code)
+            for stage_class in stages) if stage.supports_language]
+        for stage in self.stages:
+            stage.use_cache = use_cache
+        self.supports_language = len(self.stages) > 0
+
+    def process(self, text_input: str):
+        """Run text through all stages and return result"""
+        if not text_input:
+            return ""
+        for stage in self.stages:
+            text_input = stage.process(text_input)
+        return text_input
+
+    def is_boundary_word(self, word: str):
+        """Word is a boundary for all stages"""
+        return all(stage.is_boundary_word(word) for stage in self.stages)
+
+class PartialResultOptimizer():
+    """Post-process the partial results of one session incrementally with a pipeline.
+    Partial results usually grow word by word, so the text is split between two
+    boundary words (see 'TextProcessor.is_boundary_word') into blocks, the
+    processed blocks of the stable prefix are kept and only the changed tail
+    is processed again. The result is the same as processing the whole text."""
+    def __init__(self, pipeline: TextPipeline):
+        """Create optimizer for one session (keeps state of last partial result)"""
+        self.pipeline = pipeline
+        self.reset()
+
+    def reset(self):
+        """Forget last partial result (e.g. after final result)"""
+        self._words = []
+        # processed blocks of last result: (index of first word after block, text)
+        self._blocks = []
+
+    def process(self, text_input: str):
+        """Process partial result and return optimized text"""
+        words = text_input.split()
+        # length of unchanged prefix
+        max_common = min(len(words), len(self._words))
+        common = 0
+        while common < max_common and words[common] == self._words[common]:
+            common += 1
+        # keep blocks that end before the unchanged boundary word of the next block
+        blocks = self._blocks
+        while blocks and blocks[-1][0] >= common:
+            blocks.pop()
+        start = blocks[-1][0] if blocks else 0
+        # add new blocks after the stable ones
+        is_boundary_word = self.pipeline.is_boundary_word
+        prev_is_boundary = False
+        for index in range(start, len(words)):
+            is_boundary = is_boundary_word(words[index])
+            if is_boundary and prev_is_boundary and index > start:
+                blocks.append((index, self.pipeline.process(" ".join(words[start:index]))))
+                start = index
+            prev_is_boundary = is_boundary
+        self._words = words
+        # tail is processed each time (it can still change with the next word)
+        tail = self.pipeline.process(" ".join(words[start:]))
+        return " ".join([text for _, text in blocks] + ([tail] if tail else []))
+
+# Default post-processing stages (in order) - extend via 'add_pipeline_stage'
+PIPELINE_STAGES = [TextToNumberProcessor, DateAndTimeOptimizer]
+
+# Process-wide pipelines by language code
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+def get_text_pipeline(language_code: str, use_cache: bool = True) -> TextPipeline:
+    """Get shared post-processing pipeline for language (build on first request).
+    Pipelines without result cache ('use_cache' False) are used for partial results,
+    so their unique texts don't push the repeated final results out of the cache."""
+    key = (language_code.replace("-", "_") if language_code else "", use_cache)
+    pipeline = _pipelines.get(key)
+    if pipeline is None:
+        with _pipelines_lock:
+            pipeline = _pipelines.get(key)
+            if pipeline is None:
+                pipeline = TextPipeline(language_code, use_cache=use_cache)
+                _pipelines[key] = pipeline
+    return pipeline
+
+def add_pipeline_stage(stage_class, index: int = None):
+    """Add a 'TextProcessor' class as new default stage (at end or at index)
+    and drop all cached pipelines so they are rebuilt with it"""
+    with _pipelines_lock:
+        if index is None:
+            PIPELINE_STAGES.append(stage_class)
+        else:
+            PIPELINE_STAGES.insert(index, stage_class)
+        _pipelines.clear()
@@ -20,4 +20,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from .transforms import text2num, alpha2digit  # noqa: F401
+from .transforms import (  # noqa: F401
+    text2num,
+    alpha2digit,
+    alpha2digit_batch,
+    alpha2digit_cached,
+    set_alpha2digit_cache_size,
+    alpha2digit_cache_info,
+)
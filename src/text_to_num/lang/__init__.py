@@ -24,17 +24,68 @@
 Language support.
 """
 
+import threading
+from collections.abc import Mapping
+from importlib import import_module
+from typing import Dict, Iterator, Tuple, Type
+
 from .base import Language  # noqa: F401
-from .french import French
-from .english import English
-from .spanish import Spanish
-from .portuguese import Portuguese
-from .german import German
-
-LANG = {
-    "fr": French(),
-    "en": English(),
-    "es": Spanish(),
-    "pt": Portuguese(),
-    "de": German(),
+
+# Module and class of each language - imported and created on first use
+LANGUAGE_CLASSES: Dict[str, Tuple[str, str]] = {
+    "fr": ("french", "French"),
+    "en": ("english", "English"),
+    "es": ("spanish", "Spanish"),
+    "pt": ("portuguese", "Portuguese"),
+    "de": ("german", "German"),
 }
+
+
+def get_language_class(code: str) -> Type[Language]:
+    """Import language module and return the class for language ``code``."""
+    module_name, class_name = LANGUAGE_CLASSES[code]
+    return getattr(import_module("." + module_name, __name__), class_name)
+
+
+class LanguageRegistry(Mapping):
+    """Read-only mapping of language code to ``Language`` instance.
+    Each language is imported and created when it is requested the first time.
+    """
+
+    def __init__(self, classes: Dict[str, Tuple[str, str]]) -> None:
+        self._classes = classes
+        self._languages: Dict[str, Language] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, code: str) -> Language:
+        language = self._languages.get(code)
+        if language is None:
+            if code not in self._classes:
+                raise KeyError(code)
+            with self._lock:
+                language = self._languages.get(code)
+                if language is None:
+                    language = get_language_class(code)()
+                    self._languages[code] = language
+        return language
+
+    def __contains__(self, code: object) -> bool:
+        # check without loading the language
+        return code in self._classes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+
+LANG = LanguageRegistry(LANGUAGE_CLASSES)
+
+
+def __getattr__(name: str) -> Type[Language]:
+    """Import language classes like ``German`` on first access."""
+    for code, (_, class_name) in LANGUAGE_CLASSES.items():
+        if class_name == name:
+            return get_language_class(code)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -51,6 +51,12 @@ class Language:
     # start => (next, target)
     RELAXED: Dict[str, Tuple[str, str]]
 
+    # Numbers are written as one word (e.g. German "einundzwanzig") and need the
+    # "agglutinative" parser
+    AGGLUTINATIVE = False
+    # Compound ordinals are merged after conversion (see Portuguese 'OrdinalsMerger')
+    MERGE_COMPOUND_ORDINALS = False
+
     def ord2card(self, word: str) -> Optional[str]:
         """Convert ordinal number to cardinal.
 
@@ -69,7 +75,8 @@ class Language:
     def not_numeric_word(self, word: Optional[str]) -> bool:
         return word is None or word != self.DECIMAL_SEP and word not in self.NUMBERS
 
-    def split_number_word(self, word: str) -> str:  # maybe use: List[str]
+    # maybe use: List[str]
+    def split_number_word(self, word: str, prefix_length: int = 0) -> str:
         """In some languages numbers are written as one word, e.g. German
         'zweihunderteinundfünfzig' (251) and we might need to split the parts"""
         return NotImplemented
@@ -105,12 +105,36 @@ ALL_WORDS_SORTED_REVERSE = dict(sorted(
     reverse=True
 ))
 
+# Trie of all words for longest-match segmentation in 'split_number_word'
+# (nested dicts by character, WORD_END marks the end of a word)
+WORD_END = ""
+ALL_WORDS_TRIE: Dict[str, dict] = {}
+for _word in ALL_WORDS_SORTED_REVERSE:
+    _node = ALL_WORDS_TRIE
+    for _char in _word:
+        _node = _node.setdefault(_char, {})
+    _node[WORD_END] = _word
+del _word, _node, _char
+
+
+def longest_word_at(text: str, start: int) -> Optional[str]:
+    """Return longest number word of 'ALL_WORDS_TRIE' found at index 'start' of text"""
+    node = ALL_WORDS_TRIE
+    word = None
+    for index in range(start, len(text)):
+        node = node.get(text[index])
+        if node is None:
+            break
+        word = node.get(WORD_END, word)
+    return word
+
 
 class German(Language):
 
     # TODO: can this be replaced entirely?
     # Currently it has to be imported into 'parsers' as well ...
     NUMBER_DICT_GER = {"null": 0, **NUMBERS}
+    NUMBER_WORDS_GER = tuple(NUMBER_DICT_GER)   # for 'endswith' checks
 
     ORDINALS_FIXED_GER = {
         "erste": "eins",
@@ -120,6 +144,8 @@ class German(Language):
         "achte": "acht"
     }
     LARGE_ORDINAL_SUFFIXES_GER = r"^(ster|stes|sten|ste)(\s|$)"  # RegEx for ord. > 19
+    # same without anchor to match at any index
+    LARGE_ORDINAL_SUFFIXES_GER_RE = re.compile(r"(?:ster|stes|sten|ste)(?:\s|$)")
 
     MULTIPLIERS = MULTIPLIERS
     UNITS = UNITS
@@ -140,6 +166,8 @@ class German(Language):
     NEVER_IF_ALONE = {"ein", "eine"}
     NEVER_CONNECTS_WITH_AND = {"eins", "eine"}
 
+    AGGLUTINATIVE = True
+
     # Relaxed composed numbers (two-words only)
     # start => (next, target)
     # RELAXED: Dict[str, Tuple[str, str]] = {}  # TODO: not supported yet
@@ -165,7 +193,7 @@ class German(Language):
                     if word_base in self.NUMBER_DICT_GER:
                         return word_base
                     # here we could still have e.g: "zweiundzwanzig"
-                    if word_base.endswith(tuple(self.NUMBER_DICT_GER)):
+                    if word_base.endswith(self.NUMBER_WORDS_GER):
                         # once again split - TODO: we should try to reduce split calls
                         word_base_split = self.split_number_word(word_base).split()
                         wbs_length = len(word_base_split)
@@ -187,48 +215,46 @@ class German(Language):
     def normalize(self, word: str) -> str:
         return word
 
-    def split_number_word(self, word: str) -> str:
+    def split_number_word(self, word: str, prefix_length: int = 0) -> str:
         """Splits number words into separate words, e.g.
         einhundertfünzig -> ein hundert fünfzig
+        Use 'prefix_length' (length of split text of previous words) to split
+        word by word with the same result as for the whole text.
         """
         text = word.lower()  # NOTE: if we want to use this outside it should keep case
-        invalid_word = ""
+        text_length = len(text)
+        index = 0
+        invalid_start = -1      # start index of current invalid (non-number) word
         result = ""
-        while len(text) > 0:
-            # start with the longest
-            found = False
-            for sw, int_num in ALL_WORDS_SORTED_REVERSE.items():
-                # Check at the beginning of the current sentence for the longest word in ALL_WORDS
-                if text.startswith(sw):
-                    if len(invalid_word) > 0:
-                        result += invalid_word + " "
-                        invalid_word = ""
-                    result += sw + " "
-                    text = text[len(sw):]
-                    found = True
-                    break
-            # current beginning could not be assigned to a word:
-            if not found:
-                # is (large) ordinal ending?
-                ord_match = None
-                if len(result) > 3 and text.startswith("ste"):
-                    ord_match = re.search(self.LARGE_ORDINAL_SUFFIXES_GER, text)
-
-                if ord_match:
-                    # add ordinal ending
-                    end = ord_match.span()[1]
-                    # result = result[:-1] + text[start:end]   # drop last space and add suffix
-                    text = text[end:]
-                    invalid_word = ""
-                elif not text[0] == " ":
-                    # move one index
-                    invalid_word += text[0:1]
-                    text = text[1:]
-                else:
-                    if len(invalid_word) > 0:
-                        result += invalid_word + " "
-                        invalid_word = ""
-                    text = text[1:]
-        if len(invalid_word) > 0:
-            result += invalid_word + " "
+        while index < text_length:
+            # take the longest word at current index
+            found_word = longest_word_at(text, index)
+            if found_word is not None:
+                if invalid_start >= 0:
+                    result += text[invalid_start:index] + " "
+                    invalid_start = -1
+                result += found_word + " "
+                index += len(found_word)
+                continue
+            # current index could not be assigned to a word:
+            # is (large) ordinal ending?
+            ord_match = None
+            if prefix_length + len(result) > 3 and text.startswith("ste", index):
+                ord_match = self.LARGE_ORDINAL_SUFFIXES_GER_RE.match(text, index)
+            if ord_match:
+                # skip ordinal ending
+                index = ord_match.end()
+                invalid_start = -1
+            elif text[index] != " ":
+                # move one index
+                if invalid_start < 0:
+                    invalid_start = index
+                index += 1
+            else:
+                if invalid_start >= 0:
+                    result += text[invalid_start:index] + " "
+                    invalid_start = -1
+                index += 1
+        if invalid_start >= 0:
+            result += text[invalid_start:] + " "
         return result
@@ -178,6 +178,8 @@ class Portuguese(Language):
     # start => (next, target)
     RELAXED: Dict[str, Tuple[str, str]] = {}
 
+    MERGE_COMPOUND_ORDINALS = True
+
     PT_ORDINALS = {
         "primeir": "um",
         "segund": "dois",
@@ -233,6 +235,9 @@ class Portuguese(Language):
 
 
 SEGMENT_BREAK = re.compile(r"\s*[\.,;\(\)…\[\]:!\?]+\s*")
+# same as group to get segments and separators with one 'split'
+SEGMENT_BREAK_SPLIT = re.compile(r"(\s*[\.,;\(\)…\[\]:!\?]+\s*)")
+SEGMENT_BREAK_CHAR = re.compile(r"[\.,;\(\)…\[\]:!\?]")
 
 SUB_REGEXES = [
     (re.compile(r"1\s"), "um "),
@@ -244,6 +249,17 @@ SUB_REGEXES = [
     (re.compile(r"\b2\ª\b"), "segunda"),
     (re.compile(r"\b3\ª\b"), "terceira"),
 ]
+# All ordinal 'SUB_REGEXES' combined (for tokens without whitespace)
+SUB_ORDINALS = re.compile(r"\b[123][º°ª]\b")
+SUB_ORDINALS_WORDS = {
+    "1º": "primeiro", "1°": "primeiro", "1ª": "primeira",
+    "2º": "segundo", "2°": "segundo", "2ª": "segunda",
+    "3º": "terceiro", "3°": "terceiro", "3ª": "terceira",
+}
+# Any token of a segment that could be an ordinal or be changed by 'SUB_REGEXES'
+MERGE_CANDIDATE = re.compile(r"[º°ª]|primeir[oa]|segund[oa]|terceir[oa]|[12][^\S ]")
+# Whitespace inside tokens ('SUB_REGEXES' have to be applied one by one)
+TOKEN_WHITESPACE = re.compile(r"[^\S ]")
 
 
 class OrdinalsMerger:
@@ -260,47 +276,69 @@ class OrdinalsMerger:
 
         """
 
-        segments = re.split(SEGMENT_BREAK, text)
-        punct = re.findall(SEGMENT_BREAK, text)
-        if len(punct) < len(segments):
-            punct.append("")
+        parts = SEGMENT_BREAK_SPLIT.split(text)
+        parts.append("")    # separator of last segment
         out_segments = []
-        for segment, sep in zip(segments, punct):  # loop over segments
-            tokens = [t for t in segment.split(" ") if len(t) > 0]
-
-            pointer = 0
-            tokens_ = []
-            current_is_ordinal = False
-            seq = []
-
-            while pointer < len(tokens):
-                token = tokens[pointer]
-                if self.is_ordinal(token):  # found an ordinal, push into new seq
-                    current_is_ordinal = True
-                    seq.append(self.get_cardinal(token))
-                    gender = self.get_gender(token)
-                else:
-                    if current_is_ordinal is False:  # add standard token
-                        tokens_.append(token)
-                    else:  # close seq
-                        ordinal = sum(seq)
-                        tokens_.append(str(ordinal) + gender)
-                        tokens_.append(token)
-                        seq = []
-                        current_is_ordinal = False
-                pointer += 1
-
-            if current_is_ordinal is True:  # close seq for single token expressions
-                ordinal = sum(seq)
-                tokens_.append(str(ordinal) + gender)
-
-            tokens_ = self.text2num_style(tokens_)
-            segment = " ".join(tokens_) + sep
-            out_segments.append(segment)
-
-        text = "".join(out_segments)
-
-        return text
+        for index in range(0, len(parts), 2):  # loop over segments
+            tokens = [t for t in parts[index].split(" ") if len(t) > 0]
+            out_segments.append(self.merge_segment(tokens) + parts[index + 1])
+
+        return "".join(out_segments)
+
+    def merge_segments(self, segments: List[List[str]], punct: List[str]) -> str:
+        """Same as 'merge_compound_ordinals_pt' for a text that is already split into
+        segments of tokens and separators (e.g. by 'alpha2digit')
+        """
+        out_segments = []
+        for tokens, sep in zip(segments, punct):
+            segment = " ".join(tokens)
+            if SEGMENT_BREAK_CHAR.search(segment):
+                # e.g. decimal number: split again to get the same result as for text
+                out_segments.append(self.merge_compound_ordinals_pt(segment + sep))
+            else:
+                out_segments.append(self.merge_segment(tokens, segment) + sep)
+        return "".join(out_segments)
+
+    def merge_segment(self, tokens: List[str], segment: Optional[str] = None) -> str:
+        """Merge compound ordinals of one segment (list of non-empty tokens) and return
+        segment text. Optionally give joined tokens as 'segment' to save a join.
+        """
+        if segment is None:
+            segment = " ".join(tokens)
+        if not MERGE_CANDIDATE.search(segment):
+            return segment
+
+        pointer = 0
+        tokens_ = []
+        current_is_ordinal = False
+        seq = []
+
+        while pointer < len(tokens):
+            token = tokens[pointer]
+            if self.is_ordinal(token):  # found an ordinal, push into new seq
+                current_is_ordinal = True
+                seq.append(self.get_cardinal(token))
+                gender = self.get_gender(token)
+            else:
+                if current_is_ordinal is False:  # add standard token
+                    tokens_.append(token)
+                else:  # close seq
+                    ordinal = sum(seq)
+                    tokens_.append(str(ordinal) + gender)
+                    tokens_.append(token)
+                    seq = []
+                    current_is_ordinal = False
+            pointer += 1
+
+        if current_is_ordinal is True:  # close seq for single token expressions
+            ordinal = sum(seq)
+            tokens_.append(str(ordinal) + gender)
+
+        segment = " ".join(tokens_)
+        if TOKEN_WHITESPACE.search(segment):
+            return " ".join(self.text2num_style(tokens_))
+        # without whitespace in tokens only the ordinals can change
+        return SUB_ORDINALS.sub(lambda match: SUB_ORDINALS_WORDS[match.group()], segment)
 
     @staticmethod
     def is_ordinal(token: str) -> bool:
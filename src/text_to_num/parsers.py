@@ -26,7 +26,6 @@ Convert spelled numbers into numeric values or digit strings.
 from typing import List, Optional
 
 from text_to_num.lang import Language
-from text_to_num.lang.german import German  # TODO: optimize and remove
 
 
 class WordStreamValueParserInterface:
@@ -64,6 +63,7 @@ class WordStreamValueParser(WordStreamValueParserInterface):
     Public API:
 
         - ``self.push(word)``
+        - ``self.reset()``
         - ``self.value: int``
     """
 
@@ -81,6 +81,13 @@ class WordStreamValueParser(WordStreamValueParserInterface):
             str
         ] = None  # the last valid word for the current group
 
+    def reset(self) -> None:
+        """Reset the parser to start with a new number."""
+        self.skip = None
+        self.n000_val = 0
+        self.grp_val = 0
+        self.last_word = None
+
     @property
     def value(self) -> int:
         """At any moment, get the value of the currently recognized number."""
@@ -148,8 +155,9 @@ class WordStreamValueParser(WordStreamValueParserInterface):
         If this function returns False, and the last call returned True, that means you
         reached the end of a number. You can get its value from ``self.value``.
 
-        Then, to parse a new number, you need to instanciate a new engine and start
-        again from the last word you tried (the one that has just been rejected).
+        Then, to parse a new number, you need to call ``self.reset()`` (or instanciate a
+        new engine) and start again from the last word you tried (the one that has just
+        been rejected).
         """
         if not word:
             return False
@@ -214,9 +222,12 @@ class WordStreamValueParserGerman(WordStreamValueParserInterface):
     Public API:
 
         - ``self.parse(word)``
+        - ``self.push(word)`` and ``self.reset()`` (incremental)
         - ``self.value: int``
     """
 
+    STATIC_HUNDRED = "hundert"
+
     def __init__(self, lang: Language, relaxed: bool = False) -> None:
         """Initialize the parser.
 
@@ -225,6 +236,21 @@ class WordStreamValueParserGerman(WordStreamValueParserInterface):
         """
         super().__init__(lang, relaxed)
         self.val: int = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the parser to start with a new number."""
+        self.val = 0
+        # length of split text so far (see 'split_number_word')
+        self._split_length = 0
+        # words after last multiplier, the only group that can still change
+        self._open_group: List[str] = []
+        # groups closed by a multiplier are parsed only once
+        self._closed_value = 0
+        self._equation_results: List[int] = []
+        self._last_multiplier: Optional[int] = None
+        # a closed group or a word was invalid, no following word can fix that
+        self._failed = False
 
     @property
     def value(self) -> int:
@@ -235,276 +261,259 @@ class WordStreamValueParserGerman(WordStreamValueParserInterface):
         """Check text for number words, split complex number words (hundertfünfzig)
         if necessary and parse all at once.
         """
+        self.reset()
+        if not self.push(text):
+            raise ValueError("invalid literal for text2num: {}".format(repr(text)))
+        return True
+
+    def push(self, word: str, look_ahead: Optional[str] = None) -> bool:
+        """Push next token (can be a complex number word like 'hundertfünfzig')
+        and return True if all tokens since last ``reset`` are a valid number.
+
+        The result is the same as ``parse`` of the joined tokens, but only the group
+        after the last multiplier is parsed again when a new token comes in.
+        """
+        if self._failed:
+            return False
         # Correct way of writing German numbers is one single word only if < 1 Mio.
         # We need to split to be able to parse the text:
-        text = self.lang.split_number_word(text)
-        # print("split text:", text) # for debugging
+        text = self.lang.split_number_word(word, self._split_length)
+        self._split_length += len(text)
 
-        STATIC_HUNDRED = "hundert"
-
-        # Split text at MULTIPLIERS into 'num_groups'
+        # Split text at MULTIPLIERS into groups
         # E.g.: 53.243.724 -> drei und fünfzig Millionen
         # | zwei hundert drei und vierzig tausend | sieben hundert vier und zwanzig
+        for w in text.split():
+            self._open_group.append(w)
+            if w in self.lang.MULTIPLIERS:
+                try:
+                    # check for multiplier errors (avoid numbers like
+                    # "tausend einhundert zwei tausend")
+                    if self._last_multiplier is None:
+                        self._last_multiplier = self.lang.NUMBER_DICT_GER[w]
+                    elif self.lang.NUMBER_DICT_GER[w] >= self._last_multiplier:
+                        raise ValueError("invalid literal for text2num: {}".format(repr(w)))
+                    self._closed_value += self._parse_group(
+                        self._open_group.copy(), self._equation_results)
+                except (ValueError, KeyError):  # KeyError: e.g. "und" in wrong place
+                    self._failed = True
+                    return False
+                self._open_group.clear()
 
-        num_groups = []
-        num_block = []
-        text = text.lower()
-        words = text.split()
-        last_multiplier = None
-        equation_results = []
+            # Also interrupt if there is any other word (no number, no AND)
+            elif w not in self.lang.NUMBER_DICT_GER and w != self.lang.AND:
+                self._failed = True
+                return False
 
-        for w in words:
-            num_block.append(w)
-            if w in self.lang.MULTIPLIERS:
-                num_groups.append(num_block.copy())
-                num_block.clear()
+        # parse open group (without keeping its results, the next word may change it)
+        if self._open_group:
+            try:
+                open_value = self._parse_group(
+                    self._open_group.copy(), self._equation_results.copy())
+            except (ValueError, KeyError):
+                return False
+        else:
+            open_value = 0
+        self.val = self._closed_value + open_value
+        return True
 
-                # check for multiplier errors (avoid numbers like "tausend einhundert zwei tausend)
-                if last_multiplier is None:
-                    last_multiplier = German.NUMBER_DICT_GER[w]
-                else:
-                    current_multiplier = German.NUMBER_DICT_GER[w]
-                    if (
-                        current_multiplier == last_multiplier
-                        or current_multiplier > last_multiplier
-                    ):
-                        raise ValueError(
-                            "invalid literal for text2num: {}".format(repr(w))
-                        )
+    def _parse_group(self, ng: List[str], equation_results: List[int]) -> int:
+        """Parse one number group (words up to and including a multiplier) and
+        return its value. Appends sub-results to 'equation_results'.
+        """
+        # group value = sum of terms (sign applies to first) * multiplier
+        terms: List[int] = []
+        negative = False
+        group_multiplier = 1
+        processed_a_part = False
+
+        sign_at_beginning = False
+        if (len(ng) > 0) and (ng[0] in self.lang.SIGN):
+            negative = self.lang.SIGN[ng[0]] == "-"
+            ng.pop(0)
+            equation_results.append(0)
+            sign_at_beginning = True
+
+        if sign_at_beginning and (
+            (len(ng) == 0)
+            or ((len(ng) > 0) and not ng[0] in self.lang.NUMBER_DICT_GER)
+        ):
+            raise ValueError(
+                "invalid literal for text2num: {}".format(repr(ng))
+            )
 
-            # Also interrupt if there is any other word (no number, no AND)
-            if w not in German.NUMBER_DICT_GER and w != self.lang.AND:
-                raise ValueError("invalid literal for text2num: {}".format(repr(w)))
-
-        if len(num_block) > 0:
-            num_groups.append(num_block.copy())
-            num_block.clear()
-
-        main_equation = "0"
-        ng = None
-
-        while len(num_groups) > 0:
-            if ng is None:
-                ng = num_groups[0].copy()
-            equation = ""
-            processed_a_part = False
-
-            sign_at_beginning = False
-            if (len(ng) > 0) and (ng[0] in self.lang.SIGN):
-                equation += self.lang.SIGN[ng[0]]
-                ng.pop(0)
-                equation_results.append(0)
-                sign_at_beginning = True
-
-            if sign_at_beginning and (
-                (len(ng) == 0)
-                or ((len(ng) > 0) and not ng[0] in German.NUMBER_DICT_GER)
+        # prozess zero(s) at the beginning
+        null_at_beginning = False
+        while (len(ng) > 0) and (ng[0] in self.lang.ZERO):
+            terms.append(0)
+            ng.pop(0)
+            equation_results.append(0)
+            processed_a_part = True
+            null_at_beginning = True
+
+        if (
+            null_at_beginning
+            and (len(ng) > 0)
+            and (not ng[0] == self.lang.DECIMAL_SYM)
+        ):
+            raise ValueError(
+                "invalid literal for text2num: {}".format(repr(ng))
+            )
+
+        # Process "hundert" groups first
+        if self.STATIC_HUNDRED in ng:
+
+            hundred_index = ng.index(self.STATIC_HUNDRED)
+            if hundred_index == 0:
+                terms.append(100)
+                equation_results.append(100)
+                ng.pop(hundred_index)
+                processed_a_part = True
+
+            elif (ng[hundred_index - 1] in self.lang.UNITS) or (
+                ng[hundred_index - 1] in self.lang.STENS
             ):
+                multiplier = self.lang.NUMBER_DICT_GER[ng[hundred_index - 1]]
+                terms.append(multiplier * 100)
+                equation_results.append(multiplier * 100)
+                ng.pop(hundred_index)
+                ng.pop(hundred_index - 1)
+                processed_a_part = True
+
+        # Process "und" groups
+        if self.lang.AND in ng and len(ng) >= 3:
+            and_index = ng.index(self.lang.AND)
+
+            # what if "und" comes at the end or beginnig?
+            if and_index + 1 >= len(ng) or and_index == 0:
                 raise ValueError(
-                    "invalid literal for text2num: {}".format(repr(num_groups))
+                    "invalid 'and' index for text2num: {}".format(repr(ng))
                 )
 
-            # prozess zero(s) at the beginning
-            null_at_beginning = False
-            while (len(ng) > 0) and (ng[0] in self.lang.ZERO):
-                equation += "0"
-                ng.pop(0)
-                equation_results.append(0)
-                processed_a_part = True
-                null_at_beginning = True
+            # get the number before and after the "und"
+            first_summand = ng[and_index - 1]
+            second_summand = ng[and_index + 1]
 
+            # string to num for atomic numbers
+            first_summand_num = self.lang.NUMBER_DICT_GER[first_summand]
+            second_summand_num = self.lang.NUMBER_DICT_GER[second_summand]
+
+            # not all combinations are allowed
             if (
-                null_at_beginning
-                and (len(ng) > 0)
-                and (not ng[0] == self.lang.DECIMAL_SYM)
+                first_summand_num >= 10
+                or second_summand_num < 20
+                or first_summand in self.lang.NEVER_CONNECTS_WITH_AND
             ):
                 raise ValueError(
-                    "invalid literal for text2num: {}".format(repr(num_groups))
+                    "invalid 'and' group for text2num: {}".format(repr(ng))
                 )
 
-            # Process "hundert" groups first
-            if STATIC_HUNDRED in ng:
-
-                hundred_index = ng.index(STATIC_HUNDRED)
-                if hundred_index == 0:
-                    if equation == "":
-                        equation = "100 "
-                    else:
-                        equation += " + 100 "
-                    equation_results.append(100)
-                    ng.pop(hundred_index)
-                    processed_a_part = True
-
-                elif (ng[hundred_index - 1] in self.lang.UNITS) or (
-                    ng[hundred_index - 1] in self.lang.STENS
-                ):
-                    multiplier = German.NUMBER_DICT_GER[ng[hundred_index - 1]]
-                    equation += "(" + str(multiplier) + " * 100)"
-                    equation_results.append(multiplier * 100)
-                    ng.pop(hundred_index)
-                    ng.pop(hundred_index - 1)
-                    processed_a_part = True
-
-            # Process "und" groups
-            if self.lang.AND in ng and len(ng) >= 3:
-                and_index = ng.index(self.lang.AND)
-
-                # what if "und" comes at the end or beginnig?
-                if and_index + 1 >= len(ng) or and_index == 0:
-                    raise ValueError(
-                        "invalid 'and' index for text2num: {}".format(repr(ng))
-                    )
-
-                # get the number before and after the "und"
-                first_summand = ng[and_index - 1]
-                second_summand = ng[and_index + 1]
-
-                # string to num for atomic numbers
-                first_summand_num = German.NUMBER_DICT_GER[first_summand]
-                second_summand_num = German.NUMBER_DICT_GER[second_summand]
-
-                # not all combinations are allowed
-                if (
-                    first_summand_num >= 10
-                    or second_summand_num < 20
-                    or first_summand in German.NEVER_CONNECTS_WITH_AND
-                ):
-                    raise ValueError(
-                        "invalid 'and' group for text2num: {}".format(repr(ng))
-                    )
-
-                and_sum_eq = "(" + str(first_summand_num) + " + " + str(second_summand_num) + ")"
-                # Is there already a hundreds value in the equation?
-                if equation == "":
-                    equation += and_sum_eq
-                else:
-                    equation = "(" + equation + " + " + and_sum_eq + ")"
-                equation_results.append(first_summand_num + second_summand_num)
-                ng.pop(and_index + 1)
-                ng.pop(and_index)
-                ng.pop(and_index - 1)
-                processed_a_part = True
+            terms.append(first_summand_num + second_summand_num)
+            equation_results.append(first_summand_num + second_summand_num)
+            ng.pop(and_index + 1)
+            ng.pop(and_index)
+            ng.pop(and_index - 1)
+            processed_a_part = True
 
-            # MTENS (20, 30, 40 .. 90)
-            elif any(x in ng for x in self.lang.MTENS):
+        # MTENS (20, 30, 40 .. 90)
+        elif any(x in ng for x in self.lang.MTENS):
 
-                # expect exactly one - TODO: ??! O_o who can read this?
-                mtens_res = [x for x in ng if x in self.lang.MTENS]
-                if not len(mtens_res) == 1:
-                    raise ValueError(
-                        "invalid literal for text2num: {}".format(repr(ng))
-                    )
+            # expect exactly one - TODO: ??! O_o who can read this?
+            mtens_res = [x for x in ng if x in self.lang.MTENS]
+            if not len(mtens_res) == 1:
+                raise ValueError(
+                    "invalid literal for text2num: {}".format(repr(ng))
+                )
 
-                mtens_num = German.NUMBER_DICT_GER[mtens_res[0]]
-                if equation == "":
-                    equation += "(" + str(mtens_num) + ")"
-                else:
-                    equation = "(" + equation + " + (" + str(mtens_num) + "))"
-                mtens_index = ng.index(mtens_res[0])
-                equation_results.append(mtens_num)
-                ng.pop(mtens_index)
-                processed_a_part = True
+            mtens_num = self.lang.NUMBER_DICT_GER[mtens_res[0]]
+            terms.append(mtens_num)
+            mtens_index = ng.index(mtens_res[0])
+            equation_results.append(mtens_num)
+            ng.pop(mtens_index)
+            processed_a_part = True
 
-            # 11, 12, 13, ... 19
-            elif any(x in ng for x in self.lang.STENS):
+        # 11, 12, 13, ... 19
+        elif any(x in ng for x in self.lang.STENS):
 
-                # expect exactly one
-                stens_res = [x for x in ng if x in self.lang.STENS]
-                if not len(stens_res) == 1:
-                    raise ValueError(
-                        "invalid literal for text2num: {}".format(repr(ng))
-                    )
+            # expect exactly one
+            stens_res = [x for x in ng if x in self.lang.STENS]
+            if not len(stens_res) == 1:
+                raise ValueError(
+                    "invalid literal for text2num: {}".format(repr(ng))
+                )
 
-                stens_num = German.NUMBER_DICT_GER[stens_res[0]]
-                if equation == "":
-                    equation += "(" + str(stens_num) + ")"
-                else:
-                    equation = "(" + equation + " + (" + str(stens_num) + "))"
-                stens_index = ng.index(stens_res[0])
-                equation_results.append(stens_num)
-                ng.pop(stens_index)
-                processed_a_part = True
+            stens_num = self.lang.NUMBER_DICT_GER[stens_res[0]]
+            terms.append(stens_num)
+            stens_index = ng.index(stens_res[0])
+            equation_results.append(stens_num)
+            ng.pop(stens_index)
+            processed_a_part = True
 
-            # 1, 2, ... 9
-            elif any(x in ng for x in self.lang.UNITS):
+        # 1, 2, ... 9
+        elif any(x in ng for x in self.lang.UNITS):
 
-                # expect exactly one
-                units_res = [x for x in ng if x in self.lang.UNITS]
-                if not len(units_res) == 1:
-                    raise ValueError(
-                        "invalid literal for text2num: {}".format(repr(ng))
-                    )
+            # expect exactly one
+            units_res = [x for x in ng if x in self.lang.UNITS]
+            if not len(units_res) == 1:
+                raise ValueError(
+                    "invalid literal for text2num: {}".format(repr(ng))
+                )
 
-                units_num = German.NUMBER_DICT_GER[units_res[0]]
-                if equation == "":
-                    equation += "(" + str(units_num) + ")"
+            units_num = self.lang.NUMBER_DICT_GER[units_res[0]]
+            terms.append(units_num)
+            units_index = ng.index(units_res[0])
+            equation_results.append(units_num)
+            ng.pop(units_index)
+            processed_a_part = True
+
+        # Add multipliers
+        if any(x in ng for x in self.lang.MULTIPLIERS):
+            # Multiplier is always the last word
+            if ng[len(ng) - 1] in self.lang.MULTIPLIERS:
+                multiplier = self.lang.NUMBER_DICT_GER[ng[len(ng) - 1]]
+                if len(ng) > 1:
+                    # before last has to be UNITS, STENS or MTENS and cannot follow prev. num.
+                    factor = self.lang.NUMBER_DICT_GER[ng[len(ng) - 2]]
+                    if len(equation_results) > 0:
+                        # This prevents things like "zwei zweitausend" (DE) to become 4000
+                        raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
+                    if factor and factor >= 1 and factor <= 90:
+                        terms.append(factor * multiplier)
+                        equation_results.append(factor * multiplier)
+                        ng.pop(len(ng) - 1)
+                        processed_a_part = True
+                    else:
+                        # I think we should fail here instead of ignore?
+                        raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
                 else:
-                    equation = "(" + equation + " + (" + str(units_num) + "))"
-                units_index = ng.index(units_res[0])
-                equation_results.append(units_num)
-                ng.pop(units_index)
+                    if terms:
+                        group_multiplier = multiplier
+                    else:
+                        terms.append(multiplier)    # e.g. "tausend" = 1000
+                    equation_results.append(multiplier)
+                ng.pop(len(ng) - 1)
                 processed_a_part = True
 
-            # Add multipliers
-            if any(x in ng for x in self.lang.MULTIPLIERS):
-                # Multiplier is always the last word
-                if ng[len(ng) - 1] in self.lang.MULTIPLIERS:
-                    multiplier = German.NUMBER_DICT_GER[ng[len(ng) - 1]]
-                    if len(ng) > 1:
-                        # before last has to be UNITS, STENS or MTENS and cannot follow prev. num.
-                        factor = German.NUMBER_DICT_GER[ng[len(ng) - 2]]
-                        if len(equation_results) > 0:
-                            # This prevents things like "zwei zweitausend" (DE) to become 4000
-                            raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
-                        if factor and factor >= 1 and factor <= 90:
-                            multiply_eq = "(" + str(factor) + " * " + str(multiplier) + ")"
-                            if equation == "":
-                                equation += multiply_eq
-                            else:
-                                equation += (" * " + multiply_eq)
-                            equation_results.append(factor * multiplier)
-                            ng.pop(len(ng) - 1)
-                            processed_a_part = True
-                        else:
-                            # I think we should fail here instead of ignore?
-                            raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
-                    else:
-                        multiply_eq = "(" + str(multiplier) + ")"
-                        if equation == "":
-                            equation += multiply_eq
-                        else:
-                            equation += " * " + multiply_eq
-                        equation_results.append(multiplier)
-                    ng.pop(len(ng) - 1)
-                    processed_a_part = True
-
-            if not processed_a_part:
-                raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
-
-            # done, remove number group
-            if len(ng) == 0:
-                num_groups.pop(0)
-                if len(num_groups) > 0:
-                    ng = num_groups[0].copy()
-            else:
-                # at this point there should not be any more number parts
-                raise ValueError(
-                    "invalid literal for text2num - group {} in {}".format(repr(num_groups), text)
-                )
+        if not processed_a_part:
+            raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
 
-            # Any sub-equation that results to 0 and is not the first sub-equation means an error
-            if (
-                len(equation_results) > 1
-                and equation_results[len(equation_results) - 1] == 0
-            ):
-                raise ValueError("invalid literal for text2num: {}".format(repr(text)))
+        # at this point there should not be any more number parts
+        if len(ng) > 0:
+            raise ValueError("invalid literal for text2num - group {}".format(repr(ng)))
 
-            main_equation = main_equation + " + (" + equation + ")"
-            # print("equation:", main_equation)  # for debugging
-            # print("equation_results", equation_results)  # for debugging
+        # Any sub-equation that results to 0 and is not the first sub-equation means an error
+        if (
+            len(equation_results) > 1
+            and equation_results[len(equation_results) - 1] == 0
+        ):
+            raise ValueError("invalid literal for text2num: {}".format(repr(ng)))
 
-        self.val = eval(main_equation)  # TODO: use 'equation_results' instead
-        return True
+        # print("terms:", terms, "x", group_multiplier)  # for debugging
+        # print("equation_results", equation_results)  # for debugging
+        value = sum(terms)
+        if negative and terms:
+            value -= 2 * terms[0]
+        return value * group_multiplier
 
 
 class WordToDigitParser:
@@ -539,6 +548,7 @@ class WordToDigitParser:
 
      - ``self.push(word, look_ahead)``
      - ``self.close()``
+     - ``self.reset()``
      - ``self.value``: str
     """
 
@@ -570,6 +580,18 @@ class WordToDigitParser:
         self.last_word: Optional[str] = None  # For context
         self.ordinal_threshold = ordinal_threshold
 
+    def reset(self) -> None:
+        """Reset the parser to start with a new number (same as a new instance,
+        but without allocating new builders).
+        """
+        self._value.clear()
+        self.int_builder.reset()
+        self.frac_builder.reset()
+        self.in_frac = False
+        self.closed = False
+        self.open = False
+        self.last_word = None
+
     @property
     def value(self) -> str:
         """Return the current value."""
@@ -627,8 +649,9 @@ class WordToDigitParser:
         If this function returns False, and the last call returned True, that means you
         reached the end of a number. You can get its value from ``self.value``.
 
-        Then, to parse a new number, you need to instanciate a new engine and start
-        again from the last word you tried (the one that has just been rejected).
+        Then, to parse a new number, you need to call ``self.reset()`` (or instanciate a
+        new engine) and start again from the last word you tried (the one that has just
+        been rejected).
         """
         if self.closed or self.is_alone(word, look_ahead):
             self.last_word = word
@@ -21,10 +21,11 @@
 # SOFTWARE.
 
 import re
-from itertools import dropwhile
-from typing import Any, Iterator, List, Sequence, Tuple, Union, Optional
+from functools import lru_cache
+from itertools import dropwhile, repeat
+from typing import Any, Iterator, List, Sequence, Tuple, Union, Optional, TYPE_CHECKING
 
-from .lang import LANG, Language, German, Portuguese
+from .lang import LANG, Language
 from .parsers import (
     WordStreamValueParserInterface,
     WordStreamValueParser,  # we should rename this to 'WordStreamValueParserCommon'
@@ -32,11 +33,20 @@ from .parsers import (
     WordToDigitParser,
 )
 
-from text_to_num.lang.portuguese import OrdinalsMerger
+if TYPE_CHECKING:
+    from text_to_num.lang.portuguese import OrdinalsMerger
 
-omg = OrdinalsMerger()
+# Portuguese 'OrdinalsMerger', created on first use (see '_get_ordinals_merger')
+omg: Optional["OrdinalsMerger"] = None
 USE_PT_ORDINALS_MERGER = True
 
+# Punctuation that splits text into segments (compiled once, as group to get
+# segments and separators with one 'split')
+SEGMENT_SEPARATORS = re.compile(r"(\s*[\.,;\(\)…\[\]:!\?]+\s*)")
+
+# Min. number of texts per process before 'alpha2digit_batch' uses a process pool
+BATCH_MIN_TEXTS_PER_PROCESS = 1000
+
 
 def look_ahead(sequence: Sequence[Any]) -> Iterator[Tuple[Any, Any]]:
     """Look-ahead iterator.
@@ -72,7 +82,7 @@ def text2num(text: str, lang: Union[str, Language], relaxed: bool = False) -> in
     num_parser: WordStreamValueParserInterface
 
     # German
-    if type(language) is German:
+    if language.AGGLUTINATIVE:
         # The German number writing rules do not apply to the common order of number processing
         num_parser = WordStreamValueParserGerman(
             language, relaxed=relaxed
@@ -107,16 +117,83 @@ def alpha2digit(
     if lang not in LANG:
         raise Exception("Language not supported")
 
+    return _alpha2digit_text(text, LANG[lang], relaxed, signed, ordinal_threshold)
+
+
+def alpha2digit_batch(
+    texts: Sequence[str],
+    lang: str,
+    relaxed: bool = False,
+    signed: bool = True,
+    ordinal_threshold: int = 3,
+    processes: Optional[int] = None,
+) -> List[str]:
+    """Same as ``alpha2digit`` for a list of texts, e.g. to re-process archived transcripts.
+    The language is resolved once and parsers are reused for all texts.
+
+    Set ``processes`` > 1 to spread large batches over a process pool
+    (used for at least ``BATCH_MIN_TEXTS_PER_PROCESS`` texts per process).
+    """
+    if lang not in LANG:
+        raise Exception("Language not supported")
+
+    texts = list(texts)
+    if processes and processes > 1 and len(texts) >= processes * BATCH_MIN_TEXTS_PER_PROCESS:
+        # a few chunks per process to balance load
+        chunk_size = -(-len(texts) // (processes * 4))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        from concurrent.futures import ProcessPoolExecutor  # only needed for large batches
+        with ProcessPoolExecutor(processes) as executor:
+            results = executor.map(alpha2digit_batch, chunks, repeat(lang), repeat(relaxed),
+                repeat(signed), repeat(ordinal_threshold))
+            return [text for chunk in results for text in chunk]
+
     language = LANG[lang]
-    segments = re.split(
-        r"\s*[\.,;\(\)…\[\]:!\?]+\s*", text
+    num_parser = _new_num_parser(language, relaxed, signed, ordinal_threshold)
+    return [
+        _alpha2digit_text(text, language, relaxed, signed, ordinal_threshold, num_parser)
+        for text in texts
+    ]
+
+
+def _new_num_parser(
+    language: Language,
+    relaxed: bool,
+    signed: bool,
+    ordinal_threshold: int,
+) -> Union[WordStreamValueParserGerman, WordToDigitParser]:
+    """Create parser for ``_alpha2digit_text`` (reusable via 'reset')."""
+    if language.AGGLUTINATIVE:
+        return WordStreamValueParserGerman(language, relaxed=relaxed)
+    return WordToDigitParser(
+        language,
+        relaxed=relaxed,
+        signed=signed,
+        ordinal_threshold=ordinal_threshold,
     )
-    punct = re.findall(r"\s*[\.,;\(\)…\[\]:!\?]+\s*", text)
-    if len(punct) < len(segments):
-        punct.append("")
+
+
+def _alpha2digit_text(
+    text: str,
+    language: Language,
+    relaxed: bool,
+    signed: bool,
+    ordinal_threshold: int,
+    num_parser: Union[WordStreamValueParserGerman, WordToDigitParser, None] = None,
+) -> str:
+    """Implementation of ``alpha2digit`` for a resolved language
+    (optionally with a reusable parser, see ``_new_num_parser``)."""
+    if num_parser is None:
+        num_parser = _new_num_parser(language, relaxed, signed, ordinal_threshold)
+    parts = SEGMENT_SEPARATORS.split(text)
+    segments = parts[::2]
+    punct = parts[1::2]
+    punct.append("")
+
+    merge_ordinals = language.MERGE_COMPOUND_ORDINALS and USE_PT_ORDINALS_MERGER
 
     # Process segments
-    if type(language) is German:
+    if language.AGGLUTINATIVE:
         # TODO: we should try to build a proper 'WordToDigitParser' for German
         # and refactor the code to be more similar to the default logic below
         text = _alpha2digit_agg(
@@ -125,57 +202,94 @@ def alpha2digit(
             punct,
             relaxed=relaxed,
             signed=signed,
-            ordinal_threshold=ordinal_threshold
+            ordinal_threshold=ordinal_threshold,
+            num_parser=num_parser  # type: ignore
         )
+        if merge_ordinals:
+            text = _get_ordinals_merger().merge_compound_ordinals_pt(text)
     else:
         # Default
-        out_segments: List[str] = []
+        num_builder: WordToDigitParser = num_parser  # type: ignore
+        segment_tokens: List[List[str]] = []
         for segment, sep in zip(segments, punct):
             tokens = segment.split()
-            num_builder = WordToDigitParser(
-                language,
-                relaxed=relaxed,
-                signed=signed,
-                ordinal_threshold=ordinal_threshold,
-            )
+            # lower case once per segment (same tokens as lower case of each token)
+            tokens_lower = segment.lower().split()
+            num_builder.reset()
             in_number = False
             out_tokens: List[str] = []
-            for word, ahead in look_ahead(tokens):
-                if num_builder.push(word.lower(), ahead and ahead.lower()):
+            for word, (word_lower, ahead) in zip(tokens, look_ahead(tokens_lower)):
+                if num_builder.push(word_lower, ahead):
                     in_number = True
                 elif in_number:
                     out_tokens.append(num_builder.value)
-                    num_builder = WordToDigitParser(
-                        language,
-                        relaxed=relaxed,
-                        signed=signed,
-                        ordinal_threshold=ordinal_threshold,
-                    )
-                    in_number = num_builder.push(word.lower(), ahead and ahead.lower())
+                    num_builder.reset()
+                    in_number = num_builder.push(word_lower, ahead)
                 if not in_number:
                     out_tokens.append(word)
             # End of segment
             num_builder.close()
             if num_builder.value:
                 out_tokens.append(num_builder.value)
-            out_segments.append(" ".join(out_tokens))
-            out_segments.append(sep)
-        text = "".join(out_segments)
-
-    # Post-processing
-    if type(language) is Portuguese and USE_PT_ORDINALS_MERGER:
-        text = omg.merge_compound_ordinals_pt(text)
+            segment_tokens.append(out_tokens)
+        if merge_ordinals:
+            # Post-processing of the same tokens (no second split of the text)
+            text = _get_ordinals_merger().merge_segments(segment_tokens, punct)
+        else:
+            text = "".join(" ".join(tokens) + sep for tokens, sep in zip(segment_tokens, punct))
 
     return text
 
 
+# Bounded LRU cache for repetitive texts (see 'alpha2digit_cached')
+_alpha2digit_lru = lru_cache(maxsize=1024)(alpha2digit)
+
+
+def alpha2digit_cached(
+    text: str,
+    lang: str,
+    relaxed: bool = False,
+    signed: bool = True,
+    ordinal_threshold: int = 3,
+) -> str:
+    """Same as ``alpha2digit`` but results are kept in a bounded LRU cache keyed by
+    all arguments. Use it for repetitive texts like voice commands.
+    """
+    return _alpha2digit_lru(text, lang, relaxed, signed, ordinal_threshold)
+
+
+def set_alpha2digit_cache_size(maxsize: Optional[int]) -> None:
+    """Set max. number of results in ``alpha2digit_cached`` cache (0: no caching,
+    None: unbounded). This clears the cache and its statistics.
+    """
+    global _alpha2digit_lru
+    _alpha2digit_lru = lru_cache(maxsize=maxsize)(alpha2digit)
+
+
+def alpha2digit_cache_info() -> Any:
+    """Get ``alpha2digit_cached`` statistics as named tuple:
+    hits, misses, maxsize, currsize
+    """
+    return _alpha2digit_lru.cache_info()
+
+
+def _get_ordinals_merger() -> "OrdinalsMerger":
+    """Get Portuguese 'OrdinalsMerger' (import and create on first use)."""
+    global omg
+    if omg is None:
+        from text_to_num.lang.portuguese import OrdinalsMerger
+        omg = OrdinalsMerger()
+    return omg
+
+
 def _alpha2digit_agg(
     language: Language,
     segments: List[str],
     punct: List[Any],
     relaxed: bool,
     signed: bool,
-    ordinal_threshold: int = 3
+    ordinal_threshold: int = 3,
+    num_parser: Optional[WordStreamValueParserGerman] = None
 ) -> str:
     """Variant for "agglutinative" languages and languages with different style
     of processing numbers, for example:
@@ -186,6 +300,8 @@ def _alpha2digit_agg(
     Only German for now.
     """
     out_segments: List[str] = []
+    if num_parser is None:
+        num_parser = WordStreamValueParserGerman(language, relaxed=relaxed)
 
     def revert_if_alone(sentence_effective_len: int, current_sentence: List[str]) -> bool:
         """Test if word is 'alone' and should not be shown as number."""
@@ -202,6 +318,7 @@ def _alpha2digit_agg(
         out_tokens: List[str] = []
         out_tokens_is_num: List[bool] = []
         out_tokens_ordinal_org: List[Optional[str]] = []
+        num_parser.reset()
         combined_num_result = None
         current_token_ordinal_org = None
         reset_to_last_if_failed = False
@@ -217,11 +334,10 @@ def _alpha2digit_agg(
                 tmp_token_ordinal_org = t
                 t = cardinal_for_ordinal
             sentence.append(t)
-            try:
-                # TODO: this is very inefficient because we analyze the same text
-                # again and again until it fails including 'split_number_word' and all the
-                # heavy lifting ... but it works and is hard to optimize ¯\_(ツ)_/¯
-                num_result = text2num(" ".join(sentence), language, relaxed=relaxed)
+            # the parser keeps the state of all previous tokens in 'sentence'
+            # and parses only the new token (same as 'text2num' of the joined sentence)
+            if num_parser.push(t):
+                num_result = num_parser.value
                 # TODO: here we need to use 'relaxed' to check how to continue
                 combined_num_result = num_result
                 current_token_ordinal_org = tmp_token_ordinal_org
@@ -237,7 +353,7 @@ def _alpha2digit_agg(
                     sentence[len(sentence)-1] = str(tmp_token_ordinal_org)
                     token_to_add = " ".join(sentence)
                     token_to_add_is_num = False
-            except ValueError:
+            else:
                 # This will happen if look-ahead was required (e.g. because of AND) but failed:
                 if reset_to_last_if_failed:
                     reset_to_last_if_failed = False
@@ -274,6 +390,7 @@ def _alpha2digit_agg(
                 out_tokens_is_num.append(token_to_add_is_num)
                 out_tokens_ordinal_org.append(current_token_ordinal_org)
                 sentence.clear()
+                num_parser.reset()
                 combined_num_result = None
                 current_token_ordinal_org = None
 
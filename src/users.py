@@ -2,6 +2,9 @@
 
 import time
 import asyncio
+import struct
+import secrets
+from functools import partial
 
 from uvicorn.config import logger
 from fastapi import WebSocket
@@ -11,15 +14,20 @@ from launch_setup import settings
 from socket_messages import (SocketJsonInputMessage,
     SocketMessage, SocketPingMessage, SocketErrorMessage)
 from chunk_processor import ChunkProcessor
-from engine_interface import ModelNotFound, EngineNotFound
-
-# For now we just use a simple static token.
-COMMON_TOKEN = settings.common_auth_token
+from engine_interface import ModelNotFound, ModelBusy, EngineNotFound, InvalidOptions
+import metrics
 
 # Client timeout (s) - kick fast
-HEARTBEAT_DELAY = settings.socket_heartbeat_s
 TIMEOUT_SECONDS = settings.socket_timeout_s
 
+# Binary frames of multiplexed sessions start with the stream ID (unsigned int, big-endian)
+STREAM_FRAME_HEADER = struct.Struct(">I")
+MAX_STREAM_ID = 2**32 - 1
+
+def is_valid_stream_id(stream_id: int):
+    """Check if stream ID fits into frame header"""
+    return 0 <= stream_id <= MAX_STREAM_ID
+
 class SessionIds:
     """Generate session IDs"""
     last_session_id = 0
@@ -32,6 +40,24 @@ class SessionIds:
             SessionIds.last_session_id = 1
         return f"{SessionIds.last_session_id}-{int(time.time())}"
 
+class SuspendedSession:
+    """Processors of a disconnected session that can be resumed via token"""
+    def __init__(self, resume_token, processor, streams, is_multiplexed):
+        self.resume_token = resume_token
+        self.processor = processor
+        self.streams = streams
+        self.is_multiplexed = is_multiplexed
+        self.expire_handle = None
+
+    async def close(self):
+        """Close all processors"""
+        if self.processor is not None:
+            await self.processor.close()
+            self.processor = None
+        for processor in self.streams.values():
+            await processor.close()
+        self.streams = {}
+
 class SocketUser:
     """Class representing a user with some basic info and auth. method"""
     def __init__(self, websocket: WebSocket):
@@ -40,17 +66,20 @@ class SocketUser:
         self.last_alive_sign = int(time.time())
         self.socket = websocket
         self.session_id = SessionIds.get_new_sesstion_id()
-        self.task = self.create_heartbeat_loop_task()
+        self.heartbeat_slot = None      # assigned by heart-beat scheduler of 'SocketManager'
         self.processor = None
+        self.is_multiplexed = False     # set by first 'welcome' message with 'stream_id'
+        self.streams = {}               # processors of multiplexed session by stream ID
+        self.resume_token = None        # set after authentication if resume is allowed
+        self.handler_task = None        # task of connection handler (see 'abort')
 
     async def authenticate(self, socket_message: SocketJsonInputMessage):
         """Check if user is valid"""
         client_id = socket_message.client_id
         token = socket_message.access_token
-        processor_options = socket_message.data
-        engine_name = None   # NOTE: we let the ChunkProcessor choose
-        # Try one token for all
-        if COMMON_TOKEN and token == COMMON_TOKEN:
+        # Try one token for all (read each time, settings can be reloaded)
+        common_token = settings.common_auth_token
+        if common_token and token == common_token:
             self.is_authenticated = True
         # Try user list
         elif client_id and token:
@@ -60,34 +89,122 @@ class SocketUser:
                     self.is_authenticated = True
         # Create processor
         if self.is_authenticated:
-            try:
-                self.processor = ChunkProcessor(engine_name=engine_name,
-                    send_message=self.send_message, options=processor_options)
-            except EngineNotFound:
-                logger.exception("ChunkProcessor - Engine not found")
-                await self.send_message(SocketErrorMessage(500,
-                    "ChunkProcessorError",
-                    "Failed to create processor: EngineNotFound"))
-            except ModelNotFound:
-                logger.exception("ChunkProcessor - ASR model not found")
-                await self.send_message(SocketErrorMessage(500,
-                    "ChunkProcessorError",
-                    "Failed to create processor: ModelNotFound"))
-            except RuntimeError as err:
-                logger.exception("ChunkProcessor - Failed to create processor")
-                logger.exception("ChunkProcessorError: %s", err)
-                await self.send_message(SocketErrorMessage(500,
-                    "ChunkProcessorError",
-                    f"Failed to create processor: {str(err)}"))
+            # the first 'welcome' decides if this connection can carry multiple streams
+            self.is_multiplexed = socket_message.stream_id is not None
+            processor = await self.create_processor(socket_message)
+            if processor and settings.socket_resume_s > 0:
+                self.resume_token = secrets.token_urlsafe(24)
         else:
             logger.warning("User %s failed to authenticate!", client_id)
             await asyncio.sleep(3)
 
+    async def create_processor(self, socket_message: SocketJsonInputMessage):
+        """Create chunk processor for session or stream of multiplexed session
+        (requires authenticated user)"""
+        processor = None
+        processor_options = socket_message.data
+        engine_name = None   # NOTE: we let the ChunkProcessor choose
+        stream_id = socket_message.stream_id
+        if stream_id is None:
+            send_message = self.send_message
+        else:
+            send_message = partial(self.send_stream_message, stream_id)
+        try:
+            new_processor = ChunkProcessor(engine_name=engine_name,
+                send_message=send_message, options=processor_options)
+            # load model without blocking other sessions
+            await new_processor.setup()
+            processor = new_processor
+        except EngineNotFound:
+            metrics.sessions_rejected.inc(settings.asr_engine, "", "engine_not_found")
+            logger.exception("ChunkProcessor - Engine not found")
+            await send_message(SocketErrorMessage(500,
+                "ChunkProcessorError",
+                "Failed to create processor: EngineNotFound"))
+        except ModelNotFound:
+            metrics.sessions_rejected.inc(settings.asr_engine, "", "model_not_found")
+            logger.exception("ChunkProcessor - ASR model not found")
+            await send_message(SocketErrorMessage(500,
+                "ChunkProcessorError",
+                "Failed to create processor: ModelNotFound"))
+        except InvalidOptions as err:
+            metrics.sessions_rejected.inc(settings.asr_engine, "", "invalid_options")
+            logger.warning("ChunkProcessor - %s", err)
+            await send_message(SocketErrorMessage(400,
+                "ChunkProcessorError",
+                f"Failed to create processor: InvalidOptions - {err}"))
+        except ModelBusy as err:
+            logger.warning("ChunkProcessor - %s", err)
+            await send_message(SocketErrorMessage(503,
+                "ChunkProcessorError",
+                "Failed to create processor: ModelBusy"))
+        except RuntimeError as err:
+            metrics.sessions_rejected.inc(settings.asr_engine, "", "error")
+            logger.exception("ChunkProcessor - Failed to create processor")
+            logger.exception("ChunkProcessorError: %s", err)
+            await send_message(SocketErrorMessage(500,
+                "ChunkProcessorError",
+                f"Failed to create processor: {str(err)}"))
+        if processor is not None:
+            if stream_id is None:
+                self.processor = processor
+            else:
+                self.streams[stream_id] = processor
+        return processor
+
+    def get_processor(self, stream_id: int = None):
+        """Get processor of session or of a stream of a multiplexed session"""
+        if self.is_multiplexed:
+            return self.streams.get(stream_id)
+        else:
+            return self.processor
+
+    async def close_stream(self, stream_id: int):
+        """Close and remove a stream of a multiplexed session"""
+        processor = self.streams.pop(stream_id, None)
+        if processor is not None:
+            await processor.close()
+
+    def suspend(self):
+        """Detach active processors from this user to resume them later
+        in a new connection. Returns 'SuspendedSession' or None."""
+        if not self.is_authenticated or not self.resume_token:
+            return None
+        processor = None
+        if self.processor is not None and self.processor.is_active():
+            processor = self.processor
+            processor.set_send_message(None)
+            self.processor = None
+        streams = self.streams
+        for stream_processor in streams.values():
+            stream_processor.set_send_message(None)
+        self.streams = {}
+        if processor is None and not streams:
+            return None
+        return SuspendedSession(self.resume_token, processor, streams, self.is_multiplexed)
+
+    def resume(self, session: SuspendedSession):
+        """Take over processors of a suspended session (authenticates user)"""
+        self.is_authenticated = True
+        self.is_multiplexed = session.is_multiplexed
+        self.resume_token = session.resume_token
+        self.processor = session.processor
+        self.streams = session.streams
+        if self.processor is not None:
+            self.processor.set_send_message(self.send_message)
+        for stream_id, processor in self.streams.items():
+            processor.set_send_message(partial(self.send_stream_message, stream_id))
+
     async def send_message(self, message: SocketMessage):
         """Send socket message to user"""
         if self.socket.client_state == WebSocketState.CONNECTED:
             await self.socket.send_json(message.json)
 
+    async def send_stream_message(self, stream_id: int, message: SocketMessage):
+        """Send socket message of a certain stream (multiplexed session) to user"""
+        message.set_field("stream_id", stream_id)
+        await self.send_message(message)
+
     async def ping_client(self):
         """Send alive ping to client (and expect pong answer)"""
         ping_msg = SocketPingMessage(msg_id = None)
@@ -106,34 +223,65 @@ class SocketUser:
         if self.processor is not None:
             await self.processor.close()
             self.processor = None
+        # Close streams
+        for stream_id in list(self.streams):
+            await self.close_stream(stream_id)
+
+    async def heartbeat(self, now: int):
+        """Heart-beat check to make sure inactive clients are kicked fast.
+        Called periodically by the 'SocketManager'."""
+        if not self.is_alive:
+            return
+        if (now - self.last_alive_sign) > TIMEOUT_SECONDS:
+            self.is_alive = False
+            metrics.heartbeat_timeouts.inc()
+            # We are kind and inform the user that he will be kicked :-p
+            await self.send_message(SocketErrorMessage(408,
+                "TimeoutMessage", "Client was inactive for too long."))
+            if self.socket.client_state == WebSocketState.CONNECTED:
+                await self.socket.close(1013)
+        else:
+            await self.ping_client()
 
-    async def heartbeat_loop(self):
-        """Continous heart-beat check to make sure inactive
-        clients are kicked fast"""
-        while self.is_alive:
-            await asyncio.sleep(HEARTBEAT_DELAY)
-            if (int(time.time()) - self.last_alive_sign) > TIMEOUT_SECONDS:
-                # We are kind and inform the user that he will be kicked :-p
-                await self.send_message(SocketErrorMessage(408,
-                    "TimeoutMessage", "Client was inactive for too long."))
-                self.is_alive = False
-                if self.socket.client_state == WebSocketState.CONNECTED:
-                    await self.socket.close(1013)
-                #self.task.cancel()
-            elif self.is_alive:
-                await self.ping_client()
-
-    def create_heartbeat_loop_task(self):
-        """Create heart-beat loop task"""
-        loop = asyncio.get_running_loop()
-        return loop.create_task(self.heartbeat_loop())
+    def abort(self):
+        """Drop connection without waiting for the client, e.g. if sending blocks because the
+        client stopped reading (the connection handler is cancelled and cleans up)"""
+        self.is_alive = False
+        if self.handler_task is not None and not self.handler_task.done():
+            self.handler_task.cancel()
 
     async def process_audio_chunks(self, chunk: bytes):
         """Process audio chunks with given processor"""
-        if self.processor is not None:
+        if self.is_multiplexed:
+            # Get stream ID from frame header
+            if len(chunk) < STREAM_FRAME_HEADER.size:
+                await self.send_message(SocketErrorMessage(400,
+                    "InvalidFrame", "Binary data of multiplexed session is missing stream ID."))
+                return
+            stream_id = STREAM_FRAME_HEADER.unpack_from(chunk)[0]
+            processor = self.streams.get(stream_id)
+            if processor is None:
+                await self.send_stream_message(stream_id, SocketErrorMessage(400,
+                    "UnknownStream", "Stream does not exist (anymore)."))
+            else:
+                await processor.process(chunk[STREAM_FRAME_HEADER.size:])
+        elif self.processor is not None:
             await self.processor.process(chunk)
 
     async def finish_processing(self, message: SocketJsonInputMessage):
         """Stop accepting audio chunks and wait for last  result"""
-        if self.processor is not None:
+        if self.is_multiplexed:
+            processor = self.streams.get(message.stream_id)
+            if processor is None:
+                error_message = SocketErrorMessage(400,
+                    "UnknownStream", "'audioend' requires ID of an active stream.")
+                if message.stream_id is None:
+                    await self.send_message(error_message)
+                else:
+                    await self.send_stream_message(message.stream_id, error_message)
+            else:
+                await processor.finish_processing(message)
+                # streams end with their last result
+                await self.close_stream(message.stream_id)
+        elif self.processor is not None:
             await self.processor.finish_processing(message)
@@ -228,6 +228,8 @@ function constructWorker(options){
 		if (options.setup.task) engineOptions.task = options.setup.task;				//e.g.: "conversation"
 		if (options.setup.model) engineOptions.model = options.setup.model;				//e.g.: "vosk-model-small-de"
 		if (options.setup.optimizeFinalResult != undefined) engineOptions.optimizeFinalResult = options.setup.optimizeFinalResult;
+		if (options.setup.optimizePartialResults != undefined) engineOptions.optimizePartialResults = options.setup.optimizePartialResults;
+		if (options.setup.timing != undefined) engineOptions.timing = options.setup.timing;
 		engineOptions.doDebug = doDebug;
 		//special options (e.g. for Vosk):
 		/*